@@ -9,10 +9,11 @@ from flask_wtf.csrf import CSRFProtect
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.exceptions import HTTPException
 from config import Config
+from app.utils.db_routing import RoutingSession
 import os
 
 # Inicializar extensões
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 mail = Mail()
 csrf = CSRFProtect()
@@ -29,12 +30,26 @@ def create_app():
     app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
     app.config['PREFERRED_URL_SCHEME'] = 'https'
 
+    # Pool instrumentado (espera no checkout, invalidações) nos bancos em rede
+    from app.utils.db_pool import configure_pool, instrument_engine
+    from app.utils.metrics import init_metrics, instrument_queries
+    configure_pool(app)
+
     # Inicializar extensões com a aplicação
     db.init_app(app)
+    with app.app_context():
+        instrument_engine(app, db.engine)
+        for bind_key, engine in db.engines.items():
+            if bind_key is not None:
+                instrument_engine(app, engine, metrics=False)
+            instrument_queries(engine, bind_key or 'default')
     login_manager.init_app(app)
     mail.init_app(app)
     csrf.init_app(app)
 
+    # Latência das requisições por endpoint (Prometheus, GET /metrics)
+    init_metrics(app)
+
     # Add security headers for production and cache control for development
     @app.after_request
     def add_security_headers(response):
@@ -79,7 +94,7 @@ def create_app():
     os.makedirs(upload_folder, exist_ok=True)
 
     # Registrar blueprints
-    from app.routes import auth, dashboard, documents, document_types, users, approvals, audits, nonconformities, reports, equipments, equipment_types, groups, docs
+    from app.routes import auth, dashboard, documents, document_types, users, approvals, audits, nonconformities, reports, equipments, equipment_types, groups, docs, audit_logs, metrics, signatures
     app.register_blueprint(auth.bp, url_prefix='/auth')
     app.register_blueprint(dashboard.bp, url_prefix='/')
     app.register_blueprint(documents.bp, url_prefix='/documents')
@@ -93,6 +108,33 @@ def create_app():
     app.register_blueprint(equipments.bp, url_prefix='/equipments')
     app.register_blueprint(equipment_types.bp, url_prefix='/equipment_types')
     app.register_blueprint(docs.bp, url_prefix='/docs')
+    app.register_blueprint(audit_logs.bp, url_prefix='/audit-logs')
+    app.register_blueprint(metrics.bp, url_prefix='/metrics')
+    app.register_blueprint(signatures.bp, url_prefix='/signatures')
+
+    # Auditoria automática de criação/edição/exclusão dos modelos auditados
+    from app.utils.audit_logger import init_audit_listeners
+    init_audit_listeners(db.session)
+
+    # Versões de documentos gravadas como snapshots periódicos + deltas
+    from app.utils.version_store import init_version_listeners
+    init_version_listeners(db.session)
+
+    # Views de relatório leem da réplica até a sessão gravar algo
+    from app.utils.db_routing import init_routing_listeners
+    init_routing_listeners(app, db.session)
+
+    # Perfis compilados em máscaras de capacidades
+    from app.utils.permissions import init_permissions
+    init_permissions(app)
+
+    # Cache do usuário autenticado invalidado quando o User muda
+    from app.utils.principal import init_principal_listeners
+    init_principal_listeners()
+
+    # Registrar comandos de CLI (flask <comando>)
+    from app.commands import register_commands
+    register_commands(app)
 
     # Add favicon route
     @app.route('/favicon.ico')
@@ -100,6 +142,15 @@ def create_app():
         from flask import send_from_directory
         return send_from_directory(app.static_folder or 'static', 'favicon.ico')
 
+    # Edição concorrente detectada no UPDATE (version_id_col): responde com conflito
+    from sqlalchemy.orm.exc import StaleDataError
+
+    @app.errorhandler(StaleDataError)
+    def handle_stale_data(error):
+        from flask import request
+        from app.utils.concurrency import conflict_response
+        return conflict_response(redirect_to=request.referrer or request.url)
+
     # Tratamento de erros de banco de dados apenas (não captura HTTP errors)
     @app.errorhandler(Exception)
     def handle_db_error(error):
@@ -135,52 +186,22 @@ def create_app():
             # Show full error in development
             return str(error), 500
 
-    # Criar tabelas do banco de dados
-    with app.app_context():
-        try:
-            db.create_all()
-
-            # Criar usuário administrador padrão se não existir (apenas em desenvolvimento)
-            from app.models import User
-            is_development = (
-                os.environ.get('CREATE_DEFAULT_ADMIN',
-                               'False').lower() in ['true', '1', 'yes']
-                or (app.config.get('ENV') != 'production'
-                    and os.environ.get('FLASK_ENV') != 'production'))
-
-            if is_development:
-                try:
-                    admin = User.query.filter_by(
-                        email='admin@alphagestao.com').first()
-                    if not admin:
-                        # Use environment variable for admin password or default for dev
-                        admin_password = os.environ.get(
-                            'DEFAULT_ADMIN_PASSWORD', 'admin123')
-
-                        admin = User()
-                        admin.username = 'admin'
-                        admin.email = 'admin@alphagestao.com'
-                        admin.nome_completo = 'Administrador do Sistema'
-                        admin.perfil = 'administrador'
-                        admin.ativo = True
-                        admin.set_password(admin_password)
-                        db.session.add(admin)
-                        db.session.commit()
-                        app.logger.info(
-                            "Default admin user created for development")
-                except Exception as e:
-                    # Se houver erro na criação do admin (como coluna não existente), apenas logar
-                    app.logger.warning(
-                        f"Could not create default admin user: {e}")
-                    db.session.rollback()
-        except Exception as e:
-            app.logger.error(f"Error creating database tables: {e}")
-            db.session.rollback()
+    # Tabelas e administrador padrão são preparados por `flask init-db`, uma
+    # vez por implantação; a criação da aplicação não consulta o banco
+    if app.config.get('AUTO_INIT_DB'):
+        with app.app_context():
+            try:
+                from app.utils.db_setup import init_database
+                init_database()
+            except Exception as e:
+                app.logger.error(f"Error creating database tables: {e}")
+                db.session.rollback()
 
     return app
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models import User
-    return User.query.get(int(user_id))
+    # Retrato em cache do usuário; o User real só é consultado se necessário
+    from app.utils.principal import load_principal
+    return load_principal(int(user_id))
@@ -0,0 +1,325 @@
+"""
+Comandos de linha de comando (flask <comando>) do Sistema Alpha Gestão Documental
+"""
+import click
+from flask.cli import AppGroup, with_appcontext
+
+audit_logs_cli = AppGroup('audit-logs', help='Manutenção dos logs de auditoria.')
+versions_cli = AppGroup('versions', help='Armazenamento de versões de documentos.')
+readings_cli = AppGroup('readings', help='Registro de leituras de documentos.')
+passwords_cli = AppGroup('passwords', help='Política de hash de senhas.')
+db_cli = AppGroup('db', help='Migrações do esquema do banco (Alembic).')
+
+
+@click.command('init-db')
+@click.option('--admin/--no-admin', default=None,
+              help='Cria (ou não) o administrador padrão; por padrão só em desenvolvimento.')
+@click.option('--seed/--no-seed', default=True, show_default=True,
+              help='Cria os grupos e tipos padrão nas tabelas vazias.')
+@with_appcontext
+def init_db(admin, seed):
+    """Aplica as migrações e cria os dados padrão (uma vez por implantação)."""
+    from app.utils.db_setup import init_database
+
+    init_database(create_admin=admin, seed=seed)
+    click.echo('✓ Banco de dados inicializado')
+
+
+@db_cli.command('upgrade')
+@click.argument('revision', default='head')
+def db_upgrade(revision):
+    """Aplica as migrações até a revisão (padrão: head)."""
+    from app.utils.schema import upgrade
+
+    upgrade(revision)
+    click.echo(f'✓ Banco atualizado até {revision}')
+
+
+@db_cli.command('downgrade')
+@click.argument('revision')
+def db_downgrade(revision):
+    """Desfaz as migrações até a revisão informada."""
+    from alembic import command
+    from app.utils.schema import alembic_config
+
+    command.downgrade(alembic_config(), revision)
+
+
+@db_cli.command('stamp')
+@click.argument('revision', default='head')
+def db_stamp(revision):
+    """Marca o banco como estando na revisão, sem executar migrações."""
+    from alembic import command
+    from app.utils.schema import alembic_config
+
+    command.stamp(alembic_config(), revision)
+
+
+@db_cli.command('revision')
+@click.option('-m', '--message', required=True, help='Descrição da migração.')
+@click.option('--autogenerate', is_flag=True, help='Gera as operações comparando modelos e banco.')
+def db_revision(message, autogenerate):
+    """Cria um novo arquivo de migração em migrations/versions."""
+    from alembic import command
+    from app.utils.schema import alembic_config
+
+    command.revision(alembic_config(), message=message, autogenerate=autogenerate)
+
+
+@db_cli.command('current')
+def db_current():
+    """Mostra a revisão atual do banco e a última migração disponível."""
+    from app.utils.schema import current_revisions, head_revisions
+
+    click.echo(f'Banco: {", ".join(sorted(current_revisions())) or "(sem versão)"}')
+    click.echo(f'Última migração: {", ".join(sorted(head_revisions()))}')
+
+
+@db_cli.command('check')
+@click.option('--full', is_flag=True, help='Compara também tabelas, colunas e índices com os modelos.')
+def db_check(full):
+    """Verifica se o banco está atualizado (sai com código 1 se não estiver)."""
+    from app.utils.schema import check_schema
+
+    ok, problemas = check_schema(full=full)
+    for problema in problemas:
+        click.echo(f'✗ {problema}')
+    if not ok:
+        raise SystemExit(1)
+    click.echo('✓ Esquema do banco atualizado')
+
+
+@db_cli.command('index-audit')
+@click.option('--user-id', type=int, required=True, help='Usuário usado para acessar as rotas (ex.: um administrador).')
+@click.option('--sample-id', type=int, default=1, show_default=True,
+              help='Valor dos parâmetros inteiros das rotas (/documents/<id>...).')
+@click.option('--min-rows', type=int, default=1000, show_default=True,
+              help='Ignora tabelas menores (leitura sequencial é barata).')
+@click.option('--verbose', is_flag=True, help='Mostra o SQL completo de cada consulta.')
+def db_index_audit(user_id, sample_id, min_rows, verbose):
+    """Executa as rotas GET, roda EXPLAIN nas consultas e lista predicados sem índice."""
+    from flask import current_app
+    from app.utils.index_audit import audit
+
+    achados, total, falhas = audit(current_app._get_current_object(), user_id, sample_id, min_rows)
+    click.echo(f'{total} consultas distintas analisadas')
+
+    for endpoint, erro in falhas:
+        click.echo(f'  ! {endpoint}: {erro}')
+
+    if not achados:
+        click.echo(f'✓ Nenhuma leitura sequencial com filtro em tabelas com {min_rows}+ linhas')
+        return
+
+    for achado in achados:
+        click.echo(f'\n✗ {achado.tabela} ({achado.linhas} linhas): {achado.detalhe}')
+        click.echo(f'  Rotas: {", ".join(achado.endpoints)}')
+        sql = ' '.join(achado.sql.split())
+        click.echo(f'  SQL: {sql if verbose else sql[:160]}')
+    raise SystemExit(1)
+
+
+@db_cli.command('replica-status')
+def db_replica_status():
+    """Verifica a réplica de leitura (REPLICA_DATABASE_URL) e o atraso de replicação."""
+    from flask import current_app
+    from app import db
+    from app.utils.db_routing import REPLICA_BIND, replica_lag
+
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None:
+        click.echo('Réplica não configurada (REPLICA_DATABASE_URL); relatórios leem do primário')
+        return
+
+    limite = current_app.config['REPLICA_MAX_LAG_SECONDS']
+    try:
+        lag = replica_lag(engine)
+    except Exception as e:
+        click.echo(f'✗ Réplica inacessível: {e}')
+        raise SystemExit(1)
+    if lag > limite:
+        click.echo(f'✗ Atraso de {lag:.1f}s acima do limite de {limite}s; relatórios usarão o primário')
+        raise SystemExit(1)
+    click.echo(f'✓ Réplica em uso, atraso de {lag:.1f}s (limite {limite}s)')
+
+
+@audit_logs_cli.command('partition')
+def audit_logs_partition():
+    """Converte audit_logs em tabela particionada por mês (PostgreSQL)."""
+    from app.utils.audit_partitions import partition_audit_logs
+
+    if partition_audit_logs():
+        click.echo('✓ audit_logs convertida para particionamento mensal')
+    else:
+        click.echo('✓ Nada a converter (tabela já particionada ou banco sem suporte)')
+
+
+@audit_logs_cli.command('maintain')
+@click.option('--retention-months', type=int, default=None,
+              help='Meses mantidos na tabela (padrão: AUDIT_LOG_RETENTION_MONTHS).')
+@click.option('--months-ahead', type=int, default=None,
+              help='Partições futuras a criar (padrão: AUDIT_LOG_PARTITIONS_AHEAD).')
+def audit_logs_maintain(retention_months, months_ahead):
+    """Cria partições futuras e arquiva os logs fora da retenção."""
+    from app.utils.audit_partitions import apply_retention
+
+    result = apply_retention(retention_months=retention_months, months_ahead=months_ahead)
+
+    for nome in result['criadas']:
+        click.echo(f'✓ Partição criada: {nome}')
+    for item in result['arquivados']:
+        click.echo(f"✓ Arquivado: {item['arquivo']} ({item['linhas']} linhas)")
+    if not result['criadas'] and not result['arquivados']:
+        click.echo('✓ Nenhuma manutenção necessária')
+
+
+@audit_logs_cli.command('export')
+@click.option('--format', 'formato', type=click.Choice(['ndjson', 'csv']), default='ndjson')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-',
+              help='Arquivo de saída (padrão: stdout).')
+@click.option('--usuario-id', type=int, default=None)
+@click.option('--acao', default=None)
+@click.option('--recurso', default=None)
+@click.option('--recurso-id', type=int, default=None)
+@click.option('--status', default=None)
+@click.option('--campo', default=None, help='Somente edições que alteraram este campo.')
+@click.option('--desde', default=None, help='AAAA-MM-DD ou data/hora ISO (inclusivo).')
+@click.option('--ate', default=None, help='AAAA-MM-DD ou data/hora ISO (inclusivo).')
+def audit_logs_export(formato, output, **kwargs):
+    """Exporta logs de auditoria filtrados em NDJSON ou CSV."""
+    from app.utils.audit_query import InvalidFilterError, parse_filters, stream_ndjson, stream_csv
+
+    try:
+        filters = parse_filters(kwargs)
+    except InvalidFilterError as e:
+        raise click.BadParameter(str(e))
+
+    generator = stream_ndjson(filters) if formato == 'ndjson' else stream_csv(filters)
+    for chunk in generator:
+        output.write(chunk)
+
+
+@versions_cli.command('compact')
+@click.option('--document-id', type=int, default=None, help='Compactar apenas este documento.')
+def versions_compact(document_id):
+    """Regrava as versões existentes como snapshots periódicos + deltas."""
+    from app import db
+    from app.models import DocumentVersion
+    from app.utils.version_store import compact_document
+
+    if document_id:
+        documentos = [document_id]
+    else:
+        documentos = [row[0] for row in db.session.query(DocumentVersion.documento_id).distinct()]
+
+    total_antes = total_depois = 0
+    for documento_id in documentos:
+        versoes, antes, depois = compact_document(documento_id)
+        total_antes += antes
+        total_depois += depois
+        click.echo(f'✓ Documento #{documento_id}: {versoes} versões, {antes} -> {depois} bytes')
+
+    click.echo(f'✓ Total: {total_antes} -> {total_depois} bytes')
+
+
+@versions_cli.command('sync-current')
+def versions_sync_current():
+    """Preenche documents.versao_atual_id e lista versões duplicadas."""
+    from app.utils.version_store import sync_current_versions
+
+    atualizados, duplicadas = sync_current_versions()
+    if atualizados is None:
+        click.echo('✗ Coluna documents.versao_atual_id ausente; execute "flask db upgrade" e repita')
+    else:
+        click.echo(f'✓ {atualizados} documentos com ponteiro de versão atual preenchido')
+    if duplicadas:
+        click.echo('✗ Versões duplicadas impedem o índice único (documento_id, versao):')
+        for documento_id, versao in duplicadas:
+            click.echo(f'  documento #{documento_id}, versão {versao}')
+    else:
+        click.echo('✓ Sem versões duplicadas; o índice único é criado por "flask db upgrade"')
+
+
+@readings_cli.command('deduplicate')
+def readings_deduplicate():
+    """Remove leituras duplicadas antes do índice único de leituras."""
+    from app.utils.reading_tracker import deduplicate_readings
+
+    removidas = deduplicate_readings()
+    click.echo(f'✓ {removidas} leituras duplicadas removidas')
+    click.echo('✓ Execute "flask db upgrade" para criar o índice único (documento_id, usuario_id, versao_lida)')
+
+
+@readings_cli.command('coverage-view')
+def readings_coverage_view():
+    """Cria a materialized view de cobertura de leitura (PostgreSQL)."""
+    from app.utils.read_coverage import create_summary_view
+
+    if create_summary_view():
+        click.echo('✓ Materialized view read_coverage_summary criada')
+    else:
+        click.echo('✓ Banco sem suporte; o resumo é calculado na consulta')
+
+
+@readings_cli.command('refresh-coverage')
+def readings_refresh_coverage():
+    """Atualiza a materialized view de cobertura de leitura."""
+    from app.utils.read_coverage import refresh_summary
+
+    if refresh_summary():
+        click.echo('✓ read_coverage_summary atualizada')
+    else:
+        click.echo('✓ Nada a atualizar (view inexistente ou atualização em andamento)')
+
+
+@passwords_cli.command('benchmark')
+@click.option('--algorithm', 'algoritmo', type=click.Choice(['scrypt', 'pbkdf2']), default=None,
+              help='Algoritmo a calibrar (padrão: o da configuração).')
+@click.option('--target-ms', 'alvo_ms', type=int, default=250, show_default=True,
+              help='Latência desejada por verificação de senha.')
+@click.option('--rounds', 'rodadas', type=int, default=3, show_default=True, help='Repetições por medição.')
+def passwords_benchmark(algoritmo, alvo_ms, rodadas):
+    """Mede o custo do hash nesta máquina e sugere o fator de trabalho."""
+    from app.models import User
+    from app.utils.password_hashing import calibrate, needs_rehash, policy, time_hash
+
+    atual_algoritmo, atual_fator = policy()
+    algoritmo = algoritmo or atual_algoritmo
+    click.echo(f'Política atual: {atual_algoritmo}, fator {atual_fator} '
+               f'({time_hash(atual_algoritmo, atual_fator, rodadas) * 1000:.0f} ms)')
+
+    sugerido, medicoes = calibrate(algoritmo, alvo_ms, rodadas)
+    for fator, ms in medicoes:
+        click.echo(f'  {algoritmo} fator {fator}: {ms:.0f} ms')
+
+    click.echo(f'✓ Sugerido para ~{alvo_ms} ms: PASSWORD_HASH_ALGORITHM={algoritmo} '
+               f'PASSWORD_HASH_WORK_FACTOR={sugerido}')
+
+    abaixo = sum(1 for (pwhash,) in User.query.with_entities(User.password_hash) if needs_rehash(pwhash))
+    click.echo(f'✓ {abaixo} usuários com hash abaixo da política atual (refeitos no próximo login)')
+
+
+@passwords_cli.command('build-breached-filter')
+@click.argument('origem', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', 'destino', default=None, help='Arquivo gerado (padrão: BREACHED_PASSWORDS_FILE).')
+@click.option('--fp-rate', 'taxa', type=float, default=0.001, show_default=True,
+              help='Taxa de falso positivo desejada.')
+def passwords_build_breached_filter(origem, destino, taxa):
+    """Gera o filtro de Bloom de senhas vazadas a partir de uma lista (texto ou SHA-1)."""
+    from flask import current_app
+    from app.utils.breached_passwords import build_filter
+
+    destino = destino or current_app.config['BREACHED_PASSWORDS_FILE']
+    itens, tamanho = build_filter(origem, destino, taxa)
+    click.echo(f'✓ {itens} senhas em {destino} ({tamanho / 1024 / 1024:.1f} MB)')
+    click.echo('  Reinicie os workers para carregar o novo filtro')
+
+
+def register_commands(app):
+    """Registra os comandos de CLI na aplicação"""
+    app.cli.add_command(init_db)
+    app.cli.add_command(audit_logs_cli)
+    app.cli.add_command(versions_cli)
+    app.cli.add_command(readings_cli)
+    app.cli.add_command(passwords_cli)
+    app.cli.add_command(db_cli)
@@ -4,8 +4,17 @@ Modelos de dados para o Sistema Alpha Gestão Documental
 from datetime import datetime, timedelta
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from sqlalchemy.dialects.postgresql import JSONB
 from app import db
+from app.utils.permissions import Capability, has_capability
+
+
+def _partial_index(nome, *colunas, where):
+    """Índice parcial; where='ativo' vira 'ativo = 1' no SQLite (forma usada pelo ORM)"""
+    sqlite_where = 'ativo = 1' if where == 'ativo' else where
+    return db.Index(nome, *colunas, postgresql_where=db.text(where), sqlite_where=db.text(sqlite_where))
+
 
 class Group(db.Model):
     """Modelo de grupos/setores dinâmicos"""
@@ -125,28 +134,38 @@ class User(UserMixin, db.Model):
     aprovacoes = db.relationship('ApprovalFlow', backref='responsavel', lazy='dynamic')
 
     def set_password(self, password):
-        """Define senha com hash"""
-        self.password_hash = generate_password_hash(password)
+        """Define senha com hash (algoritmo e custo da política configurada)"""
+        from app.utils.password_hashing import hash_password
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Verifica senha"""
         return check_password_hash(self.password_hash, password)
 
+    def password_needs_rehash(self):
+        """Verifica se o hash gravado está abaixo da política atual"""
+        from app.utils.password_hashing import needs_rehash
+        return needs_rehash(self.password_hash)
+
+    def has_capability(self, capability):
+        """Verifica se o perfil inclui a capacidade (ver app/utils/permissions.py)"""
+        return has_capability(self, capability)
+
     def can_create_documents(self):
         """Verifica se pode criar documentos"""
-        return self.perfil in ['administrador', 'gestor_qualidade']
+        return self.has_capability(Capability.CREATE_DOCUMENTS)
 
     def can_approve_documents(self):
         """Verifica se pode aprovar documentos"""
-        return self.perfil in ['administrador', 'gestor_qualidade', 'aprovador_revisor']
+        return self.has_capability(Capability.APPROVE_DOCUMENTS)
 
     def can_admin(self):
         """Verifica se tem permissões administrativas"""
-        return self.perfil == 'administrador'
+        return self.has_capability(Capability.ADMIN)
 
     def is_admin(self):
         """Verifica se o usuário é administrador (alias para can_admin)"""
-        return self.perfil == 'administrador'
+        return self.can_admin()
     
     def generate_reset_token(self):
         """Gera token para reset de senha"""
@@ -174,8 +193,19 @@ class User(UserMixin, db.Model):
 class Document(db.Model):
     """Modelo de documento"""
     __tablename__ = 'documents'
+    # Índices das consultas de listagem, painéis e alertas (migração 0002)
+    __table_args__ = (
+        db.Index('ix_documents_autor_data_criacao', 'autor_id', 'data_criacao'),
+        db.Index('ix_documents_status', 'status'),
+        _partial_index('ix_documents_tipo_ativos', 'tipo', where='ativo'),
+        _partial_index('ix_documents_data_validade_ativos', 'data_validade', where='ativo'),
+        _partial_index('ix_documents_data_criacao_ativos', 'data_criacao', where='ativo'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    # Revisão do registro, conferida e incrementada a cada UPDATE (ver app/utils/concurrency.py)
+    revisao = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': revisao}
     codigo = db.Column(db.String(50), unique=True, nullable=False)
     titulo = db.Column(db.String(200), nullable=False)
     tipo = db.Column(db.String(50), nullable=False)  # procedimento, instrucao, politica, etc (mantido para compatibilidade)
@@ -190,16 +220,29 @@ class Document(db.Model):
     palavras_chave = db.Column(db.Text)
     resumo = db.Column(db.Text)
     ativo = db.Column(db.Boolean, default=True)
+    # Ponteiro direto para a versão atual (mantido junto com versao_atual)
+    versao_atual_id = db.Column(db.Integer, db.ForeignKey('document_versions.id', use_alter=True,
+                                                          name='fk_documents_versao_atual_id'))
 
     # Relacionamentos
-    versoes = db.relationship('DocumentVersion', backref='documento', lazy='dynamic', cascade='all, delete-orphan')
+    versoes = db.relationship('DocumentVersion', backref='documento', lazy='dynamic', cascade='all, delete-orphan',
+                              foreign_keys='DocumentVersion.documento_id')
+    versao_corrente = db.relationship('DocumentVersion', foreign_keys=[versao_atual_id], post_update=True)
     leituras = db.relationship('DocumentReading', backref='documento', lazy='dynamic', cascade='all, delete-orphan')
     fluxos_aprovacao = db.relationship('ApprovalFlow', backref='documento', lazy='dynamic', cascade='all, delete-orphan')
 
     def get_current_version(self):
         """Retorna a versão atual do documento"""
+        if self.versao_atual_id is not None:
+            return self.versao_corrente
+        # Documentos anteriores ao ponteiro versao_atual_id
         return self.versoes.filter_by(versao=self.versao_atual).first()
 
+    def set_current_version(self, version):
+        """Define a versão atual, mantendo versao_atual e versao_atual_id em sincronia"""
+        self.versao_atual = version.versao
+        self.versao_corrente = version
+
     def is_expired(self):
         """Verifica se o documento está vencido"""
         if self.data_validade:
@@ -219,11 +262,21 @@ class Document(db.Model):
 class DocumentVersion(db.Model):
     """Modelo de versão de documento"""
     __tablename__ = 'document_versions'
+    __table_args__ = (
+        db.Index('ux_document_versions_documento_versao', 'documento_id', 'versao', unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     documento_id = db.Column(db.Integer, db.ForeignKey('documents.id'), nullable=False)
     versao = db.Column(db.String(10), nullable=False)
-    conteudo = db.Column(db.Text, nullable=False)
+    # Conteúdo completo nos snapshots; vazio nas versões guardadas como delta.
+    # Use sempre a propriedade conteudo (ver app/utils/version_store.py).
+    _conteudo = db.column_property(db.Column('conteudo', db.Text, nullable=False), active_history=True)
+    base_versao_id = db.Column(db.Integer, db.ForeignKey('document_versions.id'))  # Snapshot de referência do delta
+    delta = db.Column(db.LargeBinary)  # Diferença comprimida (zlib) em relação ao snapshot
+    # Revisão do conteúdo: incrementada a cada alteração e conferida no UPDATE
+    # (controle otimista de concorrência do salvamento automático)
+    revisao = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     changelog = db.Column(db.Text)
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     criado_por_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -231,6 +284,34 @@ class DocumentVersion(db.Model):
 
     # Relacionamento
     criado_por = db.relationship('User', backref='versoes_criadas')
+    base_versao = db.relationship('DocumentVersion', remote_side=[id])
+
+    __mapper_args__ = {
+        'version_id_col': revisao,
+        'version_id_generator': False,
+    }
+
+    @property
+    def is_snapshot(self):
+        """Verifica se a versão guarda o conteúdo completo"""
+        return self.delta is None
+
+    @property
+    def conteudo(self):
+        """Conteúdo HTML da versão (reconstruído a partir do delta se preciso)"""
+        if self.delta is not None:
+            from app.utils.version_store import materialize
+            return materialize(self)
+        return self._conteudo
+
+    @conteudo.setter
+    def conteudo(self, value):
+        # Grava como snapshot; o listener before_flush decide se vira delta
+        self._conteudo = value
+        self.delta = None
+        self.base_versao_id = None
+        self.revisao = (self.revisao or 0) + 1
+        self._conteudo_alterado = True
 
     def __repr__(self):
         return f'<DocumentVersion {self.versao} of {self.documento_id}>'
@@ -238,6 +319,11 @@ class DocumentVersion(db.Model):
 class ApprovalFlow(db.Model):
     """Modelo de fluxo de aprovação"""
     __tablename__ = 'approval_flows'
+    __table_args__ = (
+        db.Index('ix_approval_flows_responsavel_status', 'responsavel_id', 'status', 'data_atribuicao'),
+        db.Index('ix_approval_flows_documento_id', 'documento_id'),
+        _partial_index('ix_approval_flows_prazo_pendentes', 'prazo', where="status = 'pendente'"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     documento_id = db.Column(db.Integer, db.ForeignKey('documents.id'), nullable=False)
@@ -262,6 +348,13 @@ class ApprovalFlow(db.Model):
 class DocumentReading(db.Model):
     """Modelo de confirmação de leitura"""
     __tablename__ = 'document_readings'
+    __table_args__ = (
+        # Uma leitura por usuário e versão; base do INSERT ... ON CONFLICT DO NOTHING
+        db.Index('ux_document_readings_documento_usuario_versao', 'documento_id', 'usuario_id', 'versao_lida',
+                 unique=True),
+        db.Index('ix_document_readings_usuario_documento', 'usuario_id', 'documento_id'),
+        db.Index('ix_document_readings_data_leitura', 'data_leitura'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     documento_id = db.Column(db.Integer, db.ForeignKey('documents.id'), nullable=False)
@@ -277,8 +370,16 @@ class DocumentReading(db.Model):
 class NonConformity(db.Model):
     """Modelo de não conformidade (CAPA)"""
     __tablename__ = 'non_conformities'
+    __table_args__ = (
+        db.Index('ix_non_conformities_status_criticidade', 'status', 'criticidade'),
+        _partial_index('ix_non_conformities_data_prazo_abertas', 'data_prazo', where="status <> 'fechada'"),
+        db.Index('ix_non_conformities_responsavel_id', 'responsavel_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    # Revisão do registro, conferida e incrementada a cada UPDATE (ver app/utils/concurrency.py)
+    revisao = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': revisao}
     codigo = db.Column(db.String(50), unique=True, nullable=False)
     titulo = db.Column(db.String(200), nullable=False)
     descricao = db.Column(db.Text, nullable=False)
@@ -354,6 +455,9 @@ class Audit(db.Model):
     __tablename__ = 'audits'
 
     id = db.Column(db.Integer, primary_key=True)
+    # Revisão do registro, conferida e incrementada a cada UPDATE (ver app/utils/concurrency.py)
+    revisao = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': revisao}
     codigo = db.Column(db.String(50), unique=True, nullable=False)
     titulo = db.Column(db.String(200), nullable=False)
     tipo = db.Column(db.String(50), nullable=False)  # interna, externa, certificacao
@@ -459,8 +563,15 @@ class DocumentSignature(db.Model):
 class Equipment(db.Model):
     """Modelo de equipamentos"""
     __tablename__ = 'equipments'
+    __table_args__ = (
+        _partial_index('ix_equipments_proxima_calibracao_ativos', 'data_proxima_calibracao', where='ativo'),
+        _partial_index('ix_equipments_proxima_manutencao_ativos', 'data_proxima_manutencao', where='ativo'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    # Revisão do registro, conferida e incrementada a cada UPDATE (ver app/utils/concurrency.py)
+    revisao = db.Column(db.Integer, nullable=False, server_default='1')
+    __mapper_args__ = {'version_id_col': revisao}
     codigo = db.Column(db.String(50), unique=True, nullable=False)
     nome = db.Column(db.String(200), nullable=False)
     tipo = db.Column(db.String(50), nullable=False)  # medicao, teste, producao, seguranca, etc (mantido para compatibilidade)
@@ -550,6 +661,10 @@ class ServiceRecord(db.Model):
 class EmailNotification(db.Model):
     """Modelo de notificações por email"""
     __tablename__ = 'email_notifications'
+    __table_args__ = (
+        _partial_index('ix_email_notifications_pendentes', 'data_criacao', where="status = 'pendente'"),
+        db.Index('ix_email_notifications_destinatario_id', 'destinatario_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     destinatario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -571,9 +686,34 @@ class EmailNotification(db.Model):
     def __repr__(self):
         return f'<EmailNotification {self.tipo} to user {self.destinatario_id}>'
 
+class CodeSequence(db.Model):
+    """Contador de códigos sequenciais por prefixo e ano (NC-2025-0001, AUD-2025-0001...)"""
+    __tablename__ = 'code_sequences'
+
+    prefixo = db.Column(db.String(20), primary_key=True)
+    ano = db.Column(db.Integer, primary_key=True)
+    ultimo_valor = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CodeSequence {self.prefixo}-{self.ano}: {self.ultimo_valor}>'
+
+
 class AuditLog(db.Model):
     """Modelo de log de auditoria para rastrear ações do sistema"""
     __tablename__ = 'audit_logs'
+    # Índices compostos para as consultas típicas de auditoria (por período,
+    # por usuário e por recurso). Em PostgreSQL a tabela é particionada por
+    # mês em data_acao (ver app/utils/audit_partitions.py).
+    __table_args__ = (
+        db.Index('ix_audit_logs_data_acao', 'data_acao'),
+        db.Index('ix_audit_logs_usuario_data', 'usuario_id', 'data_acao'),
+        db.Index('ix_audit_logs_recurso_data', 'recurso', 'recurso_id', 'data_acao'),
+        db.Index('ix_audit_logs_acao_data', 'acao', 'data_acao'),
+        db.Index('ix_audit_logs_status_data', 'status', 'data_acao'),
+        # GIN para consultas "quem alterou o campo X" (alteracoes ? 'campo')
+        db.Index('ix_audit_logs_alteracoes', 'alteracoes',
+                 postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
@@ -585,6 +725,9 @@ class AuditLog(db.Model):
     user_agent = db.Column(db.Text, nullable=True)
     status = db.Column(db.String(20), default='sucesso')  # sucesso, falha, erro
     data_acao = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Diferenças por campo nas edições: {"campo": [valor_antigo, valor_novo]}
+    alteracoes = db.Column(db.JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), 'postgresql'),
+                           nullable=True)
     
     # Relacionamento
     usuario = db.relationship('User', backref='logs_auditoria')
@@ -594,9 +737,13 @@ class AuditLog(db.Model):
     
     @staticmethod
     def registrar_acao(usuario_id, acao, recurso=None, recurso_id=None, 
-                      detalhes=None, ip_address=None, user_agent=None, status='sucesso'):
+                      detalhes=None, ip_address=None, user_agent=None, status='sucesso',
+                      commit=True):
         """
         Registra uma ação de auditoria
+
+        Com commit=False o log apenas entra na sessão e é gravado na mesma
+        transação da ação que está sendo registrada.
         """
         log = AuditLog(
             usuario_id=usuario_id,
@@ -610,6 +757,7 @@ class AuditLog(db.Model):
         )
         
         db.session.add(log)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         
         return log
\ No newline at end of file
@@ -3,8 +3,10 @@ Rotas de aprovação para o Sistema Alpha Gestão Documental
 """
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
-from app.models import ApprovalFlow, Document, User
+from app.models import ApprovalFlow, Document, DocumentVersion, User
 from app import db
+from app.utils.version_diff import render_version_diff
+from sqlalchemy.orm import joinedload
 from datetime import datetime
 
 bp = Blueprint('approvals', __name__)
@@ -113,7 +115,9 @@ def reject(id):
 @login_required
 def view(id):
     """Visualizar aprovação"""
-    approval = ApprovalFlow.query.get_or_404(id)
+    approval = ApprovalFlow.query.options(
+        joinedload(ApprovalFlow.documento).joinedload(Document.versao_corrente)
+    ).get_or_404(id)
     
     if approval.responsavel_id != current_user.id and not current_user.can_admin():
         flash('Você não tem permissão para visualizar esta aprovação.', 'error')
@@ -122,7 +126,20 @@ def view(id):
     document = approval.documento
     current_version = document.get_current_version()
     
+    # Alterações em relação à versão anterior, destacadas para o revisor
+    versao_anterior = None
+    alteracoes_html = None
+    if current_version:
+        versao_anterior = DocumentVersion.query.filter(
+            DocumentVersion.documento_id == document.id,
+            DocumentVersion.id < current_version.id
+        ).order_by(DocumentVersion.id.desc()).first()
+        if versao_anterior:
+            alteracoes_html = render_version_diff(versao_anterior, current_version)
+    
     return render_template('approvals/view.html', 
                          approval=approval,
                          document=document,
-                         current_version=current_version)
\ No newline at end of file
+                         current_version=current_version,
+                         versao_anterior=versao_anterior,
+                         alteracoes_html=alteracoes_html)
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Rotas de consulta aos logs de auditoria - Sistema Alpha Gestão Documental
+"""
+from datetime import datetime
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_login import login_required, current_user
+from app.utils.permissions import Capability
+from app.utils.audit_query import (InvalidFilterError, parse_filters, fetch_page,
+                                   stream_ndjson, stream_csv, DEFAULT_PAGE_SIZE)
+
+bp = Blueprint('audit_logs', __name__)
+
+
+def _can_view_audit_logs():
+    """Administradores e auditores podem consultar os logs"""
+    return current_user.has_capability(Capability.VIEW_AUDIT_LOGS)
+
+
+@bp.route('/api')
+@login_required
+def search():
+    """Consulta paginada por cursor (JSON)"""
+    if not _can_view_audit_logs():
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    try:
+        filters = parse_filters(request.args)
+        itens, next_cursor = fetch_page(
+            filters,
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        )
+    except InvalidFilterError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify({
+        'success': True,
+        'items': itens,
+        'next_cursor': next_cursor
+    })
+
+
+@bp.route('/export/<format>')
+@login_required
+def export(format):
+    """Exportação em streaming (NDJSON ou CSV) para revisões de compliance"""
+    if not _can_view_audit_logs():
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    try:
+        filters = parse_filters(request.args)
+    except InvalidFilterError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    if format == 'ndjson':
+        generator, mimetype, extension = stream_ndjson(filters), 'application/x-ndjson', 'ndjson'
+    elif format == 'csv':
+        generator, mimetype, extension = stream_csv(filters), 'text/csv; charset=utf-8', 'csv'
+    else:
+        return jsonify({'success': False, 'error': 'Formato de exportação inválido'}), 400
+
+    response = Response(stream_with_context(generator), content_type=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="audit_logs_{timestamp}.{extension}"'
+    return response
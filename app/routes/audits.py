@@ -4,7 +4,11 @@ Rotas para módulo de auditorias internas - Sistema Alpha Gestão Documental
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
 from app.models import Audit, AuditChecklist, AuditFinding, User
+from app.utils.concurrency import conflict_response, is_stale
+from app.utils.permissions import Capability, users_with
+from app.utils.sequences import next_code
 from app import db
+from app.utils.db_routing import replica_reads
 from datetime import datetime, timedelta
 from sqlalchemy import func, extract
 import uuid
@@ -72,11 +76,7 @@ def create():
         data_fim = request.form.get('data_fim')
         
         # Gerar código único
-        ano = datetime.now().year
-        count = Audit.query.filter(
-            Audit.codigo.like(f'AUD-{ano}-%')
-        ).count() + 1
-        codigo = f"AUD-{ano}-{count:04d}"
+        codigo = next_code('AUD', Audit.codigo)
         
         auditoria = Audit(
             codigo=codigo,
@@ -100,7 +100,7 @@ def create():
     # Buscar usuários que podem ser auditores
     auditores = User.query.filter(
         User.ativo == True,
-        User.perfil.in_(['administrador', 'gestor_qualidade', 'auditor'])
+        users_with(Capability.LEAD_AUDITS)
     ).order_by(User.nome_completo).all()
     
     return render_template('audits/create.html', auditores=auditores)
@@ -144,6 +144,9 @@ def edit(id):
         return redirect(url_for('audits.view', id=id))
     
     if request.method == 'POST':
+        if is_stale(auditoria):
+            return conflict_response(auditoria, url_for('audits.edit', id=id))
+
         auditoria.titulo = request.form.get('titulo')
         auditoria.tipo = request.form.get('tipo')
         auditoria.escopo = request.form.get('escopo')
@@ -168,7 +171,7 @@ def edit(id):
     
     auditores = User.query.filter(
         User.ativo == True,
-        User.perfil.in_(['administrador', 'gestor_qualidade', 'auditor'])
+        users_with(Capability.LEAD_AUDITS)
     ).order_by(User.nome_completo).all()
     
     return render_template('audits/edit.html', auditoria=auditoria, auditores=auditores)
@@ -276,6 +279,7 @@ def update_finding(finding_id):
 
 @bp.route('/reports')
 @login_required
+@replica_reads
 def reports():
     """Relatórios de auditorias"""
     if not current_user.can_admin():
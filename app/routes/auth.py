@@ -1,16 +1,36 @@
 """
 Rotas de autenticação para o Sistema Alpha Gestão Documental
 """
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from app.models import User
 from app import db
 from app.utils.notifications import create_notification
 from app.utils.password_validator import PasswordValidator
 from app.utils.audit_logger import log_user_action
+from app.utils import rate_limit
 
 bp = Blueprint('auth', __name__)
 
+
+def _email_key(email):
+    return (email or '').strip().lower()
+
+
+def _throttled(regra_ip, regra_email, email):
+    """Aplica os limites por IP e por e-mail; retorna a espera em segundos (0 se liberado)"""
+    for resultado in (rate_limit.check(regra_ip), rate_limit.check(regra_email, _email_key(email))):
+        if not resultado.permitido:
+            current_app.logger.warning(f'Limite {regra_ip}/{regra_email} excedido: {rate_limit.client_ip()} {email}')
+            return resultado.retry_after
+    return 0
+
+
+def _wait_message(segundos):
+    minutos = max(1, (segundos + 59) // 60)
+    return f'Muitas tentativas. Aguarde {minutos} minuto(s) e tente novamente.'
+
+
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Página de login"""
@@ -22,20 +42,28 @@ def login():
         password = request.form.get('password')
         remember = bool(request.form.get('remember'))
         
+        # Limite de tentativas antes de consultar o usuário e calcular o hash
+        espera = _throttled('login_ip', 'login_email', email)
+        if espera:
+            flash(_wait_message(espera), 'error')
+            return render_template('auth/login.html'), 429
+        
         user = User.query.filter_by(email=email).first()
         
         if user and user.check_password(password) and user.ativo:
+            rate_limit.limiter.reset('login_email', _email_key(email))
             login_user(user, remember=remember)
             flash('Login realizado com sucesso!', 'success')
             
-            # Atualizar último login
+            # Atualizar último login e registrar auditoria no mesmo commit
             from datetime import datetime
             user.ultimo_login = datetime.utcnow()
+            if user.password_needs_rehash():
+                # Hash antigo ou abaixo da política: refeito com a senha recém-validada
+                user.set_password(password)
+            log_user_action('login', usuario_id=user.id, commit=False)
             db.session.commit()
             
-            # Log de auditoria
-            log_user_action('login', usuario_id=user.id)
-            
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('dashboard.index'))
         else:
@@ -99,6 +127,12 @@ def forgot_password():
     
     if request.method == 'POST':
         email = request.form.get('email')
+        
+        espera = _throttled('forgot_password_ip', 'forgot_password_email', email)
+        if espera:
+            flash(_wait_message(espera), 'error')
+            return render_template('auth/forgot_password.html'), 429
+        
         user = User.query.filter_by(email=email, ativo=True).first()
         
         if user:
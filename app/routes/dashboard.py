@@ -5,12 +5,14 @@ from flask import Blueprint, render_template, redirect, url_for
 from flask_login import login_required, current_user
 from app.models import Document, User, NonConformity, Audit, ApprovalFlow
 from app import db
+from app.utils.db_routing import replica_reads
 from datetime import datetime, timedelta
 
 bp = Blueprint('dashboard', __name__)
 
 @bp.route('/')
 @login_required
+@replica_reads
 def index():
     """Dashboard principal com KPIs avançados"""
     # Estatísticas gerais
@@ -5,19 +5,17 @@ Rotas para gestão de tipos de documentos dinâmicos
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app import db
-from app.models import DocumentType, AuditLog
+from app.models import DocumentType
+from app.utils.permissions import Capability, requires
 import re
 
 bp = Blueprint('document_types', __name__, url_prefix='/document-types')
 
 @bp.route('/')
 @login_required
+@requires(Capability.ADMIN, redirect_to='documents.index')
 def index():
     """Lista de tipos de documentos"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('documents.index'))
-    
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     
@@ -41,12 +39,9 @@ def index():
 
 @bp.route('/create', methods=['GET', 'POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='documents.index')
 def create():
     """Criar novo tipo de documento"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('documents.index'))
-    
     if request.method == 'POST':
         try:
             nome = request.form['nome'].strip()
@@ -77,16 +72,6 @@ def create():
             db.session.add(document_type)
             db.session.commit()
             
-            # Log de auditoria
-            AuditLog.registrar_acao(
-                usuario_id=current_user.id,
-                acao='CRIAR_TIPO_DOCUMENTO',
-                recurso='document_type',
-                recurso_id=document_type.id,
-                detalhes=f'Tipo de documento criado: {codigo} - {nome}',
-                ip_address=request.remote_addr
-            )
-            
             flash('Tipo de documento criado com sucesso!', 'success')
             return redirect(url_for('document_types.index'))
             
@@ -98,12 +83,9 @@ def create():
 
 @bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='documents.index')
 def edit(id):
     """Editar tipo de documento"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('documents.index'))
-    
     document_type = DocumentType.query.get_or_404(id)
     
     if request.method == 'POST':
@@ -115,16 +97,6 @@ def edit(id):
             
             db.session.commit()
             
-            # Log de auditoria
-            AuditLog.registrar_acao(
-                usuario_id=current_user.id,
-                acao='EDITAR_TIPO_DOCUMENTO',
-                recurso='document_type',
-                recurso_id=document_type.id,
-                detalhes=f'Tipo de documento editado: {document_type.codigo} - {document_type.nome}',
-                ip_address=request.remote_addr
-            )
-            
             flash('Tipo de documento atualizado com sucesso!', 'success')
             return redirect(url_for('document_types.index'))
             
@@ -136,12 +108,9 @@ def edit(id):
 
 @bp.route('/<int:id>/delete', methods=['POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='documents.index')
 def delete(id):
     """Excluir tipo de documento"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('documents.index'))
-    
     document_type = DocumentType.query.get_or_404(id)
     
     # Verificar se há documentos usando este tipo
@@ -153,16 +122,6 @@ def delete(id):
         document_type.ativo = False
         db.session.commit()
         
-        # Log de auditoria
-        AuditLog.registrar_acao(
-            usuario_id=current_user.id,
-            acao='EXCLUIR_TIPO_DOCUMENTO',
-            recurso='document_type',
-            recurso_id=document_type.id,
-            detalhes=f'Tipo de documento excluído: {document_type.codigo} - {document_type.nome}',
-            ip_address=request.remote_addr
-        )
-        
         flash('Tipo de documento excluído com sucesso!', 'success')
         
     except Exception as e:
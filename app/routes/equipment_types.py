@@ -5,7 +5,7 @@ Rotas para gestão de tipos de equipamentos
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app import db
-from app.models import EquipmentType, AuditLog
+from app.models import EquipmentType
 
 bp = Blueprint('equipment_types', __name__, url_prefix='/equipment_types')
 
@@ -67,18 +67,6 @@ def create():
             db.session.add(tipo)
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='CRIAR_TIPO_EQUIPAMENTO',
-                entidade_tipo='equipment_type',
-                entidade_id=tipo.id,
-                detalhes=f'Tipo de equipamento criado: {tipo.codigo} - {tipo.nome}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Tipo de equipamento criado com sucesso!', 'success')
             return redirect(url_for('equipment_types.index'))
             
@@ -121,18 +109,6 @@ def edit(id):
             
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='EDITAR_TIPO_EQUIPAMENTO',
-                entidade_tipo='equipment_type',
-                entidade_id=tipo.id,
-                detalhes=f'Tipo de equipamento editado: {tipo.codigo} - {tipo.nome}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Tipo de equipamento atualizado com sucesso!', 'success')
             return redirect(url_for('equipment_types.index'))
             
@@ -164,18 +140,6 @@ def delete(id):
         tipo.ativo = False
         db.session.commit()
         
-        # Log de auditoria
-        audit_log = AuditLog(
-            usuario_id=current_user.id,
-            acao='EXCLUIR_TIPO_EQUIPAMENTO',
-            entidade_tipo='equipment_type',
-            entidade_id=tipo.id,
-            detalhes=f'Tipo de equipamento excluído: {tipo.codigo} - {tipo.nome}',
-            ip_address=request.remote_addr
-        )
-        db.session.add(audit_log)
-        db.session.commit()
-        
         flash('Tipo de equipamento excluído com sucesso!', 'success')
         
     except Exception as e:
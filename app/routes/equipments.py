@@ -5,8 +5,12 @@ Rotas para gestão de equipamentos e serviços
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.orm.exc import StaleDataError
 from app import db
-from app.models import Equipment, ServiceRecord, User, AuditLog, EquipmentType
+from app.models import Equipment, ServiceRecord, User, EquipmentType
+from app.utils.concurrency import conflict_response, is_stale
+from app.utils.sequences import next_code
+from app.utils.db_routing import replica_reads
 
 bp = Blueprint('equipments', __name__, url_prefix='/equipments')
 
@@ -83,7 +87,7 @@ def create():
     if request.method == 'POST':
         try:
             equipment = Equipment(
-                codigo=request.form['codigo'].strip(),
+                codigo=request.form.get('codigo', '').strip() or next_code('EQP', Equipment.codigo),
                 nome=request.form['nome'].strip(),
                 tipo=request.form.get('tipo', 'geral'),  # Mantido para compatibilidade
                 tipo_equipamento_id=request.form.get('tipo_equipamento_id') or None,
@@ -116,18 +120,6 @@ def create():
             db.session.add(equipment)
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='CRIAR_EQUIPAMENTO',
-                entidade_tipo='equipment',
-                entidade_id=equipment.id,
-                detalhes=f'Equipamento criado: {equipment.codigo} - {equipment.nome}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Equipamento criado com sucesso!', 'success')
             return redirect(url_for('equipments.view', id=equipment.id))
             
@@ -163,6 +155,9 @@ def edit(id):
         return redirect(url_for('equipments.view', id=id))
     
     if request.method == 'POST':
+        if is_stale(equipment):
+            return conflict_response(equipment, url_for('equipments.edit', id=id))
+
         try:
             equipment.codigo = request.form['codigo'].strip()
             equipment.nome = request.form['nome'].strip()
@@ -204,21 +199,11 @@ def edit(id):
             
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='EDITAR_EQUIPAMENTO',
-                entidade_tipo='equipment',
-                entidade_id=equipment.id,
-                detalhes=f'Equipamento editado: {equipment.codigo} - {equipment.nome}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Equipamento atualizado com sucesso!', 'success')
             return redirect(url_for('equipments.view', id=equipment.id))
             
+        except StaleDataError:
+            return conflict_response(equipment, url_for('equipments.edit', id=id))
         except Exception as e:
             db.session.rollback()
             flash(f'Erro ao atualizar equipamento: {str(e)}', 'error')
@@ -241,18 +226,6 @@ def delete(id):
         equipment.ativo = False
         db.session.commit()
         
-        # Log de auditoria
-        audit_log = AuditLog(
-            usuario_id=current_user.id,
-            acao='EXCLUIR_EQUIPAMENTO',
-            entidade_tipo='equipment',
-            entidade_id=equipment.id,
-            detalhes=f'Equipamento excluído: {equipment.codigo} - {equipment.nome}',
-            ip_address=request.remote_addr
-        )
-        db.session.add(audit_log)
-        db.session.commit()
-        
         flash('Equipamento excluído com sucesso!', 'success')
         return redirect(url_for('equipments.index'))
         
@@ -297,18 +270,6 @@ def create_service(id):
             
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='CRIAR_SERVICO',
-                entidade_tipo='service_record',
-                entidade_id=service.id,
-                detalhes=f'Serviço criado: {service.tipo_servico} para equipamento {equipment.codigo}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Registro de serviço criado com sucesso!', 'success')
             return redirect(url_for('equipments.view', id=id))
             
@@ -352,18 +313,6 @@ def edit_service(service_id):
             
             db.session.commit()
             
-            # Log de auditoria
-            audit_log = AuditLog(
-                usuario_id=current_user.id,
-                acao='EDITAR_SERVICO',
-                entidade_tipo='service_record',
-                entidade_id=service.id,
-                detalhes=f'Serviço editado: {service.tipo_servico} para equipamento {equipment.codigo}',
-                ip_address=request.remote_addr
-            )
-            db.session.add(audit_log)
-            db.session.commit()
-            
             flash('Registro de serviço atualizado com sucesso!', 'success')
             return redirect(url_for('equipments.view', id=equipment.id))
             
@@ -376,6 +325,7 @@ def edit_service(service_id):
 
 @bp.route('/reports')
 @login_required
+@replica_reads
 def reports():
     """Relatórios de equipamentos"""
     if not current_user.can_admin():
@@ -5,19 +5,17 @@ Rotas para gestão de grupos/setores - Sistema Alpha Gestão Documental
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
 from app import db
-from app.models import Group, User, DocumentType, AuditLog
+from app.models import Group, User, DocumentType
+from app.utils.permissions import Capability, requires, users_with
 import re
 
 bp = Blueprint('groups', __name__, url_prefix='/groups')
 
 @bp.route('/')
 @login_required
+@requires(Capability.ADMIN)
 def index():
     """Lista de grupos/setores"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('dashboard.index'))
-    
     page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     
@@ -41,12 +39,9 @@ def index():
 
 @bp.route('/create', methods=['GET', 'POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='groups.index')
 def create():
     """Criar novo grupo/setor"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('groups.index'))
-    
     if request.method == 'POST':
         try:
             nome = request.form['nome'].strip()
@@ -81,16 +76,6 @@ def create():
             db.session.add(group)
             db.session.commit()
             
-            # Log de auditoria
-            AuditLog.registrar_acao(
-                usuario_id=current_user.id,
-                acao='CRIAR_GRUPO',
-                recurso='group',
-                recurso_id=group.id,
-                detalhes=f'Grupo criado: {codigo} - {nome}',
-                ip_address=request.remote_addr
-            )
-            
             flash('Grupo/setor criado com sucesso!', 'success')
             return redirect(url_for('groups.index'))
             
@@ -102,12 +87,9 @@ def create():
 
 @bp.route('/<int:id>/edit', methods=['GET', 'POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='groups.index')
 def edit(id):
     """Editar grupo/setor"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('groups.index'))
-    
     group = Group.query.get_or_404(id)
     
     if request.method == 'POST':
@@ -130,16 +112,6 @@ def edit(id):
             
             db.session.commit()
             
-            # Log de auditoria
-            AuditLog.registrar_acao(
-                usuario_id=current_user.id,
-                acao='EDITAR_GRUPO',
-                recurso='group',
-                recurso_id=group.id,
-                detalhes=f'Grupo editado: {group.codigo} - {group.nome}',
-                ip_address=request.remote_addr
-            )
-            
             flash('Grupo/setor atualizado com sucesso!', 'success')
             return redirect(url_for('groups.view', id=id))
             
@@ -154,12 +126,9 @@ def edit(id):
 
 @bp.route('/<int:id>')
 @login_required
+@requires(Capability.ADMIN, redirect_to='groups.index')
 def view(id):
     """Visualizar grupo/setor"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('groups.index'))
-    
     group = Group.query.get_or_404(id)
     users = User.query.filter_by(grupo_id=id, ativo=True).all()
     
@@ -167,12 +136,9 @@ def view(id):
 
 @bp.route('/<int:id>/delete', methods=['POST'])
 @login_required
+@requires(Capability.ADMIN, redirect_to='groups.index')
 def delete(id):
     """Excluir grupo/setor"""
-    if not current_user.can_admin():
-        flash('Acesso negado.', 'error')
-        return redirect(url_for('groups.index'))
-    
     group = Group.query.get_or_404(id)
     
     # Verificar se há usuários no grupo
@@ -184,16 +150,6 @@ def delete(id):
         group.ativo = False
         db.session.commit()
         
-        # Log de auditoria
-        AuditLog.registrar_acao(
-            usuario_id=current_user.id,
-            acao='EXCLUIR_GRUPO',
-            recurso='group',
-            recurso_id=group.id,
-            detalhes=f'Grupo excluído: {group.codigo} - {group.nome}',
-            ip_address=request.remote_addr
-        )
-        
         flash('Grupo/setor excluído com sucesso!', 'success')
         
     except Exception as e:
@@ -218,6 +174,6 @@ def api_get_groups():
 def get_potential_responsaveis():
     """Obter usuários que podem ser responsáveis por grupos"""
     return User.query.filter(
-        User.perfil.in_(['administrador', 'gestor_qualidade', 'aprovador_revisor']),
+        users_with(Capability.APPROVE_DOCUMENTS),
         User.ativo == True
     ).order_by(User.nome_completo).all()
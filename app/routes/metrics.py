@@ -0,0 +1,52 @@
+"""
+Rotas de métricas operacionais - Sistema Alpha Gestão Documental
+"""
+import hmac
+import os
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_login import current_user
+
+from app import db
+from app.utils.permissions import Capability
+
+bp = Blueprint('metrics', __name__)
+
+
+def _authorized():
+    """Token METRICS_TOKEN (coletores) ou administrador autenticado"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        informado = request.headers.get('Authorization', '')
+        if informado.startswith('Bearer ') and hmac.compare_digest(informado[7:], token):
+            return True
+    return current_user.is_authenticated and current_user.has_capability(Capability.ADMIN)
+
+
+@bp.route('')
+def prometheus():
+    """Métricas no formato texto do Prometheus (todos os workers)"""
+    if not _authorized():
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    from app.utils.metrics import render_metrics
+    conteudo, content_type = render_metrics()
+    return Response(conteudo, content_type=content_type)
+
+
+@bp.route('/pool')
+def pool():
+    """Estado e contadores do pool de conexões deste processo (JSON)"""
+    if not _authorized():
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    from app.utils.db_pool import pool_metrics, pool_status
+    from app.utils.db_routing import replica_status
+    return jsonify({
+        'success': True,
+        'pid': os.getpid(),
+        'dialect': db.engine.dialect.name,
+        'pool': pool_status(db.engine),
+        'metrics': pool_metrics.snapshot(),
+        'replica': replica_status(),
+    })
@@ -4,7 +4,10 @@ Rotas para gestão de não conformidades (CAPA) - Sistema Alpha Gestão Document
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
 from app.models import NonConformity, CorrectiveAction, User, Document
+from app.utils.concurrency import conflict_response, is_stale
+from app.utils.sequences import next_code
 from app import db
+from app.utils.db_routing import replica_reads
 from datetime import datetime, timedelta
 from sqlalchemy import func
 import uuid
@@ -74,11 +77,7 @@ def create():
         data_prazo = request.form.get('data_prazo')
         
         # Gerar código único
-        ano = datetime.now().year
-        count = NonConformity.query.filter(
-            NonConformity.codigo.like(f'NC-{ano}-%')
-        ).count() + 1
-        codigo = f"NC-{ano}-{count:04d}"
+        codigo = next_code('NC', NonConformity.codigo)
         
         nc = NonConformity(
             codigo=codigo,
@@ -128,6 +127,9 @@ def edit(id):
         return redirect(url_for('nonconformities.view', id=id))
     
     if request.method == 'POST':
+        if is_stale(nc):
+            return conflict_response(nc, url_for('nonconformities.edit', id=id))
+
         nc.titulo = request.form.get('titulo')
         nc.descricao = request.form.get('descricao')
         nc.tipo = request.form.get('tipo')
@@ -215,6 +217,7 @@ def update_action(action_id):
 
 @bp.route('/reports')
 @login_required
+@replica_reads
 def reports():
     """Relatórios de não conformidades"""
     if not current_user.can_admin():
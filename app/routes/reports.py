@@ -1,10 +1,12 @@
 """
 Rotas para dashboard de relatórios - Sistema Alpha Gestão Documental
 """
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, request, jsonify, Response, stream_with_context
 from flask_login import login_required, current_user
 from app.models import Document, User, NonConformity, Audit, ApprovalFlow
 from app import db
+from app.utils.db_routing import replica_reads
+from app.utils.permissions import Capability
 from datetime import datetime, timedelta
 from sqlalchemy import func
 
@@ -12,6 +14,7 @@ bp = Blueprint('reports', __name__)
 
 @bp.route('/')
 @login_required
+@replica_reads
 def index():
     """Dashboard de relatórios"""
     # Documentos
@@ -83,4 +86,49 @@ def index():
                          ncs_abertas_mes=ncs_abertas_mes,
                          auditorias_mes=auditorias_mes,
                          categorias=categorias,
-                         data_atual=datetime.utcnow())
\ No newline at end of file
+                         data_atual=datetime.utcnow())
+
+
+@bp.route('/read-coverage')
+@login_required
+def read_coverage():
+    """Cobertura de leitura por grupo ou tipo de documento (JSON)"""
+    if not current_user.has_capability(Capability.MANAGE_QUALITY):
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    from app.utils import read_coverage as coverage
+
+    grupo_id = request.args.get('grupo_id', type=int)
+    tipo_documento_id = request.args.get('tipo_documento_id', type=int)
+
+    resultado = {
+        'success': True,
+        'resumo': coverage.coverage_summary(grupo_id, tipo_documento_id)
+    }
+    if request.args.get('matriz'):
+        resultado['matriz'] = coverage.coverage_matrix(grupo_id, tipo_documento_id)
+    if request.args.get('pendentes'):
+        resultado['pendentes'] = coverage.pending_readings(grupo_id, tipo_documento_id)
+    return jsonify(resultado)
+
+
+@bp.route('/read-coverage/export')
+@login_required
+def read_coverage_export():
+    """Exportação CSV da matriz de leitura (usuário x documento)"""
+    if not current_user.has_capability(Capability.MANAGE_QUALITY):
+        return jsonify({'success': False, 'error': 'Acesso negado'}), 403
+
+    from app.utils.read_coverage import stream_csv
+
+    grupo_id = request.args.get('grupo_id', type=int)
+    generator = stream_csv(
+        grupo_id,
+        request.args.get('tipo_documento_id', type=int),
+        pending_only=bool(request.args.get('pendentes'))
+    )
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+    sufixo = f'_grupo_{grupo_id}' if grupo_id else ''
+    response = Response(stream_with_context(generator), content_type='text/csv; charset=utf-8')
+    response.headers['Content-Disposition'] = f'attachment; filename="cobertura_leitura{sufixo}_{timestamp}.csv"'
+    return response
@@ -4,7 +4,9 @@ Rotas para assinatura digital de documentos - Sistema Alpha Gestão Documental
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
 from app.models import Document, DocumentSignature
+from app.utils.permissions import visible_documents
 from app.utils.signatures import DigitalSignatureManager
+from app.utils.rate_limit import rate_limited
 from app import db
 import json
 
@@ -14,7 +16,9 @@ bp = Blueprint('signatures', __name__)
 @login_required
 def sign_document(document_id):
     """Assinar documento digitalmente"""
-    document = Document.query.get_or_404(document_id)
+    document = Document.query.filter(
+        Document.id == document_id, visible_documents(current_user)
+    ).first_or_404()
     
     # Verificar se usuário pode assinar
     if not current_user.can_approve_documents():
@@ -47,7 +51,9 @@ def sign_document(document_id):
 @login_required
 def document_signatures(document_id):
     """Listar assinaturas de um documento"""
-    document = Document.query.get_or_404(document_id)
+    document = Document.query.filter(
+        Document.id == document_id, visible_documents(current_user)
+    ).first_or_404()
     signatures = DigitalSignatureManager.get_document_signatures(document_id)
     
     return render_template('signatures/document_signatures.html',
@@ -55,6 +61,7 @@ def document_signatures(document_id):
                          signatures=signatures)
 
 @bp.route('/verify/<int:signature_id>')
+@rate_limited('verify_signature')
 def verify_signature(signature_id):
     """Verificar validade de uma assinatura (acesso público)"""
     is_valid, message = DigitalSignatureManager.verify_signature(signature_id)
@@ -72,6 +79,9 @@ def verify_signature(signature_id):
 @login_required
 def export_certificate(signature_id):
     """Exportar certificado de assinatura"""
+    DocumentSignature.query.join(Document).filter(
+        DocumentSignature.id == signature_id, visible_documents(current_user)
+    ).first_or_404()
     certificate_data, message = DigitalSignatureManager.export_signature_certificate(signature_id)
     
     if certificate_data:
@@ -1,15 +1,87 @@
 """
 Utilitário para logs de auditoria do Sistema Alpha Gestão Documental
+
+Há dois caminhos de registro, ambos gravando na mesma transação da ação:
+
+* log_user_action(): eventos explícitos (login, logout, troca de senha...)
+* listener after_flush: criação, edição e exclusão dos modelos listados em
+  AUDITED_MODELS são registradas automaticamente a cada flush, com um único
+  INSERT em lote, sem commits extras nas rotas.
+
+Nas edições, o listener também grava em audit_logs.alteracoes apenas os
+campos alterados, no formato {"campo": [valor_antigo, valor_novo]}, lidos
+do histórico de atributos do SQLAlchemy (sem snapshot da linha inteira).
 """
-from flask import request
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import request, has_request_context
 from flask_login import current_user
+from sqlalchemy import event, inspect
 import json
 
+from app.utils.metrics import AUDIT_FLUSH_ENTRIES
+
+
+# Modelos auditados automaticamente:
+# nome da classe -> (recurso, sufixo da ação, rótulo, gênero do rótulo)
+AUDITED_MODELS = {
+    'Document': ('document', 'DOCUMENTO', 'Documento', 'm'),
+    'NonConformity': ('non_conformity', 'NAO_CONFORMIDADE', 'Não conformidade', 'f'),
+    'Audit': ('audit', 'AUDITORIA', 'Auditoria', 'f'),
+    'User': ('user', 'USUARIO', 'Usuário', 'm'),
+    'Equipment': ('equipment', 'EQUIPAMENTO', 'Equipamento', 'm'),
+    'ServiceRecord': ('service_record', 'SERVICO', 'Serviço', 'm'),
+    'EquipmentType': ('equipment_type', 'TIPO_EQUIPAMENTO', 'Tipo de equipamento', 'm'),
+    'DocumentType': ('document_type', 'TIPO_DOCUMENTO', 'Tipo de documento', 'm'),
+    'Group': ('group', 'GRUPO', 'Grupo', 'm'),
+}
+
+ACTION_PREFIXES = {
+    'create': ('CRIAR', {'m': 'criado', 'f': 'criada'}),
+    'update': ('EDITAR', {'m': 'editado', 'f': 'editada'}),
+    'delete': ('EXCLUIR', {'m': 'excluído', 'f': 'excluída'}),
+}
 
-def log_user_action(acao, recurso=None, recurso_id=None, detalhes=None, status='sucesso', usuario_id=None):
+# Campos registrados como alterados, mas sem expor os valores
+MASKED_FIELDS = {
+    'User': {'password_hash', 'reset_token', 'reset_token_expiry'},
+}
+MASKED_VALUE = '***'
+
+# Campos ignorados no diff (mudam a cada uso e não interessam à auditoria)
+IGNORED_FIELDS = {
+    'User': {'ultimo_login'},
+    # Contador do controle otimista de concorrência
+    'Document': {'revisao'},
+    'NonConformity': {'revisao'},
+    'Audit': {'revisao'},
+    'Equipment': {'revisao'},
+}
+
+# Textos longos são truncados para manter o diff compacto
+MAX_VALUE_LENGTH = 500
+
+
+def get_request_info():
+    """
+    Retorna (usuario_id, ip_address, user_agent) da requisição atual.
+    Fora de uma requisição (CLI, scripts) todos os valores são None.
+    """
+    if not has_request_context():
+        return None, None, None
+
+    usuario_id = current_user.id if current_user.is_authenticated else None
+    ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
+    user_agent = request.headers.get('User-Agent', '')[:500]  # Limitar tamanho
+    return usuario_id, ip_address, user_agent
+
+
+def log_user_action(acao, recurso=None, recurso_id=None, detalhes=None, status='sucesso', usuario_id=None,
+                    commit=True):
     """
     Registra uma ação do usuário no log de auditoria
-    
+
     Args:
         acao: Tipo de ação (login, create_user, update_password, etc.)
         recurso: Tipo de recurso afetado (user, document, etc.)
@@ -17,23 +89,22 @@ def log_user_action(acao, recurso=None, recurso_id=None, detalhes=None, status='
         detalhes: Detalhes adicionais (dict será convertido para JSON)
         status: Status da ação (sucesso, falha, erro)
         usuario_id: ID do usuário (usar current_user se None)
+        commit: Se False, o log entra na transação corrente e é gravado
+            junto com o próximo commit da rota
     """
     try:
         # Importar aqui para evitar importação circular
         from app.models import AuditLog
-        
-        # Obter ID do usuário
-        if usuario_id is None and current_user.is_authenticated:
-            usuario_id = current_user.id
-        
+
         # Obter dados da requisição
-        ip_address = request.environ.get('HTTP_X_FORWARDED_FOR', request.environ.get('REMOTE_ADDR'))
-        user_agent = request.headers.get('User-Agent', '')[:500]  # Limitar tamanho
-        
+        request_usuario_id, ip_address, user_agent = get_request_info()
+        if usuario_id is None:
+            usuario_id = request_usuario_id
+
         # Converter detalhes para JSON se for dict
         if isinstance(detalhes, dict):
             detalhes = json.dumps(detalhes, ensure_ascii=False)
-        
+
         # Registrar log
         AuditLog.registrar_acao(
             usuario_id=usuario_id,
@@ -43,10 +114,136 @@ def log_user_action(acao, recurso=None, recurso_id=None, detalhes=None, status='
             detalhes=detalhes,
             ip_address=ip_address,
             user_agent=user_agent,
-            status=status
+            status=status,
+            commit=commit
         )
-        
+
     except Exception as e:
         # Log de auditoria não deve quebrar a aplicação
         from flask import current_app
-        current_app.logger.error(f"Erro ao registrar log de auditoria: {str(e)}")
\ No newline at end of file
+        current_app.logger.error(f"Erro ao registrar log de auditoria: {str(e)}")
+
+
+def _describe(obj):
+    """Descrição curta do registro para o campo detalhes"""
+    codigo = getattr(obj, 'codigo', None) or getattr(obj, 'username', None)
+    nome = (getattr(obj, 'nome', None) or getattr(obj, 'titulo', None)
+            or getattr(obj, 'nome_completo', None))
+    if codigo and nome:
+        return f'{codigo} - {nome}'
+    if obj.__class__.__name__ == 'ServiceRecord':
+        return f'{obj.tipo_servico} para equipamento #{obj.equipamento_id}'
+    return codigo or nome or f'#{obj.id}'
+
+
+def _is_soft_delete(obj):
+    """Verifica se o flush desativou o registro (ativo: True -> False)"""
+    attrs = inspect(obj).attrs
+    if 'ativo' not in attrs.keys():
+        return False
+    history = attrs.ativo.history
+    return bool(history.deleted) and history.deleted[0] and obj.ativo is False
+
+
+def _serialize_value(value):
+    """Converte o valor de uma coluna para JSON"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, str) and len(value) > MAX_VALUE_LENGTH:
+        return value[:MAX_VALUE_LENGTH] + '…'
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def collect_changes(obj):
+    """
+    Retorna {campo: [antigo, novo]} com as colunas alteradas no flush.
+
+    Returns:
+        dict vazio se nenhuma coluna relevante mudou
+    """
+    nome_modelo = obj.__class__.__name__
+    mascarados = MASKED_FIELDS.get(nome_modelo, set())
+    ignorados = IGNORED_FIELDS.get(nome_modelo, set())
+    state = inspect(obj)
+
+    changes = {}
+    for attr in state.mapper.column_attrs:
+        if attr.key in ignorados:
+            continue
+        history = state.attrs[attr.key].history
+        if not history.has_changes():
+            continue
+
+        antigo = history.deleted[0] if history.deleted else None
+        novo = history.added[0] if history.added else None
+        if antigo == novo:
+            continue
+
+        if attr.key in mascarados:
+            changes[attr.key] = [MASKED_VALUE, MASKED_VALUE]
+        else:
+            changes[attr.key] = [_serialize_value(antigo), _serialize_value(novo)]
+    return changes
+
+
+def collect_audit_entries(session):
+    """Monta as linhas de audit_logs para os objetos auditados do flush"""
+    entries = []
+
+    def add(obj, operacao, alteracoes=None):
+        recurso, sufixo, rotulo, genero = AUDITED_MODELS[obj.__class__.__name__]
+        prefixo, verbos = ACTION_PREFIXES[operacao]
+        entries.append({
+            'acao': f'{prefixo}_{sufixo}',
+            'recurso': recurso,
+            'recurso_id': obj.id,
+            'detalhes': f'{rotulo} {verbos[genero]}: {_describe(obj)}',
+            'alteracoes': alteracoes or None,
+        })
+
+    for obj in session.new:
+        if obj.__class__.__name__ in AUDITED_MODELS:
+            add(obj, 'create')
+
+    for obj in session.dirty:
+        if obj.__class__.__name__ not in AUDITED_MODELS:
+            continue
+        if not session.is_modified(obj, include_collections=False):
+            continue
+        alteracoes = collect_changes(obj)
+        if not alteracoes:
+            # Só mudaram campos ignorados (ex.: último login)
+            continue
+        add(obj, 'delete' if _is_soft_delete(obj) else 'update', alteracoes)
+
+    for obj in session.deleted:
+        if obj.__class__.__name__ in AUDITED_MODELS:
+            add(obj, 'delete')
+
+    return entries
+
+
+def _after_flush(session, flush_context):
+    """Grava os logs dos modelos auditados na mesma transação do flush"""
+    entries = collect_audit_entries(session)
+    if not entries:
+        return
+
+    from app.models import AuditLog
+
+    usuario_id, ip_address, user_agent = get_request_info()
+    for entry in entries:
+        entry.update(usuario_id=usuario_id, ip_address=ip_address, user_agent=user_agent)
+
+    session.connection().execute(AuditLog.__table__.insert(), entries)
+    AUDIT_FLUSH_ENTRIES.observe(len(entries))
+
+
+def init_audit_listeners(session):
+    """Registra o listener de auditoria automática (idempotente)"""
+    if not event.contains(session, 'after_flush', _after_flush):
+        event.listen(session, 'after_flush', _after_flush)
@@ -0,0 +1,353 @@
+"""
+Particionamento mensal e retenção dos logs de auditoria - Alpha Gestão Documental
+
+Em PostgreSQL a tabela audit_logs é particionada por faixa (RANGE) de
+data_acao, com uma partição por mês e uma partição DEFAULT de segurança.
+A rotina de retenção arquiva as partições antigas em arquivos JSON Lines
+compactados (gzip) e depois as desanexa e remove, mantendo a tabela
+"quente" com tamanho limitado. Em SQLite (desenvolvimento) não há
+particionamento: a retenção arquiva e apaga as linhas antigas em lotes.
+"""
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import inspect, text
+
+from app import db
+
+TABLE_NAME = 'audit_logs'
+DEFAULT_PARTITION = f'{TABLE_NAME}_default'
+COLUMNS = ('id', 'usuario_id', 'acao', 'recurso', 'recurso_id', 'detalhes',
+           'ip_address', 'user_agent', 'status', 'data_acao', 'alteracoes')
+PARTITION_RE = re.compile(rf'^{TABLE_NAME}_y(\d{{4}})m(\d{{2}})$')
+DELETE_BATCH_SIZE = 5000
+
+
+def is_postgres(connection=None):
+    """Verifica se o banco configurado é PostgreSQL"""
+    bind = connection if connection is not None else db.engine
+    return bind.dialect.name == 'postgresql'
+
+
+def add_months(ano, mes, delta):
+    """Soma (ou subtrai) meses a um par (ano, mês)"""
+    total = ano * 12 + (mes - 1) + delta
+    return total // 12, total % 12 + 1
+
+
+def partition_name(ano, mes):
+    """Nome da partição mensal, ex.: audit_logs_y2025m09"""
+    return f'{TABLE_NAME}_y{ano:04d}m{mes:02d}'
+
+
+def month_range(ano, mes):
+    """Limites [início, fim) do mês como datetime"""
+    prox_ano, prox_mes = add_months(ano, mes, 1)
+    return datetime(ano, mes, 1), datetime(prox_ano, prox_mes, 1)
+
+
+def get_archive_folder():
+    """Pasta onde os arquivos de logs arquivados são gravados"""
+    folder = current_app.config.get('AUDIT_LOG_ARCHIVE_FOLDER', 'audit_archive')
+    if not os.path.isabs(folder):
+        folder = os.path.join(current_app.instance_path, folder)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def is_partitioned(connection):
+    """Verifica se audit_logs já é uma tabela particionada"""
+    return connection.execute(text("""
+        SELECT 1
+        FROM pg_partitioned_table pt
+        JOIN pg_class c ON c.oid = pt.partrelid
+        WHERE c.relname = :nome
+    """), {'nome': TABLE_NAME}).first() is not None
+
+
+def list_partitions(connection):
+    """Lista as partições mensais anexadas como tuplas (ano, mês, nome)"""
+    rows = connection.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :nome
+        ORDER BY c.relname
+    """), {'nome': TABLE_NAME})
+
+    partitions = []
+    for (relname,) in rows:
+        match = PARTITION_RE.match(relname)
+        if match:
+            partitions.append((int(match.group(1)), int(match.group(2)), relname))
+    return partitions
+
+
+def create_month_partition(connection, ano, mes):
+    """
+    Cria a partição do mês caso não exista.
+
+    A partição é criada como tabela avulsa, recebe as linhas do mês que
+    tenham caído na partição DEFAULT e só então é anexada, evitando o erro
+    de sobreposição que o CREATE TABLE ... PARTITION OF geraria.
+
+    Returns:
+        bool: True se a partição foi criada agora
+    """
+    nome = partition_name(ano, mes)
+    exists = connection.execute(text('SELECT to_regclass(:nome)'), {'nome': nome}).scalar()
+    if exists:
+        return False
+
+    inicio, fim = month_range(ano, mes)
+    params = {'inicio': inicio, 'fim': fim}
+
+    connection.execute(text(
+        f'CREATE TABLE {nome} (LIKE {TABLE_NAME} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    ))
+    connection.execute(text(f"""
+        WITH movidas AS (
+            DELETE FROM {DEFAULT_PARTITION}
+            WHERE data_acao >= :inicio AND data_acao < :fim
+            RETURNING *
+        )
+        INSERT INTO {nome} SELECT * FROM movidas
+    """), params)
+    connection.execute(text(
+        f"ALTER TABLE {TABLE_NAME} ATTACH PARTITION {nome} "
+        f"FOR VALUES FROM ('{inicio:%Y-%m-%d}') TO ('{fim:%Y-%m-%d}')"
+    ))
+    return True
+
+
+def ensure_partitions(connection, meses_adiante=None):
+    """Garante partições do mês corrente até N meses à frente"""
+    if meses_adiante is None:
+        meses_adiante = current_app.config.get('AUDIT_LOG_PARTITIONS_AHEAD', 3)
+
+    hoje = datetime.utcnow()
+    criadas = []
+    for delta in range(meses_adiante + 1):
+        ano, mes = add_months(hoje.year, hoje.month, delta)
+        if create_month_partition(connection, ano, mes):
+            criadas.append(partition_name(ano, mes))
+    return criadas
+
+
+def _ensure_columns(connection):
+    """Adiciona à tabela existente as colunas do modelo AuditLog que faltarem"""
+    from app.models import AuditLog
+    existentes = {col['name'] for col in inspect(connection).get_columns(TABLE_NAME)}
+    for column in AuditLog.__table__.columns:
+        if column.name not in existentes:
+            tipo = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {TABLE_NAME} ADD COLUMN {column.name} {tipo}'))
+
+
+def _ensure_indexes(connection):
+    """Cria os índices definidos no modelo AuditLog que ainda não existam"""
+    from app.models import AuditLog
+    for index in AuditLog.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def partition_audit_logs():
+    """
+    Converte audit_logs em tabela particionada por mês (PostgreSQL).
+
+    A conversão roda em uma única transação: a tabela atual é renomeada,
+    a nova tabela particionada é criada com chave primária (id, data_acao),
+    as partições necessárias são criadas e os dados são copiados. Em outros
+    bancos apenas garante as colunas e os índices do modelo.
+
+    Returns:
+        bool: True se a tabela foi convertida nesta execução
+    """
+    with db.engine.begin() as connection:
+        _ensure_columns(connection)
+        if not is_postgres(connection):
+            _ensure_indexes(connection)
+            return False
+
+        if is_partitioned(connection):
+            _ensure_indexes(connection)
+            ensure_partitions(connection)
+            return False
+
+        legacy = f'{TABLE_NAME}_legacy'
+        connection.execute(text(f'ALTER TABLE {TABLE_NAME} RENAME TO {legacy}'))
+        connection.execute(text(
+            f'ALTER TABLE {legacy} RENAME CONSTRAINT {TABLE_NAME}_pkey TO {legacy}_pkey'
+        ))
+        from app.models import AuditLog
+        for index in AuditLog.__table__.indexes:
+            connection.execute(text(
+                f'ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_legacy'
+            ))
+
+        connection.execute(text(
+            f'CREATE TABLE {TABLE_NAME} (LIKE {legacy} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE (data_acao)'
+        ))
+        connection.execute(text(f'ALTER TABLE {TABLE_NAME} ADD PRIMARY KEY (id, data_acao)'))
+        connection.execute(text(
+            f'ALTER TABLE {TABLE_NAME} ADD CONSTRAINT {TABLE_NAME}_usuario_id_fkey '
+            f'FOREIGN KEY (usuario_id) REFERENCES users(id)'
+        ))
+        connection.execute(text(f'ALTER SEQUENCE {TABLE_NAME}_id_seq OWNED BY {TABLE_NAME}.id'))
+        connection.execute(text(
+            f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT'
+        ))
+        _ensure_indexes(connection)
+
+        # Partições para todo o histórico existente
+        primeiro = connection.execute(text(f'SELECT MIN(data_acao) FROM {legacy}')).scalar()
+        if primeiro:
+            hoje = datetime.utcnow()
+            ano, mes = primeiro.year, primeiro.month
+            while (ano, mes) <= (hoje.year, hoje.month):
+                create_month_partition(connection, ano, mes)
+                ano, mes = add_months(ano, mes, 1)
+        ensure_partitions(connection)
+
+        colunas = ', '.join(COLUMNS)
+        connection.execute(text(
+            f'INSERT INTO {TABLE_NAME} ({colunas}) SELECT {colunas} FROM {legacy}'
+        ))
+        connection.execute(text(f'DROP TABLE {legacy}'))
+
+    current_app.logger.info('Tabela audit_logs convertida para particionamento mensal')
+    return True
+
+
+def _serialize_row(row):
+    """Converte uma linha de audit_logs em dict serializável em JSON"""
+    data = dict(row._mapping)
+    # SQLite devolve datas como texto nas consultas text()
+    if isinstance(data.get('data_acao'), datetime):
+        data['data_acao'] = data['data_acao'].isoformat()
+    return data
+
+
+def _archive_path(folder, nome):
+    """Caminho único do arquivo (carimbo de data/hora): nunca sobrescreve um arquivo anterior"""
+    return os.path.join(folder, f'{nome}_{datetime.utcnow():%Y%m%dT%H%M%S%f}.jsonl.gz')
+
+
+def _write_archive(connection, path, query, params=None):
+    """
+    Grava o resultado da consulta em JSON Lines compactado; retorna nº de linhas.
+    Um arquivo existente nunca é substituído (FileExistsError).
+    """
+    if os.path.exists(path):
+        raise FileExistsError(path)
+
+    tmp_path = f'{path}.tmp'
+    count = 0
+    try:
+        result = connection.execution_options(stream_results=True).execute(text(query), params or {})
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as fh:
+            for row in result:
+                fh.write(json.dumps(_serialize_row(row), ensure_ascii=False))
+                fh.write('\n')
+                count += 1
+        os.rename(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return count
+
+
+def _archive_partitions(cutoff, folder):
+    """Arquiva, desanexa e remove as partições anteriores ao mês de corte"""
+    arquivados = []
+    colunas = ', '.join(COLUMNS)
+
+    with db.engine.connect() as connection:
+        partitions = [p for p in list_partitions(connection) if (p[0], p[1]) < cutoff]
+
+    for ano, mes, nome in partitions:
+        path = _archive_path(folder, nome)
+        with db.engine.connect() as connection:
+            linhas = _write_archive(
+                connection, path,
+                f'SELECT {colunas} FROM {nome} ORDER BY data_acao, id'
+            )
+
+        with db.engine.begin() as connection:
+            connection.execute(text(f'ALTER TABLE {TABLE_NAME} DETACH PARTITION {nome}'))
+            connection.execute(text(f'DROP TABLE {nome}'))
+
+        arquivados.append({'particao': nome, 'arquivo': path, 'linhas': linhas})
+        current_app.logger.info(f'Partição {nome} arquivada em {path} ({linhas} linhas)')
+
+    return arquivados
+
+
+def _archive_rows(cutoff, folder):
+    """Arquiva e remove em lotes as linhas anteriores ao corte (sem particionamento)"""
+    limite = datetime(cutoff[0], cutoff[1], 1)
+    colunas = ', '.join(COLUMNS)
+
+    with db.engine.connect() as connection:
+        # Nada a arquivar: nenhum arquivo é criado (nem substituído)
+        if connection.execute(text(f'SELECT 1 FROM {TABLE_NAME} WHERE data_acao < :limite LIMIT 1'),
+                              {'limite': limite}).first() is None:
+            return []
+
+        path = _archive_path(folder, f'{TABLE_NAME}_ate_{limite:%Y%m}')
+        linhas = _write_archive(
+            connection, path,
+            f'SELECT {colunas} FROM {TABLE_NAME} WHERE data_acao < :limite ORDER BY data_acao, id',
+            {'limite': limite}
+        )
+
+    while True:
+        with db.engine.begin() as connection:
+            removidas = connection.execute(text(f"""
+                DELETE FROM {TABLE_NAME} WHERE id IN (
+                    SELECT id FROM {TABLE_NAME} WHERE data_acao < :limite LIMIT :lote
+                )
+            """), {'limite': limite, 'lote': DELETE_BATCH_SIZE}).rowcount
+        if removidas < DELETE_BATCH_SIZE:
+            break
+
+    current_app.logger.info(f'{linhas} logs de auditoria arquivados em {path}')
+    return [{'particao': None, 'arquivo': path, 'linhas': linhas}]
+
+
+def apply_retention(retention_months=None, months_ahead=None):
+    """
+    Rotina de manutenção dos logs de auditoria.
+
+    Cria as partições futuras e arquiva/remove os dados mais antigos que o
+    período de retenção configurado.
+
+    Returns:
+        dict: {'criadas': [...], 'arquivados': [...]}
+    """
+    if retention_months is None:
+        retention_months = current_app.config.get('AUDIT_LOG_RETENTION_MONTHS', 24)
+
+    hoje = datetime.utcnow()
+    cutoff = add_months(hoje.year, hoje.month, -retention_months)
+    folder = get_archive_folder()
+
+    criadas = []
+    with db.engine.begin() as connection:
+        partitioned = is_postgres(connection) and is_partitioned(connection)
+        if partitioned:
+            criadas = ensure_partitions(connection, months_ahead)
+
+    if partitioned:
+        arquivados = _archive_partitions(cutoff, folder)
+    else:
+        arquivados = _archive_rows(cutoff, folder)
+
+    return {'criadas': criadas, 'arquivados': arquivados}
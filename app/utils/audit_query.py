@@ -0,0 +1,197 @@
+"""
+Consulta e exportação de logs de auditoria - Alpha Gestão Documental
+
+Os filtros (usuário, ação, recurso, status e período) casam com os índices
+compostos de audit_logs, sempre ordenados por (data_acao, id) decrescente.
+A paginação é por cursor (keyset): cada página continua a partir do último
+par (data_acao, id) visto, sem OFFSET, mantendo custo constante mesmo em
+tabelas com milhões de linhas.
+
+O filtro "campo" responde "quem alterou o campo X": em PostgreSQL usa o
+operador ? do JSONB, atendido pelo índice GIN de audit_logs.alteracoes.
+"""
+import base64
+import csv
+import io
+import json
+import re
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import AuditLog
+
+EXPORT_COLUMNS = ('id', 'data_acao', 'usuario_id', 'acao', 'recurso', 'recurso_id',
+                  'status', 'ip_address', 'user_agent', 'detalhes', 'alteracoes')
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 2000
+CAMPO_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+class InvalidFilterError(ValueError):
+    """Filtro ou cursor inválido informado na consulta"""
+
+
+def _parse_datetime(value, end_of_day=False):
+    """Aceita AAAA-MM-DD ou data/hora ISO 8601"""
+    try:
+        if len(value) == 10:
+            parsed = datetime.strptime(value, '%Y-%m-%d')
+            return parsed + timedelta(days=1) if end_of_day else parsed
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise InvalidFilterError(f'Data inválida: {value}')
+
+
+def parse_filters(args):
+    """
+    Converte parâmetros (request.args ou opções da CLI) em filtros.
+
+    Parâmetros aceitos: usuario_id, acao, recurso, recurso_id, status,
+    desde (inclusivo), ate (inclusivo; só a data cobre o dia inteiro) e
+    campo (nome da coluna alterada).
+    """
+    filters = {}
+
+    for key in ('usuario_id', 'recurso_id'):
+        value = args.get(key)
+        if value not in (None, ''):
+            try:
+                filters[key] = int(value)
+            except (TypeError, ValueError):
+                raise InvalidFilterError(f'{key} deve ser numérico')
+
+    for key in ('acao', 'recurso', 'status'):
+        value = args.get(key)
+        if value:
+            filters[key] = value
+
+    if args.get('campo'):
+        if not CAMPO_RE.match(args['campo']):
+            raise InvalidFilterError('campo inválido')
+        filters['campo'] = args['campo']
+
+    if args.get('desde'):
+        filters['desde'] = _parse_datetime(args['desde'])
+    if args.get('ate'):
+        # Só a data: limite exclusivo no dia seguinte; data/hora: inclusivo
+        filters['ate'] = _parse_datetime(args['ate'], end_of_day=True)
+        filters['ate_inclusivo'] = len(args['ate']) != 10
+
+    return filters
+
+
+def encode_cursor(data_acao, log_id):
+    """Gera cursor opaco a partir do último item da página"""
+    raw = f'{data_acao.isoformat()}|{log_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decodifica o cursor gerado por encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        data_acao, log_id = raw.split('|', 1)
+        return datetime.fromisoformat(data_acao), int(log_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidFilterError('Cursor inválido')
+
+
+def build_query(filters, after=None):
+    """Monta a consulta filtrada e ordenada para paginação por cursor"""
+    query = db.session.query(*[getattr(AuditLog, col) for col in EXPORT_COLUMNS])
+
+    for key in ('usuario_id', 'acao', 'recurso', 'recurso_id', 'status'):
+        if key in filters:
+            query = query.filter(getattr(AuditLog, key) == filters[key])
+
+    if 'desde' in filters:
+        query = query.filter(AuditLog.data_acao >= filters['desde'])
+    if 'ate' in filters:
+        if filters.get('ate_inclusivo'):
+            query = query.filter(AuditLog.data_acao <= filters['ate'])
+        else:
+            query = query.filter(AuditLog.data_acao < filters['ate'])
+
+    if 'campo' in filters:
+        if db.session.get_bind().dialect.name == 'postgresql':
+            query = query.filter(AuditLog.alteracoes.op('?')(filters['campo']))
+        else:
+            query = query.filter(
+                db.func.json_extract(AuditLog.alteracoes, f"$.{filters['campo']}").isnot(None)
+            )
+
+    if after is not None:
+        query = query.filter(db.tuple_(AuditLog.data_acao, AuditLog.id) < after)
+
+    return query.order_by(AuditLog.data_acao.desc(), AuditLog.id.desc())
+
+
+def fetch_page(filters, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Retorna uma página de logs.
+
+    Returns:
+        Tuple(itens: List[dict], proximo_cursor: str | None)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor) if cursor else None
+
+    rows = build_query(filters, after).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.data_acao, last.id)
+
+    return [serialize_row(row) for row in rows], next_cursor
+
+
+def iter_rows(filters, batch_size=EXPORT_BATCH_SIZE):
+    """Percorre todos os logs filtrados em lotes por cursor"""
+    after = None
+    while True:
+        rows = build_query(filters, after).limit(batch_size).all()
+        if not rows:
+            return
+        for row in rows:
+            yield row
+        if len(rows) < batch_size:
+            return
+        after = (rows[-1].data_acao, rows[-1].id)
+        # Libera a sessão entre lotes para não acumular memória
+        db.session.expunge_all()
+
+
+def serialize_row(row):
+    """Converte uma linha da consulta em dict serializável"""
+    data = row._asdict()
+    if data.get('data_acao') is not None:
+        data['data_acao'] = data['data_acao'].isoformat()
+    return data
+
+
+def stream_ndjson(filters):
+    """Gera o resultado como NDJSON (um objeto JSON por linha)"""
+    for row in iter_rows(filters):
+        yield json.dumps(serialize_row(row), ensure_ascii=False) + '\n'
+
+
+def stream_csv(filters):
+    """Gera o resultado como CSV, linha a linha"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    for row in iter_rows(filters):
+        buffer.seek(0)
+        buffer.truncate(0)
+        data = serialize_row(row)
+        if data.get('alteracoes') is not None:
+            data['alteracoes'] = json.dumps(data['alteracoes'], ensure_ascii=False)
+        writer.writerow([data.get(col) for col in EXPORT_COLUMNS])
+        yield buffer.getvalue()
@@ -0,0 +1,219 @@
+"""
+Salvamento automático do editor - Sistema Alpha Gestão Documental
+
+O editor não reenvia o HTML completo a cada salvamento: envia apenas as
+operações que transformam o último conteúdo confirmado no atual, no formato
+de operações do Quill ({"retain": n}, {"delete": n}, {"insert": "texto"}),
+aplicadas sobre o HTML do editor, junto com a revisão em que se baseiam.
+
+As alterações são acumuladas em um buffer por processo e gravadas na versão
+atual no máximo uma vez a cada AUTOSAVE_INTERVAL segundos por documento (uma
+thread grava o que ficou pendente). O conflito entre edições simultâneas é
+detectado de forma otimista pela revisão:
+
+* revisão enviada menor que a do servidor: outra pessoa (ou aba) salvou
+  depois; a alteração é recusada;
+* revisão enviada maior que a conhecida por este processo: o buffer está em
+  outro processo; o editor reenvia o conteúdo completo, que é aceito;
+* a gravação confere a revisão no UPDATE (DocumentVersion.revisao é a
+  version_id_col do mapeamento) e descarta o buffer se a linha mudou.
+"""
+import atexit
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.orm.exc import StaleDataError
+
+from app import db
+
+
+class AutosaveConflict(Exception):
+    """Alteração baseada em uma revisão diferente da atual"""
+
+    def __init__(self, revisao, reenviar=False):
+        super().__init__(f'Conteúdo alterado em outra sessão (revisão atual {revisao})')
+        self.revisao = revisao
+        self.reenviar = reenviar  # True: basta reenviar o conteúdo completo
+
+
+def apply_ops(texto, ops):
+    """Aplica operações retain/delete/insert ao texto"""
+    if not isinstance(ops, list):
+        raise ValueError('Operações inválidas')
+
+    partes, pos = [], 0
+    for op in ops:
+        if not isinstance(op, dict):
+            raise ValueError('Operação inválida')
+        if 'retain' in op:
+            n = int(op['retain'])
+            if n < 0 or pos + n > len(texto):
+                raise ValueError('Operação retain fora do conteúdo')
+            partes.append(texto[pos:pos + n])
+            pos += n
+        elif 'delete' in op:
+            n = int(op['delete'])
+            if n < 0 or pos + n > len(texto):
+                raise ValueError('Operação delete fora do conteúdo')
+            pos += n
+        elif 'insert' in op and isinstance(op['insert'], str):
+            partes.append(op['insert'])
+        else:
+            raise ValueError('Operação desconhecida')
+    partes.append(texto[pos:])
+    return ''.join(partes)
+
+
+class AutosaveBuffer:
+    """Buffer de conteúdo do editor por versão, gravado no máximo a cada N segundos"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+
+    def _entry_from(self, version):
+        return {
+            'conteudo': version.conteudo,
+            'revisao': version.revisao,
+            'gravada': version.revisao,
+            'gravado_em': 0.0,
+            'usado_em': time.monotonic(),
+        }
+
+    def submit(self, version, base_revisao, ops=None, conteudo=None):
+        """
+        Registra uma alteração da versão (operações ou conteúdo completo).
+
+        Args:
+            version: DocumentVersion atual, recém-carregada do banco
+            base_revisao: revisão em que o editor baseou a alteração
+            ops: operações sobre o conteúdo da revisão base
+            conteudo: conteúdo completo (ressincronização)
+
+        Returns:
+            int: nova revisão
+
+        Raises:
+            AutosaveConflict: revisão base diferente da atual
+            ValueError: operações inválidas
+        """
+        interval = current_app.config.get('AUTOSAVE_INTERVAL', 10)
+        with self._lock:
+            entry = self._entries.get(version.id)
+            if entry is None or version.revisao > entry['revisao']:
+                # Sem buffer ou buffer superado por gravação de outro processo
+                entry = self._entries[version.id] = self._entry_from(version)
+
+            if base_revisao < entry['revisao']:
+                raise AutosaveConflict(entry['revisao'])
+            ressincronizado = base_revisao > entry['revisao']
+            if ressincronizado:
+                if conteudo is None:
+                    raise AutosaveConflict(entry['revisao'], reenviar=True)
+                entry['revisao'] = base_revisao
+
+            entry['conteudo'] = conteudo if conteudo is not None else apply_ops(entry['conteudo'], ops)
+            entry['revisao'] += 1
+            entry['usado_em'] = time.monotonic()
+            revisao = entry['revisao']
+            # A ressincronização é gravada na hora para superar o buffer do outro processo
+            gravar = ressincronizado or entry['usado_em'] - entry['gravado_em'] >= interval
+
+        if gravar:
+            self._write(version.id)
+        else:
+            self.start(current_app._get_current_object())
+        return revisao
+
+    def content(self, version):
+        """Conteúdo mais recente da versão (inclusive o ainda não gravado) e sua revisão"""
+        with self._lock:
+            entry = self._entries.get(version.id)
+            if entry is None or version.revisao > entry['revisao']:
+                return version.conteudo, version.revisao
+            return entry['conteudo'], entry['revisao']
+
+    def discard(self, version_id):
+        """Descarta o buffer da versão (ex.: após salvar o formulário completo)"""
+        with self._lock:
+            self._entries.pop(version_id, None)
+
+    def _write(self, version_id):
+        """Grava o buffer da versão conferindo a revisão já gravada"""
+        from app.models import DocumentVersion
+
+        with self._lock:
+            entry = self._entries.get(version_id)
+            if entry is None or entry['revisao'] == entry['gravada']:
+                return False
+            conteudo, revisao, gravada = entry['conteudo'], entry['revisao'], entry['gravada']
+
+        try:
+            version = db.session.get(DocumentVersion, version_id)
+            if version is None or version.revisao != gravada:
+                raise StaleDataError()
+            version.conteudo = conteudo
+            version.revisao = revisao
+            db.session.commit()
+        except StaleDataError:
+            db.session.rollback()
+            current_app.logger.warning(f'Salvamento automático descartado: versão {version_id} alterada em outra sessão')
+            self.discard(version_id)
+            return False
+
+        with self._lock:
+            entry = self._entries.get(version_id)
+            if entry is not None:
+                entry['gravada'] = revisao
+                entry['gravado_em'] = time.monotonic()
+        return True
+
+    def flush(self, force=False):
+        """Grava os buffers pendentes há mais de AUTOSAVE_INTERVAL segundos e descarta os ociosos"""
+        interval = current_app.config.get('AUTOSAVE_INTERVAL', 10)
+        agora = time.monotonic()
+        with self._lock:
+            pendentes = [version_id for version_id, entry in self._entries.items()
+                         if entry['revisao'] != entry['gravada']
+                         and (force or agora - entry['gravado_em'] >= interval)]
+            ociosos = [version_id for version_id, entry in self._entries.items()
+                       if entry['revisao'] == entry['gravada'] and agora - entry['usado_em'] >= 10 * interval]
+            for version_id in ociosos:
+                del self._entries[version_id]
+
+        gravados = 0
+        for version_id in pendentes:
+            try:
+                gravados += self._write(version_id)
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f'Erro no salvamento automático da versão {version_id}: {e}')
+        return gravados
+
+    def start(self, app):
+        """Inicia a thread de gravação periódica (uma por processo)"""
+        if self._thread is not None:
+            return
+        self._app = app
+        interval = app.config.get('AUTOSAVE_INTERVAL', 10)
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    self.flush()
+                    db.session.remove()
+
+        self._thread = threading.Thread(target=loop, name='autosave-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        with self._app.app_context():
+            self.flush(force=True)
+
+
+autosave_buffer = AutosaveBuffer()
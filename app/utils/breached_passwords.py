@@ -0,0 +1,122 @@
+"""
+Verificação de senhas vazadas - Sistema Alpha Gestão Documental
+
+Filtro de Bloom gerado offline (`flask passwords build-breached-filter`) a
+partir de uma lista grande de senhas vazadas, em texto ou em SHA-1 (formato
+do Have I Been Pwned, "HASH:contagem"). O arquivo é mapeado em memória
+(mmap) na primeira verificação de cada processo e compartilhado pelo cache
+de páginas do sistema operacional entre os workers; cada consulta lê k bits,
+em tempo constante. Com taxa de falso positivo de 0,1% são ~1,8 MB por
+milhão de senhas.
+
+Um falso positivo apenas recusa uma senha que não estava na lista; não há
+falsos negativos.
+
+Formato: cabeçalho (MAGIC, bits, funções de hash, itens) seguido do vetor de
+bits. As posições vêm do SHA-1 da senha por hash duplo
+(h1 + i * h2) mod bits.
+"""
+import hashlib
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+
+from flask import current_app, has_app_context
+
+MAGIC = b'ABLOOM1\x00'
+HEADER = struct.Struct('<8sQIQ')  # magic, bits, funções de hash, itens
+SHA1_RE = re.compile(r'^[0-9A-Fa-f]{40}(:\d+)?$')
+
+
+def _positions(digest, bits, hashes):
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:16], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+def _digest(linha):
+    """SHA-1 da senha (ou o próprio hash, se a linha já for um SHA-1)"""
+    if SHA1_RE.match(linha):
+        return bytes.fromhex(linha[:40])
+    return hashlib.sha1(linha.encode('utf-8')).digest()
+
+
+class BloomFilter:
+    """Filtro de Bloom somente leitura sobre um arquivo mapeado em memória"""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes, self.itens = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f'Arquivo de filtro inválido: {path}')
+
+    def __contains__(self, senha):
+        for pos in _positions(hashlib.sha1(senha.encode('utf-8')).digest(), self.bits, self.hashes):
+            if not self._map[HEADER.size + pos // 8] & (1 << (pos % 8)):
+                return False
+        return True
+
+
+def build_filter(origem, destino, taxa_falso_positivo=0.001):
+    """
+    Gera o filtro a partir de um arquivo com uma senha (ou SHA-1) por linha.
+
+    Returns:
+        Tuple(itens, bytes do filtro)
+    """
+    with open(origem, encoding='utf-8', errors='ignore') as f:
+        itens = sum(1 for linha in f if linha.strip())
+    itens = max(itens, 1)
+
+    bits = max(8, int(-itens * math.log(taxa_falso_positivo) / math.log(2) ** 2))
+    hashes = max(1, round(bits / itens * math.log(2)))
+    vetor = bytearray((bits + 7) // 8)
+
+    with open(origem, encoding='utf-8', errors='ignore') as f:
+        for linha in f:
+            linha = linha.rstrip('\r\n')
+            if not linha.strip():
+                continue
+            for pos in _positions(_digest(linha), bits, hashes):
+                vetor[pos // 8] |= 1 << (pos % 8)
+
+    temporario = f'{destino}.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, bits, hashes, itens))
+        f.write(vetor)
+    os.replace(temporario, destino)
+    return itens, HEADER.size + len(vetor)
+
+
+_filter = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def _load():
+    """Carrega o filtro uma vez por processo (None se não configurado)"""
+    global _filter, _loaded
+    if _loaded:
+        return _filter
+    with _lock:
+        if not _loaded:
+            path = current_app.config.get('BREACHED_PASSWORDS_FILE') if has_app_context() else None
+            if path and os.path.exists(path):
+                try:
+                    _filter = BloomFilter(path)
+                except (OSError, ValueError) as e:
+                    current_app.logger.error(f'Filtro de senhas vazadas não carregado: {e}')
+            _loaded = True
+    return _filter
+
+
+def is_breached(senha):
+    """Verifica se a senha (ou sua versão em minúsculas) consta da lista de vazadas"""
+    filtro = _load()
+    if filtro is None or not senha:
+        return False
+    return senha in filtro or senha.lower() in filtro
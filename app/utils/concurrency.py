@@ -0,0 +1,66 @@
+"""
+Controle otimista de concorrência - Sistema Alpha Gestão Documental
+
+Document, NonConformity, Audit e Equipment têm a coluna revisao mapeada como
+version_id_col: todo UPDATE confere a revisão lida e a incrementa, e o
+SQLAlchemy levanta StaleDataError se outra transação alterou a linha nesse
+meio-tempo. Não há bloqueio de linha durante a edição.
+
+Para cobrir também o tempo em que o formulário fica aberto, a página de
+edição envia a revisão exibida (campo oculto revisao) e as chamadas AJAX
+podem enviar o cabeçalho If-Match com o ETag recebido; se não conferir com a
+revisão atual, a alteração é recusada antes de qualquer escrita.
+"""
+from flask import flash, jsonify, redirect, request
+
+from app import db
+
+CONFLICT_MESSAGE = ('Este registro foi alterado por outro usuário enquanto você editava. '
+                    'Os dados atuais foram recarregados; revise e salve novamente.')
+
+
+def submitted_revision():
+    """Revisão informada pelo cliente (If-Match ou campo revisao), ou None"""
+    valor = request.headers.get('If-Match') or request.form.get('revisao')
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.startswith('W/'):
+        valor = valor[2:]
+    try:
+        return int(valor.strip('"'))
+    except ValueError:
+        return None
+
+
+def is_stale(obj):
+    """Verifica se o cliente editou uma revisão anterior à atual do registro"""
+    revisao = submitted_revision()
+    return revisao is not None and revisao != obj.revisao
+
+
+def etag(obj):
+    """ETag da revisão atual, para uso com If-Match"""
+    return f'"{obj.revisao}"'
+
+
+def wants_json():
+    return request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+def conflict_response(obj=None, redirect_to=None):
+    """
+    Resposta de conflito de edição: 409 em JSON para AJAX; caso contrário,
+    mensagem e redirecionamento para o formulário com os dados atuais.
+    """
+    db.session.rollback()
+    if wants_json():
+        resposta = {'success': False, 'error': CONFLICT_MESSAGE, 'conflito': True}
+        if obj is not None:
+            db.session.refresh(obj)
+            resposta['revisao'] = obj.revisao
+        return jsonify(resposta), 409
+
+    flash(CONFLICT_MESSAGE, 'warning')
+    return redirect(redirect_to or request.url)
+
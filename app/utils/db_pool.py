@@ -0,0 +1,160 @@
+"""
+Pool de conexões - Sistema Alpha Gestão Documental
+
+* InstrumentedQueuePool: QueuePool que mede o tempo de espera por uma
+  conexão no checkout (pool esgotado) e conta os timeouts;
+* eventos do pool: conexões abertas, checkouts, invalidações;
+* pragmas do SQLite (WAL, synchronous, busy_timeout) em cada conexão.
+
+As métricas são por processo e expostas em /metrics/pool (ver
+app/routes/metrics.py) junto com o estado atual do pool (tamanho, em uso,
+overflow); os mesmos eventos alimentam as métricas db_pool_* do Prometheus
+(app/utils/metrics.py), agregadas entre os workers.
+"""
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.utils.metrics import POOL_CHECKED_OUT, POOL_CHECKOUT_WAIT, POOL_EVENTS, POOL_OVERFLOW
+
+# Limites (segundos) do histograma de espera no checkout
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+
+class PoolMetrics:
+    """Contadores do pool no processo"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.invalidations = 0
+            self.soft_invalidations = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def incr(self, nome):
+        with self._lock:
+            setattr(self, nome, getattr(self, nome) + 1)
+        POOL_EVENTS.labels(nome).inc()
+
+    def observe_wait(self, segundos):
+        POOL_CHECKOUT_WAIT.observe(segundos)
+        with self._lock:
+            self.wait_total += segundos
+            self.wait_max = max(self.wait_max, segundos)
+            for i, limite in enumerate(WAIT_BUCKETS):
+                if segundos <= limite:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            esperas = sum(self.wait_buckets)
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'timeouts': self.timeouts,
+                'checkout_wait': {
+                    'count': esperas,
+                    'total_seconds': round(self.wait_total, 6),
+                    'avg_ms': round(self.wait_total / esperas * 1000, 3) if esperas else 0,
+                    'max_ms': round(self.wait_max * 1000, 3),
+                    'buckets': dict(zip([str(b) for b in WAIT_BUCKETS] + ['+Inf'], self.wait_buckets)),
+                },
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que registra o tempo de espera por conexão e os timeouts"""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.incr('timeouts')
+            raise
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - inicio)
+
+
+def pool_status(engine):
+    """Estado atual do pool (QueuePool) do engine"""
+    pool = engine.pool
+    status = {'class': type(pool).__name__}
+    for nome in ('size', 'checkedin', 'checkedout', 'overflow'):
+        metodo = getattr(pool, nome, None)
+        if callable(metodo):
+            status[nome] = metodo()
+    return status
+
+
+def _sqlite_pragmas(app):
+    pragmas = [
+        ('journal_mode', app.config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', int(app.config.get('SQLITE_BUSY_TIMEOUT_MS', 15000))),
+        ('cache_size', -int(app.config.get('SQLITE_CACHE_SIZE_KB', 20000))),  # negativo = KiB
+    ]
+
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nome, valor in pragmas:
+                if valor not in (None, ''):
+                    cursor.execute(f'PRAGMA {nome}={valor}')
+        finally:
+            cursor.close()
+
+    return on_connect
+
+
+def instrument_engine(app, engine, metrics=True):
+    """Registra os eventos do pool (metrics) e, no SQLite, os pragmas de conexão"""
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _sqlite_pragmas(app))
+    if not metrics:
+        return
+
+    def atualizar_uso():
+        # engine.pool muda após dispose(); lido a cada evento
+        pool = engine.pool
+        if isinstance(pool, QueuePool):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    def on_checkout(*args):
+        pool_metrics.incr('checkouts')
+        atualizar_uso()
+
+    event.listen(engine, 'connect', lambda *args: pool_metrics.incr('connects'))
+    event.listen(engine, 'checkout', on_checkout)
+    event.listen(engine, 'checkin', lambda *args: atualizar_uso())
+    event.listen(engine, 'invalidate', lambda *args: pool_metrics.incr('invalidations'))
+    event.listen(engine, 'soft_invalidate', lambda *args: pool_metrics.incr('soft_invalidations'))
+
+
+def configure_pool(app):
+    """Usa o pool instrumentado nos bancos em rede (chamar antes de db.init_app)"""
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if not uri.startswith('sqlite'):
+        options.setdefault('poolclass', InstrumentedQueuePool)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
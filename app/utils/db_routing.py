@@ -0,0 +1,185 @@
+"""
+Leituras em réplica - Sistema Alpha Gestão Documental
+
+As telas de relatórios e o dashboard executam agregações pesadas que só
+leem dados. Com REPLICA_DATABASE_URL configurada (bind 'replica'), as
+views marcadas com @replica_reads enviam seus SELECTs à réplica:
+
+* apenas SELECT sem FOR UPDATE, fora de flush, e enquanto a sessão não
+  tiver gravado nada na requisição (leitura da própria escrita no primário);
+* a réplica é usada só se o atraso de replicação estiver dentro de
+  REPLICA_MAX_LAG_SECONDS (consultado a cada REPLICA_CHECK_INTERVAL
+  segundos, por processo);
+* réplica inacessível ou atrasada: as consultas vão ao primário, e uma
+  falha de conexão com a réplica durante a view a executa de novo no
+  primário (erros de SQL, timeouts e falhas do primário são propagados).
+
+Para testar localmente basta uma segunda base, ex. uma cópia do SQLite:
+
+    cp alpha_gestao.db alpha_gestao_replica.db
+    REPLICA_DATABASE_URL=sqlite:///alpha_gestao_replica.db flask run
+    flask db replica-status
+"""
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+REPLICA_BIND = 'replica'
+
+# Atraso (segundos) de uma réplica PostgreSQL; 0 se tudo que foi recebido já
+# foi aplicado, NULL fora de recuperação (a "réplica" é um primário)
+PG_LAG_SQL = """
+    SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END
+"""
+
+_lock = threading.Lock()
+_state = {'checked_at': None, 'ok': False, 'lag': None, 'error': None}
+
+# Contadores por processo (consultas roteadas e motivos de uso do primário)
+routing_stats = {'replica_queries': 0, 'fallback_unavailable': 0, 'fallback_retry': 0}
+
+
+def replica_lag(engine):
+    """Atraso de replicação em segundos (SQLite não replica: 0)"""
+    with engine.connect() as connection:
+        if connection.dialect.name != 'postgresql':
+            connection.exec_driver_sql('SELECT 1')
+            return 0.0
+        lag = connection.exec_driver_sql(PG_LAG_SQL).scalar()
+        return float(lag or 0)
+
+
+def _check(engine, config):
+    """Consulta o atraso da réplica e atualiza o estado"""
+    try:
+        lag = replica_lag(engine)
+        limite = config.get('REPLICA_MAX_LAG_SECONDS', 30)
+        _state.update(ok=lag <= limite, lag=lag,
+                      error=None if lag <= limite else f'atraso de {lag:.1f}s acima de {limite}s')
+    except Exception as e:
+        _state.update(ok=False, lag=None, error=str(e))
+    finally:
+        # A falha da própria verificação já foi tratada acima
+        if has_app_context():
+            g.pop('replica_connection_failed', None)
+    _state['checked_at'] = time.monotonic()
+
+
+def replica_available(engine, config):
+    """
+    Indica se a réplica pode atender leituras. A verificação é refeita a cada
+    REPLICA_CHECK_INTERVAL segundos (REPLICA_RETRY_INTERVAL após falha); só
+    uma thread do processo consulta, as demais usam o último resultado.
+    """
+    intervalo = config.get('REPLICA_CHECK_INTERVAL', 5) if _state['ok'] \
+        else config.get('REPLICA_RETRY_INTERVAL', 30)
+    verificado = _state['checked_at']
+    if verificado is None or time.monotonic() - verificado >= intervalo:
+        if _lock.acquire(blocking=verificado is None):
+            try:
+                _check(engine, config)
+            finally:
+                _lock.release()
+    return _state['ok']
+
+
+def mark_unavailable(erro):
+    """Tira a réplica de uso até a próxima verificação"""
+    _state.update(ok=False, error=str(erro), checked_at=time.monotonic())
+
+
+def replica_status():
+    """Último estado conhecido da réplica neste processo"""
+    return {
+        'configured': REPLICA_BIND in (current_app.config.get('SQLALCHEMY_BINDS') or {}),
+        'available': _state['ok'],
+        'lag_seconds': _state['lag'],
+        'error': _state['error'],
+        **routing_stats,
+    }
+
+
+def _is_read_only(clause):
+    return (clause is not None and getattr(clause, 'is_select', False)
+            and getattr(clause, '_for_update_arg', None) is None)
+
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras das views @replica_reads à réplica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('use_replica') and not self.info.get('wrote')
+                and not self._flushing and _is_read_only(clause)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                if replica_available(engine, current_app.config):
+                    routing_stats['replica_queries'] += 1
+                    self.info['replica_used'] = True
+                    return engine
+                routing_stats['fallback_unavailable'] += 1
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _on_replica_error(exception_context):
+    """Sinaliza falhas de conexão (não de SQL) ocorridas no engine da réplica"""
+    if ((exception_context.is_disconnect or exception_context.connection is None)
+            and has_app_context()):
+        g.replica_connection_failed = True
+
+
+def init_routing_listeners(app, session):
+    """
+    Após qualquer flush a sessão lê do primário até o fim da requisição; no
+    engine da réplica, registra as falhas de conexão para o fallback.
+    """
+    from app import db
+
+    @event.listens_for(session, 'after_flush')
+    def _marcar_escrita(sess, flush_context):
+        sess.info['wrote'] = True
+
+    with app.app_context():
+        engine = db.engines.get(REPLICA_BIND)
+        if engine is not None:
+            event.listen(engine, 'handle_error', _on_replica_error)
+
+
+def replica_reads(view):
+    """
+    Executa as leituras da view na réplica (se configurada e em dia). Se a
+    réplica cair no meio da view, ela é executada de novo no primário; use
+    apenas em views que não gravam.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        from app import db
+
+        sessao = db.session()
+        if REPLICA_BIND not in db.engines:
+            return view(*args, **kwargs)
+
+        sessao.info['use_replica'] = True
+        g.pop('replica_connection_failed', None)
+        try:
+            return view(*args, **kwargs)
+        except DBAPIError as e:
+            # Só falhas de conexão com a réplica: erros de SQL, timeouts de
+            # comando/lock e falhas do primário não desativam a réplica
+            if not (sessao.info.get('replica_used') and g.pop('replica_connection_failed', False)):
+                raise
+            current_app.logger.warning(f'Réplica indisponível, usando o primário: {e}')
+            mark_unavailable(e)
+            routing_stats['fallback_retry'] += 1
+            db.session.rollback()
+            sessao.info['use_replica'] = False
+            return view(*args, **kwargs)
+        finally:
+            sessao.info.pop('use_replica', None)
+            sessao.info.pop('replica_used', None)
+    return wrapper
@@ -0,0 +1,133 @@
+"""
+Inicialização do banco de dados - Sistema Alpha Gestão Documental
+
+Migrações do esquema, administrador e cadastros padrão, executados uma
+única vez por implantação (`flask init-db`) e não mais a cada início de
+worker: com vários workers do gunicorn (--reuse-port, autoscale) cada um
+consultava o catálogo do banco e a tabela de usuários ao subir.
+
+Em desenvolvimento, AUTO_INIT_DB=true mantém o comportamento antigo de
+preparar o banco na criação da aplicação.
+"""
+import os
+
+from flask import current_app
+
+from app import db
+
+DEFAULT_ADMIN_EMAIL = 'admin@alphagestao.com'
+
+
+DEFAULT_GROUPS = [
+    {'codigo': 'RH', 'nome': 'Recursos Humanos', 'descricao': 'Departamento de Recursos Humanos', 'cor': '#28a745', 'icone': 'bi-people'},
+    {'codigo': 'FIN', 'nome': 'Financeiro', 'descricao': 'Departamento Financeiro', 'cor': '#17a2b8', 'icone': 'bi-cash-stack'},
+    {'codigo': 'LAB', 'nome': 'Análises Clínicas', 'descricao': 'Laboratório de Análises Clínicas', 'cor': '#6f42c1', 'icone': 'bi-microscope'},
+    {'codigo': 'REC', 'nome': 'Recepção', 'descricao': 'Recepção e Atendimento', 'cor': '#fd7e14', 'icone': 'bi-person-check'},
+    {'codigo': 'QUAL', 'nome': 'Qualidade', 'descricao': 'Gestão da Qualidade', 'cor': '#dc3545', 'icone': 'bi-award'},
+    {'codigo': 'ADM', 'nome': 'Administração', 'descricao': 'Departamento Administrativo', 'cor': '#6c757d', 'icone': 'bi-building'},
+]
+
+DEFAULT_DOCUMENT_TYPES = [
+    {'codigo': 'POL', 'nome': 'Política', 'descricao': 'Políticas organizacionais', 'cor': '#dc3545', 'icone': 'bi-shield-check'},
+    {'codigo': 'PROC', 'nome': 'Procedimento', 'descricao': 'Procedimentos operacionais', 'cor': '#007bff', 'icone': 'bi-list-check'},
+    {'codigo': 'INST', 'nome': 'Instrução de Trabalho', 'descricao': 'Instruções de trabalho detalhadas', 'cor': '#28a745', 'icone': 'bi-gear'},
+    {'codigo': 'FORM', 'nome': 'Formulário', 'descricao': 'Formulários e registros', 'cor': '#ffc107', 'icone': 'bi-file-earmark-text'},
+    {'codigo': 'MAN', 'nome': 'Manual', 'descricao': 'Manuais e guias', 'cor': '#6f42c1', 'icone': 'bi-book'},
+]
+
+DEFAULT_EQUIPMENT_TYPES = [
+    {'codigo': 'MED', 'nome': 'Equipamentos de Medição', 'descricao': 'Equipamentos para medição e controle dimensional',
+     'cor': '#007bff', 'icone': 'bi-speedometer2', 'requer_calibracao': True, 'frequencia_calibracao_padrao': 12,
+     'requer_manutencao': True, 'frequencia_manutencao_padrao': 6},
+    {'codigo': 'TEST', 'nome': 'Equipamentos de Teste', 'descricao': 'Equipamentos para testes e ensaios',
+     'cor': '#28a745', 'icone': 'bi-tools', 'requer_calibracao': True, 'frequencia_calibracao_padrao': 6,
+     'requer_manutencao': True, 'frequencia_manutencao_padrao': 3},
+    {'codigo': 'PROD', 'nome': 'Equipamentos de Produção', 'descricao': 'Equipamentos utilizados na produção',
+     'cor': '#dc3545', 'icone': 'bi-gear', 'requer_calibracao': False,
+     'requer_manutencao': True, 'frequencia_manutencao_padrao': 12},
+    {'codigo': 'SEG', 'nome': 'Equipamentos de Segurança', 'descricao': 'Equipamentos de proteção e segurança',
+     'cor': '#ffc107', 'icone': 'bi-shield-check', 'requer_calibracao': True, 'frequencia_calibracao_padrao': 12,
+     'requer_manutencao': True, 'frequencia_manutencao_padrao': 6},
+]
+
+
+def create_schema():
+    """Aplica as migrações pendentes (cria o esquema em um banco vazio)"""
+    from app.utils.schema import upgrade
+    upgrade('head')
+
+
+def default_admin_enabled():
+    """Cria o administrador padrão apenas em desenvolvimento ou com CREATE_DEFAULT_ADMIN"""
+    return (os.environ.get('CREATE_DEFAULT_ADMIN', 'False').lower() in ['true', '1', 'yes']
+            or (current_app.config.get('ENV') != 'production'
+                and os.environ.get('FLASK_ENV') != 'production'))
+
+
+def ensure_default_admin():
+    """
+    Cria o usuário administrador padrão se não existir.
+
+    Returns:
+        bool: True se o usuário foi criado
+    """
+    from app.models import User
+
+    if User.query.filter_by(email=DEFAULT_ADMIN_EMAIL).first():
+        return False
+
+    admin = User()
+    admin.username = 'admin'
+    admin.email = DEFAULT_ADMIN_EMAIL
+    admin.nome_completo = 'Administrador do Sistema'
+    admin.perfil = 'administrador'
+    admin.ativo = True
+    admin.set_password(os.environ.get('DEFAULT_ADMIN_PASSWORD', 'admin123'))
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+
+def seed_defaults():
+    """
+    Cria os grupos e tipos de documento/equipamento padrão nas tabelas ainda
+    vazias (um cadastro já em uso nunca é alterado).
+
+    Returns:
+        int: registros criados
+    """
+    from app.models import DocumentType, EquipmentType, Group, User
+
+    admin = User.query.filter_by(perfil='administrador').order_by(User.id).first()
+    if admin is None:
+        return 0
+
+    criados = 0
+    for model, padroes in ((Group, DEFAULT_GROUPS), (DocumentType, DEFAULT_DOCUMENT_TYPES),
+                           (EquipmentType, DEFAULT_EQUIPMENT_TYPES)):
+        if db.session.query(model.id).first() is not None:
+            continue
+        for dados in padroes:
+            db.session.add(model(criado_por_id=admin.id, **dados))
+            criados += 1
+    db.session.commit()
+    return criados
+
+
+def init_database(create_admin=None, seed=True):
+    """
+    Prepara o banco (migrações, administrador e cadastros padrão). Deve rodar
+    com contexto de aplicação, uma vez por implantação, antes dos workers.
+
+    Args:
+        create_admin: força (True) ou impede (False) o administrador padrão;
+            None segue default_admin_enabled()
+        seed: cria os grupos e tipos padrão nas tabelas vazias
+    """
+    create_schema()
+    if create_admin is None:
+        create_admin = default_admin_enabled()
+    if create_admin and ensure_default_admin():
+        current_app.logger.info('Default admin user created for development')
+    if seed:
+        seed_defaults()
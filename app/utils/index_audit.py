@@ -0,0 +1,181 @@
+"""
+Auditoria de índices - Sistema Alpha Gestão Documental
+
+Exercita as rotas GET da aplicação (cliente de teste, autenticado como um
+usuário informado) e captura cada SELECT emitido pelas rotas e pelos
+utilitários que elas chamam (contadores, relatórios, permissões...). Cada
+consulta distinta passa por EXPLAIN e são reportadas as leituras
+sequenciais com filtro em tabelas grandes, isto é, predicados sem índice.
+
+As rotas têm efeitos colaterais (ex.: visualizações registram leituras):
+execute em uma cópia do banco de produção, não no próprio.
+
+    flask db index-audit --user-id 1 --sample-id 1 --min-rows 1000
+"""
+import json
+import re
+from collections import namedtuple
+
+from sqlalchemy import event, text
+
+from app import db
+
+# Rotas ignoradas: saída da sessão e downloads/exportações (geram arquivos)
+SKIP_ENDPOINTS = re.compile(r'(^static$|^favicon$|logout|export|download)')
+RULE_ARG = re.compile(r'<(?:(\w+)(?:\([^)]*\))?:)?(\w+)>')
+
+# "FROM tabela [AS] apelido" / "JOIN tabela [AS] apelido"
+TABLE_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?\s+(?:AS\s+)?"?(\w+)"?', re.IGNORECASE)
+SQL_KEYWORDS = {'WHERE', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'CROSS', 'GROUP',
+                'ORDER', 'LIMIT', 'UNION', 'USING', 'NATURAL', 'FULL', 'HAVING', 'OFFSET'}
+
+Finding = namedtuple('Finding', 'tabela linhas detalhe sql endpoints')
+
+
+def _build_path(rule, sample_id):
+    """Preenche os parâmetros inteiros da rota com sample_id (None se houver outros)"""
+    def substituir(match):
+        if match.group(1) != 'int':
+            raise ValueError(match.group(2))
+        return str(sample_id)
+    try:
+        return RULE_ARG.sub(substituir, rule.rule)
+    except ValueError:
+        return None
+
+
+def collect_queries(app, user_id, sample_id=1):
+    """
+    Executa as rotas GET e captura as consultas.
+
+    Returns:
+        Tuple(consultas, falhas) com consultas = {sql: {'params', 'endpoints'}}
+        e falhas = [(endpoint, erro)]
+    """
+    consultas = {}
+    falhas = []
+    atual = {'endpoint': None}
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if executemany or atual['endpoint'] is None:
+            return
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return
+        entrada = consultas.setdefault(statement, {'params': parameters, 'endpoints': set()})
+        entrada['endpoints'].add(atual['endpoint'])
+
+    client = app.test_client()
+    with client.session_transaction() as sessao:
+        sessao['_user_id'] = str(user_id)
+        sessao['_fresh'] = True
+
+    event.listen(db.engine, 'before_cursor_execute', capturar)
+    try:
+        for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+            if 'GET' not in rule.methods or SKIP_ENDPOINTS.search(rule.endpoint):
+                continue
+            caminho = _build_path(rule, sample_id)
+            if caminho is None:
+                continue
+            atual['endpoint'] = rule.endpoint
+            try:
+                # O tratador de erros da aplicação converte exceções em 500:
+                # a rota não executou todas as consultas
+                resposta = client.get(caminho)
+                if resposta.status_code >= 500:
+                    falhas.append((rule.endpoint, f'HTTP {resposta.status_code}'))
+            except Exception as e:
+                falhas.append((rule.endpoint, str(e)))
+            finally:
+                atual['endpoint'] = None
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', capturar)
+
+    return consultas, falhas
+
+
+def _row_counts(connection):
+    """Número (estimado no PostgreSQL) de linhas por tabela"""
+    if connection.dialect.name == 'postgresql':
+        return dict(connection.execute(text(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relkind IN ('r', 'p')"
+        )).fetchall())
+
+    contagens = {}
+    for (tabela,) in connection.execute(text(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")):
+        contagens[tabela] = connection.execute(text(f'SELECT COUNT(*) FROM "{tabela}"')).scalar()
+    return contagens
+
+
+def _walk(plano):
+    yield plano
+    for filho in plano.get('Plans', []):
+        yield from _walk(filho)
+
+
+def _table_aliases(statement):
+    """Apelidos da consulta ("FROM documents AS d", "JOIN users u") -> tabela"""
+    return {apelido.lower(): tabela
+            for tabela, apelido in TABLE_ALIAS.findall(statement)
+            if apelido.upper() not in SQL_KEYWORDS}
+
+
+def explain(connection, statement, params):
+    """
+    Leituras sequenciais com filtro no plano da consulta.
+
+    Returns:
+        List[Tuple(tabela, detalhe)]
+    """
+    if connection.dialect.name == 'postgresql':
+        resultado = connection.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', params).scalar()
+        plano = (json.loads(resultado) if isinstance(resultado, str) else resultado)[0]['Plan']
+        return [(no['Relation Name'], f"Seq Scan, filtro: {no['Filter']}")
+                for no in _walk(plano)
+                if no.get('Node Type') == 'Seq Scan' and 'Filter' in no]
+
+    # SQLite: "SCAN documents" sem "USING ... INDEX" é leitura da tabela inteira
+    if not re.search(r'\b(WHERE|JOIN)\b', statement, re.IGNORECASE):
+        return []
+    achados = []
+    apelidos = _table_aliases(statement)
+    for linha in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', params):
+        detalhe = linha[-1]
+        partes = detalhe.split()
+        if partes and partes[0] == 'SCAN' and 'INDEX' not in detalhe:
+            nome = partes[2] if len(partes) > 2 and partes[1] == 'TABLE' else partes[1]
+            achados.append((apelidos.get(nome.lower(), nome), detalhe))
+    return achados
+
+
+def audit(app, user_id, sample_id=1, min_rows=1000):
+    """
+    Captura as consultas das rotas e reporta predicados sem índice.
+
+    Returns:
+        Tuple(achados, total_consultas, falhas), achados ordenados pelo
+        tamanho da tabela
+    """
+    consultas, falhas = collect_queries(app, user_id, sample_id)
+
+    achados = []
+    with db.engine.connect() as connection:
+        linhas = _row_counts(connection)
+        for statement, dados in consultas.items():
+            try:
+                resultado = explain(connection, statement, dados['params'])
+            except Exception as e:
+                connection.rollback()
+                falhas.append(('EXPLAIN', f'{e} [{statement[:80]}]'))
+                continue
+            for tabela, detalhe in resultado:
+                if tabela not in linhas:
+                    # Subconsulta ou CTE materializada, não uma tabela
+                    continue
+                total = int(linhas[tabela])
+                if total >= min_rows:
+                    achados.append(Finding(tabela, total, detalhe, statement, sorted(dados['endpoints'])))
+
+    achados.sort(key=lambda f: (-f.linhas, f.tabela))
+    return achados, len(consultas), falhas
@@ -0,0 +1,64 @@
+"""
+Cache LRU em memória (por processo) - Sistema Alpha Gestão Documental
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache LRU com limite de itens, seguro para uso entre threads.
+
+    Com ttl (segundos), os itens expiram após esse tempo mesmo sem
+    invalidação explícita.
+    """
+
+    def __init__(self, max_size=256, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Retorna o valor em cache (marcando-o como recente) ou default"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            expira_em, value = self._data[key]
+            if expira_em is not None and expira_em < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, max_size=None):
+        """Grava o valor, descartando os itens menos usados acima do limite"""
+        if max_size is not None:
+            self.max_size = max_size
+        expira_em = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expira_em, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove e retorna o valor da chave"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            return self._data.pop(key)[1]
+
+    def clear(self):
+        """Esvazia o cache"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
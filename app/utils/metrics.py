@@ -0,0 +1,161 @@
+"""
+Métricas Prometheus - Sistema Alpha Gestão Documental
+
+Contadores e histogramas em memória (prometheus_client), expostos em
+GET /metrics no formato texto do Prometheus:
+
+* http_request_duration_seconds: latência por endpoint, método e status;
+* db_queries_total / db_query_duration_seconds: consultas por bind e operação;
+* db_pool_*: checkouts, espera no checkout, timeouts e invalidações do pool
+  (os mesmos eventos de /metrics/pool) e conexões em uso/overflow;
+* pdf_render_seconds: geração de PDFs (documento e relatórios);
+* email_notifications_pending / _oldest_age_seconds: fila de e-mails,
+  consultada no banco a cada coleta;
+* audit_log_flush_entries: logs de auditoria gravados por flush e
+  reading_buffer_size: leituras aguardando o write-behind.
+
+Com vários workers do gunicorn cada processo grava seus valores em arquivos
+mmap no diretório PROMETHEUS_MULTIPROC_DIR (definido em gunicorn.conf.py),
+e a coleta soma os arquivos de todos os workers; sem a variável (servidor de
+desenvolvimento) é usado o registro padrão do processo.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge,
+                               Histogram, generate_latest)
+from prometheus_client.core import GaugeMetricFamily
+
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+PDF_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+AUDIT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250)
+
+SQL_OPERATIONS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH'}
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Latência das requisições HTTP',
+                            ['endpoint', 'method', 'status'])
+
+DB_QUERIES = Counter('db_queries_total', 'Consultas executadas', ['bind', 'operation'])
+DB_QUERY_LATENCY = Histogram('db_query_duration_seconds', 'Duração das consultas', ['bind', 'operation'],
+                             buckets=DB_BUCKETS)
+
+POOL_EVENTS = Counter('db_pool_events_total', 'Eventos do pool de conexões', ['event'])
+POOL_CHECKOUT_WAIT = Histogram('db_pool_checkout_wait_seconds', 'Espera por uma conexão no checkout',
+                               buckets=WAIT_BUCKETS)
+POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Conexões em uso', multiprocess_mode='livesum')
+POOL_OVERFLOW = Gauge('db_pool_overflow', 'Conexões além de pool_size', multiprocess_mode='livesum')
+
+PDF_RENDER = Histogram('pdf_render_seconds', 'Geração de PDFs', ['kind'], buckets=PDF_BUCKETS)
+
+AUDIT_FLUSH_ENTRIES = Histogram('audit_log_flush_entries', 'Logs de auditoria gravados por flush',
+                                buckets=AUDIT_BUCKETS)
+READING_BUFFER_SIZE = Gauge('reading_buffer_size', 'Leituras aguardando gravação em lote',
+                            multiprocess_mode='livesum')
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+@contextmanager
+def observe_pdf_render(kind):
+    """Mede a geração de um PDF (kind: document, reports)"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        PDF_RENDER.labels(kind).observe(time.perf_counter() - inicio)
+
+
+def _operation(statement):
+    partes = statement.lstrip()[:8].split(None, 1)
+    palavra = partes[0].upper() if partes else ''
+    return palavra if palavra in SQL_OPERATIONS else 'OTHER'
+
+
+def instrument_queries(engine, bind):
+    """Conta e mede as consultas executadas pelo engine"""
+    from sqlalchemy import event
+
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info['metrics_query_start'].pop()
+        operacao = _operation(statement)
+        DB_QUERIES.labels(bind, operacao).inc()
+        DB_QUERY_LATENCY.labels(bind, operacao).observe(time.perf_counter() - inicio)
+
+    def erro(exception_context):
+        conn = exception_context.connection
+        pilha = conn.info.get('metrics_query_start') if conn is not None else None
+        if pilha:
+            pilha.pop()
+
+    event.listen(engine, 'before_cursor_execute', antes)
+    event.listen(engine, 'after_cursor_execute', depois)
+    event.listen(engine, 'handle_error', erro)
+
+
+class NotificationQueueCollector:
+    """Tamanho e idade da fila de e-mails, lidos do banco em cada coleta"""
+
+    def collect(self):
+        from datetime import datetime
+        from flask import current_app
+        from sqlalchemy import func
+        from app import db
+        from app.models import EmailNotification
+
+        try:
+            pendentes, mais_antiga = db.session.query(
+                func.count(EmailNotification.id), func.min(EmailNotification.data_criacao)
+            ).filter(EmailNotification.status == 'pendente').one()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(f'Métricas: fila de e-mails indisponível: {e}')
+            return
+
+        idade = (datetime.utcnow() - mais_antiga).total_seconds() if mais_antiga else 0
+        yield GaugeMetricFamily('email_notifications_pending', 'E-mails aguardando envio', value=pendentes)
+        yield GaugeMetricFamily('email_notifications_oldest_age_seconds',
+                                'Idade do e-mail pendente mais antigo', value=idade)
+
+
+def render_metrics():
+    """
+    Gera a exposição das métricas (com contexto de aplicação).
+
+    Returns:
+        Tuple(conteúdo, content_type)
+    """
+    if multiprocess_enabled():
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    # A fila é global (banco): coletada pelo processo que atende a requisição
+    fila = CollectorRegistry()
+    fila.register(NotificationQueueCollector())
+    return generate_latest(registry) + generate_latest(fila), CONTENT_TYPE_LATEST
+
+
+def init_metrics(app):
+    """Mede a latência das requisições por endpoint"""
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_observe(response):
+        inicio = g.pop('metrics_start', None)
+        if inicio is not None:
+            REQUEST_LATENCY.labels(request.endpoint or 'none', request.method,
+                                   str(response.status_code)).observe(time.perf_counter() - inicio)
+        return response
@@ -6,6 +6,7 @@ from flask_login import current_user
 from app.models import Document, ApprovalFlow, NonConformity, Audit, CorrectiveAction
 from datetime import datetime, timedelta
 from app import db
+from app.utils.permissions import Capability
 
 def get_pending_approvals_count():
     """Contagem de aprovações pendentes para o usuário atual"""
@@ -25,7 +26,7 @@ def get_expiring_documents_count():
     data_limite = datetime.utcnow() + timedelta(days=30)
     
     # Para gestores e admins - todos os documentos
-    if current_user.perfil in ['administrador', 'gestor_qualidade']:
+    if current_user.has_capability(Capability.MANAGE_QUALITY):
         return Document.query.filter(
             Document.data_validade <= data_limite,
             Document.data_validade >= datetime.utcnow(),
@@ -76,7 +77,7 @@ def get_assigned_audits_count():
 
 def get_critical_alerts_count():
     """Contagem de alertas críticos para gestores"""
-    if not current_user.is_authenticated or current_user.perfil not in ['administrador', 'gestor_qualidade']:
+    if not current_user.is_authenticated or not current_user.has_capability(Capability.MANAGE_QUALITY):
         return 0
     
     count = 0
@@ -5,6 +5,7 @@ from flask import current_app, render_template_string
 from flask_mail import Message
 from app import mail, db
 from app.models import EmailNotification, User, Document, NonConformity, Audit
+from app.utils.permissions import Capability, users_with
 from datetime import datetime, timedelta
 import threading
 
@@ -192,7 +193,7 @@ def notify_document_expiring(document):
         # Notificar autor e gestores
         users_to_notify = [document.autor]
         gestores = User.query.filter(
-            User.perfil.in_(['administrador', 'gestor_qualidade']),
+            users_with(Capability.MANAGE_QUALITY),
             User.ativo == True
         ).all()
         users_to_notify.extend(gestores)
@@ -255,7 +256,7 @@ def notify_nonconformity_opened(nc):
     
     # Notificar gestores da qualidade
     gestores = User.query.filter(
-        User.perfil.in_(['administrador', 'gestor_qualidade']),
+        users_with(Capability.MANAGE_QUALITY),
         User.ativo == True
     ).all()
     users_to_notify.extend(gestores)
@@ -0,0 +1,105 @@
+"""
+Política de hash de senhas - Sistema Alpha Gestão Documental
+
+Algoritmo e custo vêm da configuração (PASSWORD_HASH_ALGORITHM e
+PASSWORD_HASH_WORK_FACTOR) em vez dos padrões do Werkzeug:
+
+* scrypt: fator de trabalho = N (potência de 2; r=8, p=1);
+* pbkdf2: fator de trabalho = número de iterações (SHA-256).
+
+Hashes gravados com algoritmo diferente ou custo menor que o da política são
+refeitos de forma transparente no próximo login bem-sucedido, quando a senha
+em texto está disponível. O comando `flask passwords benchmark` mede o custo
+na máquina de produção e sugere o fator para a latência desejada.
+"""
+import time
+
+from flask import current_app
+from werkzeug.security import generate_password_hash
+
+DEFAULT_WORK_FACTORS = {
+    'scrypt': 2 ** 15,
+    'pbkdf2': 600000,
+}
+SCRYPT_R, SCRYPT_P = 8, 1
+MAX_SCRYPT_N = 2 ** 20  # ~1 GB de memória por hash com r=8
+
+
+def method_for(algoritmo, fator):
+    """String de método do Werkzeug para o algoritmo e custo"""
+    if algoritmo == 'scrypt':
+        return f'scrypt:{fator}:{SCRYPT_R}:{SCRYPT_P}'
+    if algoritmo == 'pbkdf2':
+        return f'pbkdf2:sha256:{fator}'
+    raise ValueError(f'Algoritmo de hash não suportado: {algoritmo}')
+
+
+def policy():
+    """(algoritmo, fator de trabalho) configurados"""
+    algoritmo = current_app.config.get('PASSWORD_HASH_ALGORITHM', 'scrypt')
+    fator = current_app.config.get('PASSWORD_HASH_WORK_FACTOR') or DEFAULT_WORK_FACTORS.get(algoritmo)
+    return algoritmo, int(fator)
+
+
+def hash_password(password):
+    """Gera o hash da senha conforme a política atual"""
+    return generate_password_hash(password, method=method_for(*policy()))
+
+
+def _parse_method(pwhash):
+    """'scrypt:32768:8:1$salt$hash' -> ('scrypt', 32768); None se irreconhecível"""
+    partes = (pwhash or '').split('$', 1)[0].split(':')
+    try:
+        if partes[0] == 'scrypt':
+            return 'scrypt', int(partes[1]) if len(partes) > 1 else 2 ** 15
+        if partes[0] == 'pbkdf2':
+            return 'pbkdf2', int(partes[2]) if len(partes) > 2 else 600000
+    except ValueError:
+        pass
+    return None
+
+
+def needs_rehash(pwhash):
+    """Verifica se o hash gravado está abaixo da política atual"""
+    atual = _parse_method(pwhash)
+    algoritmo, fator = policy()
+    return atual is None or atual[0] != algoritmo or atual[1] < fator
+
+
+def time_hash(algoritmo, fator, rodadas=3):
+    """Tempo médio (segundos) de um hash com o algoritmo e custo informados"""
+    metodo = method_for(algoritmo, fator)
+    inicio = time.perf_counter()
+    for _ in range(rodadas):
+        generate_password_hash('benchmark-senha-de-teste', method=metodo)
+    return (time.perf_counter() - inicio) / rodadas
+
+
+def calibrate(algoritmo, alvo_ms, rodadas=3):
+    """
+    Mede o custo do hash nesta máquina e sugere o fator para a latência alvo.
+
+    Returns:
+        Tuple(fator_sugerido, medições) com medições = [(fator, ms), ...]
+    """
+    medicoes = []
+    if algoritmo == 'scrypt':
+        # N precisa ser potência de 2: dobra até atingir o alvo
+        fator = 2 ** 14
+        sugerido = fator
+        while fator <= MAX_SCRYPT_N:
+            ms = time_hash(algoritmo, fator, rodadas) * 1000
+            medicoes.append((fator, ms))
+            sugerido = fator
+            if ms >= alvo_ms:
+                break
+            fator *= 2
+        return sugerido, medicoes
+
+    # PBKDF2 escala linearmente com as iterações
+    base = 100000
+    ms = time_hash(algoritmo, base, rodadas) * 1000
+    medicoes.append((base, ms))
+    sugerido = max(base, int(base * alvo_ms / ms) // 10000 * 10000)
+    medicoes.append((sugerido, time_hash(algoritmo, sugerido, rodadas) * 1000))
+    return sugerido, medicoes
@@ -4,6 +4,8 @@ Validador de senhas para Sistema Alpha Gestão Documental
 import re
 from typing import List, Tuple
 
+from app.utils.breached_passwords import is_breached
+
 class PasswordValidator:
     """Classe para validar força e segurança de senhas"""
     
@@ -15,6 +17,7 @@ class PasswordValidator:
         'password123', 'admin123', '123456a', 'qwerty123',
         '000000', '654321', '1q2w3e4r', 'qwertyuiop', '1qaz2wsx'
     ]
+    _COMMON_LOWER = frozenset(p.lower() for p in COMMON_PASSWORDS)
     
     @staticmethod
     def validate_password(password: str, username: str = '', email: str = '') -> Tuple[bool, List[str]]:
@@ -55,9 +58,11 @@ class PasswordValidator:
         if not re.search(r'[!@#$%^&*(),.?\":{}|<>]', password):
             errors.append("A senha deve conter pelo menos um caractere especial (!@#$%^&*(),.?\":{}|<>)")
         
-        # Verificar se não é uma senha comum
-        if password.lower() in [p.lower() for p in PasswordValidator.COMMON_PASSWORDS]:
+        # Verificar se não é uma senha comum ou vazada
+        if PasswordValidator._is_common(password):
             errors.append("Esta senha é muito comum e insegura")
+        elif is_breached(password):
+            errors.append("Esta senha aparece em vazamentos de dados conhecidos; escolha outra")
         
         # Verificar se não contém o nome de usuário
         if username and len(username) >= 3 and username.lower() in password.lower():
@@ -79,6 +84,11 @@ class PasswordValidator:
         
         return len(errors) == 0, errors
     
+    @staticmethod
+    def _is_common(password: str) -> bool:
+        """Verifica se a senha está na lista interna de senhas comuns"""
+        return password.lower() in PasswordValidator._COMMON_LOWER
+    
     @staticmethod
     def _has_simple_sequences(password: str) -> bool:
         """Verifica se a senha contém sequências simples"""
@@ -157,7 +167,7 @@ class PasswordValidator:
             score += 10
         
         # Penalidades
-        if password.lower() in [p.lower() for p in PasswordValidator.COMMON_PASSWORDS]:
+        if PasswordValidator._is_common(password) or is_breached(password):
             score -= 25
         
         if PasswordValidator._has_simple_sequences(password):
@@ -0,0 +1,416 @@
+"""
+Exportação em PDF (ReportLab) - Sistema Alpha Gestão Documental
+
+Importado sob demanda pelas rotas de exportação: o ReportLab e o html2text
+só são carregados no worker que de fato gera um PDF.
+"""
+import os
+import re
+import tempfile
+from datetime import datetime
+
+import html2text
+from flask import make_response
+from flask_login import current_user
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, BaseDocTemplate, PageTemplate, Frame
+
+from app.utils.metrics import observe_pdf_render
+
+
+def clean_html_for_pdf(html_content):
+    """Converter HTML para texto limpo para PDF, mantendo estrutura básica"""
+    if not html_content:
+        return ""
+
+    # Converter HTML para texto mantendo estrutura
+    h = html2text.HTML2Text()
+    h.ignore_links = False
+    h.body_width = 0  # Não quebrar linhas automaticamente
+    h.protect_links = True
+    h.use_automatic_links = False
+    text = h.handle(html_content)
+
+    return text
+
+
+class DocumentPDFTemplate(BaseDocTemplate):
+    """Template personalizado para documentos controlados"""
+
+    def __init__(self, filename, document, **kwargs):
+        self.document = document
+        BaseDocTemplate.__init__(self, filename, **kwargs)
+
+        # Configurar frame principal
+        frame = Frame(
+            2*cm, 2*cm, 17*cm, 23*cm,
+            leftPadding=0, bottomPadding=0, rightPadding=0, topPadding=0
+        )
+
+        # Template de página
+        template = PageTemplate(
+            id='main',
+            frames=[frame],
+            onPage=self.on_page,
+            pagesize=A4
+        )
+
+        self.addPageTemplates([template])
+
+    def on_page(self, canvas, doc):
+        """Adicionar header, footer e watermark em cada página"""
+        canvas.saveState()
+
+        # Header
+        canvas.setFont('Helvetica-Bold', 10)
+        canvas.drawString(2*cm, 27*cm, f"DOCUMENTO CONTROLADO - Código: {self.document.codigo or 'N/A'}")
+        canvas.drawString(2*cm, 26.5*cm, f"Título: {(self.document.titulo or 'Sem título')[:60]}")
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(2*cm, 26*cm, f"Versão: {self.document.versao_atual or '1.0'} | Status: {(self.document.status or 'rascunho').upper()}")
+
+        # Linha horizontal
+        canvas.line(2*cm, 25.7*cm, 19*cm, 25.7*cm)
+
+        # Footer com numeração
+        canvas.setFont('Helvetica', 8)
+        canvas.drawString(2*cm, 1.5*cm, f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}")
+        canvas.drawRightString(19*cm, 1.5*cm, f"Página {doc.page}")
+        canvas.drawCentredText(10.5*cm, 1.2*cm, "*** COPIA NAO CONTROLADA - Consulte sempre a versao eletronica ***")
+
+        # Linha horizontal footer
+        canvas.line(2*cm, 1.8*cm, 19*cm, 1.8*cm)
+
+        # Watermark diagonal (mais seguro sem setFillAlpha)
+        canvas.setFont('Helvetica-Bold', 40)
+        canvas.setFillColorRGB(0.9, 0.9, 0.9)  # Cinza claro
+        canvas.rotate(45)
+        canvas.drawCentredText(15*cm, -5*cm, "DOCUMENTO CONTROLADO")
+
+        canvas.restoreState()
+
+
+def generate_document_pdf(document, current_version):
+    """Gerar PDF do documento usando ReportLab"""
+    # Criar arquivo temporário
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+    temp_filename = temp_file.name
+    temp_file.close()
+
+    try:
+        # Configurar documento PDF com template personalizado
+        doc = DocumentPDFTemplate(
+            temp_filename,
+            document,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=3*cm,  # Mais espaço para header
+            bottomMargin=2.5*cm  # Mais espaço para footer
+        )
+
+        # Estilos
+        styles = getSampleStyleSheet()
+
+        # Estilos personalizados para qualidade
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Title'],
+            fontSize=16,
+            spaceAfter=30,
+            textColor=colors.black,
+            alignment=TA_CENTER
+        )
+
+        header_style = ParagraphStyle(
+            'CustomHeader',
+            parent=styles['Heading1'],
+            fontSize=14,
+            spaceAfter=12,
+            textColor=colors.darkblue,
+            leftIndent=0
+        )
+
+        subheader_style = ParagraphStyle(
+            'CustomSubHeader',
+            parent=styles['Heading2'],
+            fontSize=12,
+            spaceAfter=10,
+            textColor=colors.darkblue,
+            leftIndent=0
+        )
+
+        normal_style = ParagraphStyle(
+            'CustomNormal',
+            parent=styles['Normal'],
+            fontSize=10,
+            spaceAfter=6,
+            alignment=TA_JUSTIFY,
+            leftIndent=0
+        )
+
+        # Lista de elementos do PDF
+        story = []
+
+        # Cabeçalho do documento
+        header_data = [
+            ['DOCUMENTO CONTROLADO', '', '', ''],
+            ['Código:', document.codigo or 'N/A', 'Versão:', document.versao_atual or '1.0'],
+            ['Título:', document.titulo or 'Sem título', 'Tipo:', document.tipo or 'N/A'],
+            ['Departamento:', document.departamento or 'N/A', 'Status:', (document.status or 'rascunho').upper()],
+            ['Autor:', document.autor.nome_completo if document.autor else 'N/A', 
+             'Data:', document.data_criacao.strftime('%d/%m/%Y') if document.data_criacao else 'N/A'],
+        ]
+
+        if document.data_validade:
+            header_data.append(['Validade:', document.data_validade.strftime('%d/%m/%Y'), 
+                              'Próxima Revisão:', document.data_validade.strftime('%d/%m/%Y')])
+
+        header_table = Table(header_data, colWidths=[3*cm, 5*cm, 3*cm, 5*cm])
+        header_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+
+        story.append(header_table)
+        story.append(Spacer(1, 20))
+
+        # Título do documento
+        story.append(Paragraph(document.titulo or 'Sem título', title_style))
+        story.append(Spacer(1, 20))
+
+        # Resumo se disponível
+        if document.resumo:
+            story.append(Paragraph("RESUMO EXECUTIVO", header_style))
+            story.append(Paragraph(document.resumo, normal_style))
+            story.append(Spacer(1, 15))
+
+        # Conteúdo do documento
+        if current_version and current_version.conteudo:
+            story.append(Paragraph("CONTEÚDO DO DOCUMENTO", header_style))
+
+            # Converter HTML para texto estruturado
+            content_text = clean_html_for_pdf(current_version.conteudo)
+
+            # Processar o texto linha por linha para manter estrutura
+            lines = content_text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    story.append(Spacer(1, 6))
+                    continue
+
+                # Detectar cabeçalhos (linhas que começam com #)
+                if line.startswith('# '):
+                    story.append(Paragraph(line[2:], header_style))
+                elif line.startswith('## '):
+                    story.append(Paragraph(line[3:], subheader_style))
+                elif line.startswith('### '):
+                    story.append(Paragraph(line[4:], subheader_style))
+                elif line.startswith('**') and line.endswith('**'):
+                    # Texto em negrito
+                    bold_style = ParagraphStyle(
+                        'Bold',
+                        parent=normal_style,
+                        fontName='Helvetica-Bold'
+                    )
+                    story.append(Paragraph(line[2:-2], bold_style))
+                elif line.startswith('- ') or line.startswith('* '):
+                    # Lista não ordenada
+                    story.append(Paragraph(f"• {line[2:]}", normal_style))
+                elif re.match(r'^\d+\. ', line):
+                    # Lista ordenada
+                    story.append(Paragraph(line, normal_style))
+                else:
+                    # Parágrafo normal
+                    story.append(Paragraph(line, normal_style))
+
+        # Palavras-chave
+        if document.palavras_chave:
+            story.append(Spacer(1, 20))
+            story.append(Paragraph("PALAVRAS-CHAVE", header_style))
+            story.append(Paragraph(document.palavras_chave, normal_style))
+
+        # Rodapé com informações de controle
+        story.append(Spacer(1, 30))
+        footer_data = [
+            ['CONTROLE DO DOCUMENTO'],
+            ['Este é um documento controlado. Cópias impressas não são controladas.'],
+            ['Sempre consulte a versão eletrônica mais atual no sistema.'],
+            [f'Gerado em: {datetime.now().strftime("%d/%m/%Y às %H:%M")}'],
+            [f'Por: {current_user.nome_completo if current_user else "Sistema"}']
+        ]
+
+        footer_table = Table(footer_data, colWidths=[16*cm])
+        footer_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+
+        story.append(footer_table)
+
+        # Gerar PDF usando template personalizado
+        with observe_pdf_render('document'):
+            doc.build(story)
+
+        return temp_filename
+
+    except Exception as e:
+        # Limpar arquivo temporário em caso de erro
+        if os.path.exists(temp_filename):
+            os.unlink(temp_filename)
+        raise e
+
+
+def export_reports_pdf(data):
+    """Exportar relatórios em PDF"""
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
+    temp_filename = temp_file.name
+    temp_file.close()
+
+    try:
+        doc = SimpleDocTemplate(
+            temp_filename,
+            pagesize=A4,
+            rightMargin=2*cm,
+            leftMargin=2*cm,
+            topMargin=2*cm,
+            bottomMargin=2*cm
+        )
+
+        styles = getSampleStyleSheet()
+        story = []
+
+        # Título
+        title_style = ParagraphStyle(
+            'Title',
+            parent=styles['Title'],
+            fontSize=18,
+            spaceAfter=30,
+            alignment=TA_CENTER
+        )
+        story.append(Paragraph("RELATÓRIO DE DOCUMENTOS", title_style))
+        story.append(Paragraph(f"Gerado em: {datetime.now().strftime('%d/%m/%Y às %H:%M')}", styles['Normal']))
+        story.append(Spacer(1, 20))
+
+        # Resumo Executivo
+        story.append(Paragraph("RESUMO EXECUTIVO", styles['Heading1']))
+
+        summary_data = [
+            ['Métrica', 'Valor'],
+            ['Total de Documentos', str(data['total_documentos'])],
+            ['Documentos Ativos', str(data['ativos'])],
+            ['Documentos Aprovados', str(data['aprovados'])],
+            ['Rascunhos', str(data['rascunhos'])],
+            ['Em Revisão', str(data['em_revisao'])],
+            ['Obsoletos', str(data['obsoletos'])],
+            ['Vencidos', str(data['vencidos'])],
+            ['Vencendo (30 dias)', str(data['vencendo'])],
+            ['Criados (último mês)', str(data['criados_mes'])]
+        ]
+
+        summary_table = Table(summary_data, colWidths=[8*cm, 4*cm])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+
+        story.append(summary_table)
+        story.append(Spacer(1, 20))
+
+        # Documentos por Tipo
+        if data['por_tipo']:
+            story.append(Paragraph("DOCUMENTOS POR TIPO", styles['Heading1']))
+
+            tipo_data = [['Tipo', 'Quantidade', 'Percentual']]
+            for tipo, count in data['por_tipo']:
+                percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+                tipo_data.append([tipo or 'N/A', str(count), f"{percentage:.1f}%"])
+
+            tipo_table = Table(tipo_data, colWidths=[6*cm, 3*cm, 3*cm])
+            tipo_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ]))
+
+            story.append(tipo_table)
+            story.append(Spacer(1, 20))
+
+        # Documentos por Departamento
+        if data['por_departamento']:
+            story.append(Paragraph("DOCUMENTOS POR DEPARTAMENTO", styles['Heading1']))
+
+            dept_data = [['Departamento', 'Quantidade', 'Percentual']]
+            for dept, count in data['por_departamento']:
+                percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+                dept_data.append([dept or 'N/A', str(count), f"{percentage:.1f}%"])
+
+            dept_table = Table(dept_data, colWidths=[6*cm, 3*cm, 3*cm])
+            dept_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ]))
+
+            story.append(dept_table)
+
+        with observe_pdf_render('reports'):
+            doc.build(story)
+
+        # Ler arquivo PDF
+        with open(temp_filename, 'rb') as f:
+            pdf_data = f.read()
+
+        # Limpar arquivo temporário
+        os.unlink(temp_filename)
+
+        # Criar resposta
+        response = make_response(pdf_data)
+        response.headers['Content-Type'] = 'application/pdf'
+        response.headers['Content-Disposition'] = f'attachment; filename="relatorio_documentos_{datetime.now().strftime("%Y%m%d_%H%M")}.pdf"'
+
+        return response
+
+    except Exception as e:
+        if os.path.exists(temp_filename):
+            os.unlink(temp_filename)
+        raise e
@@ -0,0 +1,131 @@
+"""
+Perfis e permissões - Sistema Alpha Gestão Documental
+
+Cada perfil (User.perfil) é compilado uma única vez, na inicialização, em
+uma máscara de bits de capacidades. A verificação de acesso passa a ser um
+AND de inteiros, e o índice inverso (capacidade -> perfis) permite filtrar
+direto no SQL (ex.: usuários que podem liderar auditorias, documentos que o
+usuário pode ver) em vez de carregar tudo e filtrar em Python.
+
+Os perfis podem ser ajustados por ROLE_CAPABILITIES na configuração
+({perfil: [nomes de capacidades]}), mesclado sobre o padrão abaixo.
+"""
+from enum import IntFlag
+from functools import wraps
+
+from flask import flash, jsonify, redirect, request, url_for
+from flask_login import current_user
+from sqlalchemy import or_, true
+
+
+class Capability(IntFlag):
+    """Capacidades atribuíveis a perfis"""
+    CREATE_DOCUMENTS = 1 << 0      # Criar documentos, NCs e equipamentos
+    APPROVE_DOCUMENTS = 1 << 1     # Revisar/aprovar documentos e assinar
+    VIEW_ALL_DOCUMENTS = 1 << 2    # Ver rascunhos de outros autores
+    MANAGE_QUALITY = 1 << 3        # Alertas e notificações da gestão da qualidade
+    LEAD_AUDITS = 1 << 4           # Ser auditor líder
+    VIEW_AUDIT_LOGS = 1 << 5       # Consultar os logs de auditoria
+    ADMIN = 1 << 6                 # Administração do sistema
+
+
+ROLE_CAPABILITIES = {
+    'administrador': [c.name for c in Capability],
+    'gestor_qualidade': ['CREATE_DOCUMENTS', 'APPROVE_DOCUMENTS', 'VIEW_ALL_DOCUMENTS',
+                         'MANAGE_QUALITY', 'LEAD_AUDITS'],
+    'aprovador_revisor': ['APPROVE_DOCUMENTS', 'VIEW_ALL_DOCUMENTS'],
+    'auditor': ['LEAD_AUDITS', 'VIEW_AUDIT_LOGS'],
+    'colaborador_leitor': [],
+}
+
+_role_masks = None
+_roles_by_capability = None
+
+
+def compile_roles(overrides=None):
+    """Compila os perfis em máscaras de bits e o índice capacidade -> perfis"""
+    global _role_masks, _roles_by_capability
+
+    perfis = dict(ROLE_CAPABILITIES)
+    perfis.update(overrides or {})
+
+    masks = {}
+    for perfil, nomes in perfis.items():
+        mask = Capability(0)
+        for nome in nomes:
+            try:
+                mask |= Capability[nome]
+            except KeyError:
+                raise ValueError(f'Capacidade desconhecida "{nome}" no perfil {perfil}')
+        masks[perfil] = mask
+
+    _roles_by_capability = {
+        capability: tuple(sorted(perfil for perfil, mask in masks.items() if mask & capability))
+        for capability in Capability
+    }
+    _role_masks = masks
+
+
+def init_permissions(app):
+    """Compila os perfis na inicialização da aplicação"""
+    compile_roles(app.config.get('ROLE_CAPABILITIES'))
+
+
+def _masks():
+    if _role_masks is None:
+        compile_roles()
+    return _role_masks
+
+
+def capabilities_for(perfil):
+    """Máscara de capacidades do perfil (vazia para perfis desconhecidos)"""
+    return _masks().get(perfil, Capability(0))
+
+
+def has_capability(user, capability):
+    """Verifica se o perfil do usuário inclui todas as capacidades informadas"""
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return False
+    return capabilities_for(user.perfil) & capability == capability
+
+
+def roles_with(capability):
+    """Perfis que têm a capacidade"""
+    _masks()
+    return _roles_by_capability[capability]
+
+
+def users_with(capability):
+    """Predicado SQL: usuários cujo perfil tem a capacidade"""
+    from app.models import User
+    return User.perfil.in_(roles_with(capability))
+
+
+def visible_documents(user):
+    """
+    Predicado SQL dos documentos que o usuário pode ver: todos para quem tem
+    VIEW_ALL_DOCUMENTS; para os demais, os que não são rascunho e os próprios.
+    """
+    from app.models import Document
+
+    if has_capability(user, Capability.VIEW_ALL_DOCUMENTS):
+        return true()
+    return or_(Document.status != 'rascunho', Document.autor_id == user.id)
+
+
+def requires(capability, message='Acesso negado.', redirect_to='dashboard.index'):
+    """
+    Decorator de rota: exige a capacidade do usuário autenticado (usar após
+    @login_required). Responde 403 em JSON para AJAX; senão redireciona.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not has_capability(current_user, capability):
+                if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                    return jsonify({'success': False, 'error': message}), 403
+                flash(message, 'error')
+                return redirect(url_for(redirect_to))
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,124 @@
+"""
+Usuário autenticado em cache - Sistema Alpha Gestão Documental
+
+O user_loader consultava a tabela users a cada requisição autenticada. Agora
+ele devolve um UserPrincipal: um retrato imutável das colunas usadas nas
+verificações de acesso e nas telas (perfil, grupo, nome...), mantido em um
+cache LRU por processo com TTL curto (USER_CACHE_TTL). Qualquer outro
+atributo, método ou alteração é repassado ao User real, carregado sob
+demanda no máximo uma vez por requisição.
+
+O cache é invalidado no processo quando um User é alterado ou excluído
+(after_update/after_delete do mapper); nos demais processos a alteração
+passa a valer em no máximo USER_CACHE_TTL segundos.
+
+Com USER_SESSION_SNAPSHOT ativo o retrato também é guardado na sessão
+(cookie assinado pelo Flask), e um processo que ainda não tem o usuário em
+cache o autentica sem consulta enquanto o retrato for mais novo que o TTL.
+"""
+import time
+
+from flask import current_app, g, has_request_context, session
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from app import db
+from app.models import User
+from app.utils.lru_cache import LRUCache
+
+SNAPSHOT_FIELDS = ('id', 'username', 'email', 'nome_completo', 'perfil', 'grupo_id', 'cargo',
+                   'ativo', 'receber_notificacoes')
+SESSION_KEY = '_principal'
+
+_cache = LRUCache(max_size=1024)
+
+
+class UserPrincipal(UserMixin):
+    """Retrato somente leitura do usuário autenticado (compartilhado entre requisições)"""
+
+    def __init__(self, dados):
+        object.__setattr__(self, '_dados', {campo: dados[campo] for campo in SNAPSHOT_FIELDS})
+
+    def _user(self):
+        """User real, carregado uma vez por requisição"""
+        user = g.get('_principal_user')
+        if user is None or user.id != self._dados['id']:
+            user = db.session.get(User, self._dados['id'])
+            g._principal_user = user
+        return user
+
+    def __getattr__(self, nome):
+        # Depois que o User real foi carregado na requisição, ele prevalece
+        # (reflete alterações ainda não gravadas)
+        user = g.get('_principal_user') if has_request_context() else None
+        if user is not None and user.id == self._dados['id']:
+            return getattr(user, nome)
+        if nome in self._dados:
+            return self._dados[nome]
+        return getattr(self._user(), nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._user(), nome, valor)
+
+    def __repr__(self):
+        return f'<UserPrincipal {self._dados["username"]}>'
+
+
+# Regras de permissão compartilhadas com o modelo (dependem apenas do retrato)
+for _nome in ('has_capability', 'can_create_documents', 'can_approve_documents', 'can_admin', 'is_admin'):
+    setattr(UserPrincipal, _nome, getattr(User, _nome))
+
+
+def _snapshot(user):
+    return {campo: getattr(user, campo) for campo in SNAPSHOT_FIELDS}
+
+
+def _from_session(user_id, ttl):
+    if not current_app.config.get('USER_SESSION_SNAPSHOT'):
+        return None
+    dados = session.get(SESSION_KEY)
+    if not dados or dados.get('id') != user_id or time.time() - dados.get('emitido', 0) > ttl:
+        return None
+    return dados
+
+
+def load_principal(user_id):
+    """Carrega o usuário autenticado (cache do processo, sessão e, por fim, o banco)"""
+    ttl = current_app.config.get('USER_CACHE_TTL', 60)
+    _cache.ttl = ttl
+
+    principal = _cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    dados = _from_session(user_id, ttl)
+    if dados is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        g._principal_user = user
+        dados = _snapshot(user)
+        if current_app.config.get('USER_SESSION_SNAPSHOT'):
+            session[SESSION_KEY] = dict(dados, emitido=time.time())
+
+    principal = UserPrincipal(dados)
+    _cache.set(user_id, principal)
+    return principal
+
+
+def invalidate(user_id):
+    """Descarta o retrato do usuário (cache do processo e sessão corrente)"""
+    _cache.pop(user_id)
+    if has_request_context() and session.get(SESSION_KEY, {}).get('id') == user_id:
+        session.pop(SESSION_KEY, None)
+
+
+def _user_changed(mapper, connection, target):
+    invalidate(target.id)
+
+
+def init_principal_listeners():
+    """Invalida o cache quando um User é alterado ou excluído (idempotente)"""
+    for evento in ('after_update', 'after_delete'):
+        if not event.contains(User, evento, _user_changed):
+            event.listen(User, evento, _user_changed)
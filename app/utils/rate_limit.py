@@ -0,0 +1,201 @@
+"""
+Limitação de tentativas (rate limiting) - Sistema Alpha Gestão Documental
+
+Janela deslizante aproximada: cada chave (ex.: login por IP, login por
+e-mail) conta as requisições da janela fixa atual e da anterior, e a
+estimativa é anterior * (fração restante da janela) + atual. São dois
+contadores por chave, sem guardar cada requisição.
+
+A verificação é feita antes de qualquer consulta ou hash de senha, de modo
+que rajadas de tentativas são recusadas a custo quase nulo.
+
+Armazenamento (RATE_LIMIT_STORAGE):
+
+* memory: contadores no processo (cada worker conta separadamente);
+* sqlite:///caminho/arquivo.db: arquivo SQLite local em modo WAL,
+  compartilhado por todos os workers da máquina.
+
+Regras no formato "limite/segundos" (ex.: RATE_LIMIT_LOGIN_IP = '30/300').
+"""
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from functools import wraps
+
+from flask import current_app, request
+from werkzeug.exceptions import TooManyRequests
+
+RateLimitResult = namedtuple('RateLimitResult', 'permitido restante retry_after')
+
+PURGE_EVERY = 1000  # Limpeza dos contadores expirados a cada N registros
+
+
+class MemoryStore:
+    """Contadores em memória do processo"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+
+    def hit(self, chave, janela, expira_em):
+        with self._lock:
+            atual = self._data.get((chave, janela), (0, expira_em))[0] + 1
+            self._data[(chave, janela)] = (atual, expira_em)
+            anterior = self._data.get((chave, janela - 1), (0, 0))[0]
+
+            self._hits += 1
+            if self._hits % PURGE_EVERY == 0:
+                agora = time.time()
+                for key in [k for k, (_, expira) in self._data.items() if expira < agora]:
+                    del self._data[key]
+        return atual, anterior
+
+    def reset(self, chave):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == chave]:
+                del self._data[key]
+
+
+class SQLiteStore:
+    """Contadores em um arquivo SQLite local, compartilhado entre processos"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limits (
+                    chave TEXT NOT NULL,
+                    janela INTEGER NOT NULL,
+                    contagem INTEGER NOT NULL,
+                    expira_em REAL NOT NULL,
+                    PRIMARY KEY (chave, janela)
+                ) WITHOUT ROWID
+            """)
+            self._local.conn = conn
+        return conn
+
+    def hit(self, chave, janela, expira_em):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("""
+                INSERT INTO rate_limits (chave, janela, contagem, expira_em) VALUES (?, ?, 1, ?)
+                ON CONFLICT (chave, janela) DO UPDATE SET contagem = contagem + 1
+            """, (chave, janela, expira_em))
+            contagens = dict(conn.execute(
+                'SELECT janela, contagem FROM rate_limits WHERE chave = ? AND janela IN (?, ?)',
+                (chave, janela, janela - 1)
+            ).fetchall())
+
+            self._hits += 1
+            if self._hits % PURGE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limits WHERE expira_em < ?', (time.time(),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return contagens.get(janela, 0), contagens.get(janela - 1, 0)
+
+    def reset(self, chave):
+        self._connection().execute('DELETE FROM rate_limits WHERE chave = ?', (chave,))
+
+
+def parse_rule(regra):
+    """'30/300' -> (30, 300)"""
+    limite, periodo = str(regra).split('/')
+    return int(limite), int(periodo)
+
+
+class RateLimiter:
+    """Limitador por janela deslizante sobre o armazenamento configurado"""
+
+    def __init__(self):
+        self._store = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    storage = current_app.config.get('RATE_LIMIT_STORAGE', 'memory')
+                    if storage.startswith('sqlite:///'):
+                        self._store = SQLiteStore(storage[len('sqlite:///'):])
+                    else:
+                        self._store = MemoryStore()
+        return self._store
+
+    def hit(self, nome, chave, regra):
+        """
+        Registra uma requisição e verifica o limite.
+
+        Args:
+            nome: nome da regra (ex.: 'login_ip')
+            chave: identificador limitado (IP, e-mail...)
+            regra: 'limite/segundos' ou tupla (limite, segundos)
+        """
+        limite, periodo = parse_rule(regra) if isinstance(regra, str) else regra
+        if not current_app.config.get('RATE_LIMIT_ENABLED', True) or not chave:
+            return RateLimitResult(True, limite, 0)
+
+        agora = time.time()
+        janela = int(agora // periodo)
+        atual, anterior = self.store.hit(f'{nome}:{chave}', janela, (janela + 2) * periodo)
+
+        decorrido = (agora % periodo) / periodo
+        estimado = anterior * (1 - decorrido) + atual
+        if estimado > limite:
+            return RateLimitResult(False, 0, int(periodo - agora % periodo) + 1)
+        return RateLimitResult(True, int(limite - estimado), 0)
+
+    def reset(self, nome, chave):
+        """Zera os contadores da chave (ex.: após login bem-sucedido)"""
+        if chave:
+            self.store.reset(f'{nome}:{chave}')
+
+
+limiter = RateLimiter()
+
+
+def client_ip():
+    """
+    IP do cliente. Atrás de RATE_LIMIT_TRUSTED_PROXIES proxies confiáveis usa
+    a entrada correspondente do X-Forwarded-For (as anteriores podem ser
+    forjadas pelo cliente).
+    """
+    proxies = current_app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+    encaminhados = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+    if proxies and len(encaminhados) >= proxies:
+        return encaminhados[-proxies]
+    return request.remote_addr
+
+
+def check(nome, chave=None):
+    """Aplica a regra RATE_LIMIT_<NOME> à chave (padrão: IP do cliente)"""
+    regra = current_app.config.get(f'RATE_LIMIT_{nome.upper()}')
+    if not regra:
+        return RateLimitResult(True, 0, 0)
+    return limiter.hit(nome, chave if chave is not None else client_ip(), regra)
+
+
+def rate_limited(nome):
+    """Decorator de rota: aplica a regra por IP e responde 429 ao exceder"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            resultado = check(nome)
+            if not resultado.permitido:
+                raise TooManyRequests(retry_after=resultado.retry_after)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,275 @@
+"""
+Cobertura de leitura de documentos - Sistema Alpha Gestão Documental
+
+Responde "quem do grupo X ainda não leu a versão vigente do documento Z"
+para um Group ou DocumentType inteiro com uma única consulta: o produto
+usuários x documentos aprovados é cruzado com document_readings por LEFT
+JOIN na versão atual, e as células sem leitura (anti-join) são as
+pendências. O resultado fica em cache por escopo, invalidado quando surgem
+novas leituras ou versões e, de qualquer forma, após READ_COVERAGE_CACHE_TTL.
+
+Em PostgreSQL o resumo por documento e grupo vem da materialized view
+read_coverage_summary. Como o PostgreSQL não atualiza materialized views
+de forma incremental, novas leituras apenas marcam o resumo como
+desatualizado e uma thread por processo executa REFRESH ... CONCURRENTLY
+no máximo a cada READ_COVERAGE_REFRESH_INTERVAL segundos, sem bloquear
+as leituras da view.
+"""
+import csv
+import io
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import and_, func, select, text, true
+
+from app import db
+from app.models import Document, DocumentReading, DocumentVersion, User, document_type_groups
+from app.utils.lru_cache import LRUCache
+
+SUMMARY_VIEW = 'read_coverage_summary'
+EXPORT_COLUMNS = ('usuario_id', 'usuario', 'grupo_id', 'documento_id', 'codigo', 'titulo',
+                  'versao', 'situacao', 'data_leitura')
+
+_cache = LRUCache(max_size=64)
+
+
+def _documents_query(tipo_documento_id=None):
+    """Documentos aprovados e ativos cuja leitura é acompanhada"""
+    query = db.session.query(
+        Document.id, Document.codigo, Document.titulo, Document.versao_atual
+    ).filter(Document.ativo.is_(True), Document.status == 'aprovado')
+    if tipo_documento_id:
+        query = query.filter(Document.tipo_documento_id == tipo_documento_id)
+    return query
+
+
+def _users_query(group_id=None, tipo_documento_id=None):
+    """Usuários ativos do escopo (grupo informado ou grupos ligados ao tipo)"""
+    query = db.session.query(User.id, User.nome_completo, User.grupo_id).filter(User.ativo.is_(True))
+    if group_id:
+        query = query.filter(User.grupo_id == group_id)
+    elif tipo_documento_id:
+        grupos_do_tipo = select(document_type_groups.c.group_id).where(
+            document_type_groups.c.document_type_id == tipo_documento_id
+        )
+        query = query.filter(User.grupo_id.in_(grupos_do_tipo))
+    return query
+
+
+def _matrix_query(group_id=None, tipo_documento_id=None, pending_only=False):
+    """Consulta única usuários x documentos com a leitura da versão vigente"""
+    usuarios = _users_query(group_id, tipo_documento_id).subquery()
+    documentos = _documents_query(tipo_documento_id).subquery()
+
+    query = db.session.query(
+        usuarios.c.id.label('usuario_id'),
+        usuarios.c.nome_completo.label('usuario'),
+        usuarios.c.grupo_id,
+        documentos.c.id.label('documento_id'),
+        documentos.c.codigo,
+        documentos.c.titulo,
+        documentos.c.versao_atual.label('versao'),
+        DocumentReading.data_leitura
+    ).select_from(usuarios).join(documentos, true()).outerjoin(
+        DocumentReading,
+        and_(DocumentReading.documento_id == documentos.c.id,
+             DocumentReading.usuario_id == usuarios.c.id,
+             DocumentReading.versao_lida == documentos.c.versao_atual)
+    )
+    if pending_only:
+        # Anti-join: apenas as células sem leitura da versão vigente
+        query = query.filter(DocumentReading.id.is_(None))
+    return query.order_by(usuarios.c.nome_completo, documentos.c.codigo)
+
+
+def _fingerprint():
+    """Muda sempre que há novas leituras ou versões"""
+    return db.session.query(
+        db.session.query(func.max(DocumentReading.id)).scalar_subquery(),
+        db.session.query(func.max(DocumentVersion.id)).scalar_subquery()
+    ).one()
+
+
+def coverage_matrix(group_id=None, tipo_documento_id=None):
+    """
+    Matriz de leitura usuário x documento do escopo, com cache.
+
+    Returns:
+        dict com usuarios, documentos, leituras ({documento_id: {usuario_id: data}}),
+        total_celulas e total_lidas
+    """
+    key = ('matriz', group_id, tipo_documento_id, tuple(_fingerprint()))
+    resultado = _cache.get(key)
+    if resultado is not None:
+        return resultado
+
+    usuarios, documentos, leituras = {}, {}, {}
+    lidas = 0
+    for row in _matrix_query(group_id, tipo_documento_id):
+        usuarios.setdefault(row.usuario_id, {'id': row.usuario_id, 'nome': row.usuario,
+                                             'grupo_id': row.grupo_id})
+        documentos.setdefault(row.documento_id, {'id': row.documento_id, 'codigo': row.codigo,
+                                                 'titulo': row.titulo, 'versao': row.versao})
+        if row.data_leitura is not None:
+            leituras.setdefault(row.documento_id, {})[row.usuario_id] = row.data_leitura.isoformat()
+            lidas += 1
+
+    resultado = {
+        'usuarios': list(usuarios.values()),
+        'documentos': list(documentos.values()),
+        'leituras': leituras,
+        'total_celulas': len(usuarios) * len(documentos),
+        'total_lidas': lidas,
+    }
+    _cache.ttl = current_app.config.get('READ_COVERAGE_CACHE_TTL', 300)
+    _cache.set(key, resultado)
+    return resultado
+
+
+def pending_readings(group_id=None, tipo_documento_id=None):
+    """Lista (usuário, documento) ainda sem leitura da versão vigente"""
+    return [row._asdict() for row in _matrix_query(group_id, tipo_documento_id, pending_only=True)]
+
+
+def _summary_select():
+    """SELECT do resumo por documento e grupo (base da materialized view)"""
+    return """
+        SELECT d.id AS documento_id, u.grupo_id AS grupo_id, d.versao_atual AS versao,
+               COUNT(u.id) AS total_usuarios, COUNT(r.id) AS lidos
+        FROM documents d
+        CROSS JOIN users u
+        LEFT JOIN document_readings r
+               ON r.documento_id = d.id AND r.usuario_id = u.id AND r.versao_lida = d.versao_atual
+        WHERE d.ativo = :ativo AND d.status = 'aprovado'
+          AND u.ativo = :ativo AND u.grupo_id IS NOT NULL
+        GROUP BY d.id, u.grupo_id, d.versao_atual
+    """
+
+
+_view_exists = None
+
+
+def summary_view_exists():
+    """Verifica (uma vez por processo) se a materialized view existe"""
+    global _view_exists
+    if _view_exists is None:
+        if db.engine.dialect.name != 'postgresql':
+            _view_exists = False
+        else:
+            _view_exists = db.session.execute(
+                text('SELECT 1 FROM pg_matviews WHERE matviewname = :nome'), {'nome': SUMMARY_VIEW}
+            ).first() is not None
+    return _view_exists
+
+
+def coverage_summary(group_id=None, tipo_documento_id=None):
+    """Resumo por documento e grupo: total de usuários, lidos e percentual"""
+    if summary_view_exists():
+        sql = f'SELECT s.* FROM {SUMMARY_VIEW} s JOIN documents d ON d.id = s.documento_id WHERE 1 = 1'
+        params = {}
+    else:
+        sql = f'SELECT s.* FROM ({_summary_select()}) s JOIN documents d ON d.id = s.documento_id WHERE 1 = 1'
+        params = {'ativo': True}
+
+    if group_id:
+        sql += ' AND s.grupo_id = :grupo_id'
+        params['grupo_id'] = group_id
+    if tipo_documento_id:
+        sql += ' AND d.tipo_documento_id = :tipo_documento_id'
+        params['tipo_documento_id'] = tipo_documento_id
+
+    resumo = []
+    for row in db.session.execute(text(sql + ' ORDER BY s.documento_id, s.grupo_id'), params):
+        item = dict(row._mapping)
+        item['percentual'] = round(100.0 * item['lidos'] / item['total_usuarios'], 1) if item['total_usuarios'] else 0
+        resumo.append(item)
+    return resumo
+
+
+def create_summary_view():
+    """Cria a materialized view de resumo e o índice único exigido pelo REFRESH CONCURRENTLY"""
+    global _view_exists
+    with db.engine.begin() as connection:
+        if connection.dialect.name != 'postgresql':
+            return False
+        select_sql = _summary_select().replace(':ativo', 'TRUE')
+        connection.execute(text(f'CREATE MATERIALIZED VIEW IF NOT EXISTS {SUMMARY_VIEW} AS {select_sql}'))
+        connection.execute(text(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS ux_{SUMMARY_VIEW} ON {SUMMARY_VIEW} (documento_id, grupo_id)'
+        ))
+    _view_exists = True
+    return True
+
+
+def refresh_summary():
+    """Atualiza a materialized view sem bloquear leituras (um processo por vez)"""
+    if not summary_view_exists():
+        return False
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        conseguiu = connection.execute(
+            text('SELECT pg_try_advisory_lock(hashtext(:nome))'), {'nome': SUMMARY_VIEW}
+        ).scalar()
+        if not conseguiu:
+            return False
+        try:
+            connection.execute(text(f'REFRESH MATERIALIZED VIEW CONCURRENTLY {SUMMARY_VIEW}'))
+        finally:
+            connection.execute(text('SELECT pg_advisory_unlock(hashtext(:nome))'), {'nome': SUMMARY_VIEW})
+    return True
+
+
+class SummaryRefresher:
+    """Atualização adiada do resumo após novas leituras (uma thread por processo)"""
+
+    def __init__(self):
+        self._stale = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def mark_stale(self):
+        """Sinaliza novas leituras; a view é atualizada no próximo ciclo"""
+        if not summary_view_exists():
+            return
+        self._stale.set()
+        with self._lock:
+            if self._thread is None:
+                app = current_app._get_current_object()
+                self._thread = threading.Thread(target=self._loop, args=(app,),
+                                                name='read-coverage-refresh', daemon=True)
+                self._thread.start()
+
+    def _loop(self, app):
+        interval = app.config.get('READ_COVERAGE_REFRESH_INTERVAL', 60)
+        while True:
+            self._stale.wait()
+            time.sleep(interval)
+            self._stale.clear()
+            with app.app_context():
+                try:
+                    refresh_summary()
+                except Exception as e:
+                    app.logger.error(f'Erro ao atualizar {SUMMARY_VIEW}: {e}')
+
+
+summary_refresher = SummaryRefresher()
+
+
+def stream_csv(group_id=None, tipo_documento_id=None, pending_only=False):
+    """Exporta a matriz (uma linha por usuário x documento) em CSV"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    query = _matrix_query(group_id, tipo_documento_id, pending_only).yield_per(1000)
+    for row in query:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow([
+            row.usuario_id, row.usuario, row.grupo_id, row.documento_id, row.codigo, row.titulo,
+            row.versao, 'lido' if row.data_leitura else 'pendente',
+            row.data_leitura.isoformat() if row.data_leitura else ''
+        ])
+        yield buffer.getvalue()
@@ -0,0 +1,174 @@
+"""
+Registro de leituras de documentos - Sistema Alpha Gestão Documental
+
+As leituras são gravadas com INSERT ... ON CONFLICT DO NOTHING sobre o índice
+único (documento_id, usuario_id, versao_lida): não há SELECT prévio e
+visualizações simultâneas não geram duplicatas.
+
+Com READING_WRITE_BEHIND ativo, a visualização de um documento apenas
+enfileira a leitura em um buffer do processo, gravado em lote por uma
+thread a cada READING_FLUSH_INTERVAL segundos (ou ao atingir
+READING_BUFFER_MAX itens). Leituras ainda no buffer se perdem se o processo
+for encerrado abruptamente; a confirmação explícita (confirm_reading) é
+sempre gravada na hora.
+"""
+import atexit
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.utils.metrics import READING_BUFFER_SIZE
+
+UNIQUE_COLUMNS = ('documento_id', 'usuario_id', 'versao_lida')
+
+
+def _insert_ignore(connection, rows):
+    """INSERT em lote ignorando leituras já registradas; retorna linhas inseridas"""
+    from app.models import DocumentReading
+
+    dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(DocumentReading.__table__).values(rows)
+    stmt = stmt.on_conflict_do_nothing(index_elements=list(UNIQUE_COLUMNS))
+    return connection.execute(stmt).rowcount
+
+
+def _row(documento_id, usuario_id, versao, ip_address):
+    return {
+        'documento_id': documento_id,
+        'usuario_id': usuario_id,
+        'versao_lida': versao,
+        'ip_address': ip_address,
+        'data_leitura': datetime.utcnow(),
+    }
+
+
+def record_reading(documento_id, usuario_id, versao, ip_address=None):
+    """
+    Registra a leitura na transação corrente (o commit fica com a rota).
+
+    Returns:
+        bool: True se a leitura foi registrada agora, False se já existia
+    """
+    rows = [_row(documento_id, usuario_id, versao, ip_address)]
+    inserida = _insert_ignore(db.session.connection(), rows) > 0
+    if inserida:
+        _coverage_changed()
+    return inserida
+
+
+def _coverage_changed():
+    """Sinaliza ao relatório de cobertura que há leituras novas"""
+    from app.utils.read_coverage import summary_refresher
+    summary_refresher.mark_stale()
+
+
+class ReadingBuffer:
+    """Buffer de leituras por processo, gravado em lote em segundo plano"""
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+
+    def add(self, documento_id, usuario_id, versao, ip_address=None):
+        """Enfileira a leitura (repetições da mesma chave são descartadas)"""
+        key = (documento_id, usuario_id, versao)
+        with self._lock:
+            if key not in self._rows:
+                self._rows[key] = _row(documento_id, usuario_id, versao, ip_address)
+            READING_BUFFER_SIZE.set(len(self._rows))
+            cheio = len(self._rows) >= current_app.config.get('READING_BUFFER_MAX', 500)
+        if cheio:
+            self.flush()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._rows)
+
+    def flush(self):
+        """Grava as leituras pendentes; retorna quantas foram inseridas"""
+        with self._lock:
+            rows = list(self._rows.values())
+            self._rows.clear()
+            READING_BUFFER_SIZE.set(0)
+        if not rows:
+            return 0
+
+        try:
+            with db.engine.begin() as connection:
+                inseridas = _insert_ignore(connection, rows)
+            if inseridas:
+                _coverage_changed()
+            return inseridas
+        except Exception as e:
+            current_app.logger.error(f'Erro ao gravar leituras em lote: {e}')
+            # Devolve ao buffer para a próxima tentativa
+            with self._lock:
+                for row in rows:
+                    self._rows.setdefault((row['documento_id'], row['usuario_id'], row['versao_lida']), row)
+                READING_BUFFER_SIZE.set(len(self._rows))
+            return 0
+
+    def start(self, app):
+        """Inicia a thread de gravação periódica (uma por processo)"""
+        if self._thread is not None:
+            return
+        self._app = app
+        interval = app.config.get('READING_FLUSH_INTERVAL', 5)
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                with app.app_context():
+                    self.flush()
+
+        self._thread = threading.Thread(target=loop, name='reading-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self._flush_at_exit)
+
+    def _flush_at_exit(self):
+        with self._app.app_context():
+            self.flush()
+
+
+reading_buffer = ReadingBuffer()
+
+
+def track_view(documento_id, usuario_id, versao, ip_address=None):
+    """
+    Registra a leitura decorrente de uma visualização.
+
+    Com o write-behind ativo a visualização não escreve no banco; caso
+    contrário a leitura é gravada e confirmada imediatamente.
+    """
+    if current_app.config.get('READING_WRITE_BEHIND'):
+        reading_buffer.start(current_app._get_current_object())
+        reading_buffer.add(documento_id, usuario_id, versao, ip_address)
+        return
+
+    if record_reading(documento_id, usuario_id, versao, ip_address):
+        db.session.commit()
+
+
+def deduplicate_readings():
+    """
+    Remove leituras duplicadas (mantendo a mais antiga), que impediriam o
+    índice único criado pela migração 0001.
+
+    Returns:
+        int: número de linhas removidas
+    """
+    with db.engine.begin() as connection:
+        removidas = connection.execute(db.text("""
+            DELETE FROM document_readings
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM document_readings
+                GROUP BY documento_id, usuario_id, versao_lida
+            )
+        """)).rowcount
+    return removidas
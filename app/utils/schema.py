@@ -0,0 +1,180 @@
+"""
+Migrações do esquema (Alembic) - Sistema Alpha Gestão Documental
+
+O esquema é versionado em migrations/ (alembic.ini na raiz) e aplicado com
+`flask db upgrade` (ou `flask init-db`, que também cria os dados padrão).
+A migração base (0001) cria as tabelas ausentes e, em bancos criados antes
+das migrações (db.create_all / scripts migrate_*.py), acrescenta as colunas e
+índices que faltarem, sem recriar nada.
+
+Migrações de índices em tabelas grandes devem usar create_index_online():
+CREATE INDEX CONCURRENTLY no PostgreSQL, sem bloquear escritas.
+
+check_schema() compara a revisão gravada no banco (alembic_version) com a
+última migração: uma consulta, barata o bastante para a inicialização.
+"""
+import os
+import re
+
+from flask import current_app
+from sqlalchemy import inspect, text
+
+from app import db
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           'alembic.ini')
+
+# Objetos do banco mantidos fora dos modelos (ignorados na comparação)
+UNMANAGED_TABLES = re.compile(r'^(alembic_version|rate_limits|read_coverage_summary|audit_logs_(y\d{4}m\d{2}|default|legacy))$')
+
+
+def _other_dialect_only(obj, dialect):
+    """Objeto dos modelos restrito a outro dialeto (ex.: índice GIN com ddl_if PostgreSQL)"""
+    restricao = getattr(obj, '_ddl_if', None)
+    if restricao is None or restricao.dialect is None:
+        return False
+    dialetos = (restricao.dialect,) if isinstance(restricao.dialect, str) else tuple(restricao.dialect)
+    return dialect not in dialetos
+
+
+def include_object_for(dialect):
+    """
+    Filtro do autogenerate para o dialeto: ignora partições, views, tabelas
+    auxiliares e os objetos que só existem em outro banco.
+    """
+    def include_object(obj, name, type_, reflected, compare_to):
+        if type_ == 'table' and UNMANAGED_TABLES.match(name or ''):
+            return False
+        if type_ == 'index' and (name or '').endswith('_legacy'):
+            return False
+        if not reflected and _other_dialect_only(obj, dialect):
+            return False
+        return True
+    return include_object
+
+
+def alembic_config():
+    """Configuração do Alembic apontando para migrations/"""
+    from alembic.config import Config as AlembicConfig
+
+    config = AlembicConfig(ALEMBIC_INI)
+    config.set_main_option('script_location', os.path.join(os.path.dirname(ALEMBIC_INI), 'migrations'))
+    return config
+
+
+def head_revisions():
+    """Revisões mais recentes disponíveis em migrations/versions"""
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def current_revisions(connection=None):
+    """Revisões gravadas no banco (vazio se o banco ainda não é versionado)"""
+    def ler(conn):
+        if not inspect(conn).has_table('alembic_version'):
+            return set()
+        return {linha[0] for linha in conn.execute(text('SELECT version_num FROM alembic_version'))}
+
+    if connection is not None:
+        return ler(connection)
+    with db.engine.connect() as conn:
+        return ler(conn)
+
+
+def upgrade(revision='head'):
+    """Aplica as migrações até a revisão informada"""
+    from alembic import command
+    command.upgrade(alembic_config(), revision)
+
+
+def check_schema(full=False):
+    """
+    Verifica se o banco está na última migração.
+
+    Args:
+        full: também compara as tabelas/colunas/índices do banco com os
+            modelos (reflete o esquema inteiro; use em manutenção, não a cada início)
+
+    Returns:
+        Tuple(ok, List[str] de problemas)
+    """
+    problemas = []
+    atual, esperado = current_revisions(), head_revisions()
+    if not atual:
+        problemas.append('Banco sem controle de versão: execute `flask init-db` (ou `flask db upgrade`)')
+    elif atual != esperado:
+        problemas.append(f'Banco na revisão {", ".join(sorted(atual))}; '
+                         f'última migração {", ".join(sorted(esperado))}: execute `flask db upgrade`')
+
+    if full:
+        from alembic.autogenerate import compare_metadata
+        from alembic.migration import MigrationContext
+
+        with db.engine.connect() as connection:
+            contexto = MigrationContext.configure(connection, opts={
+                'include_object': include_object_for(connection.dialect.name),
+                'compare_type': True,
+            })
+            for diferenca in compare_metadata(contexto, db.metadata):
+                problemas.append(f'Diferença entre modelos e banco: {diferenca}')
+
+    return not problemas, problemas
+
+
+def create_index_online(op, nome, tabela, colunas, unique=False, where=None):
+    """
+    Cria um índice sem bloquear escritas (CREATE INDEX CONCURRENTLY no
+    PostgreSQL), fora da transação da migração. Um índice inválido deixado
+    por uma tentativa anterior interrompida é removido e recriado. Tabelas
+    particionadas não aceitam CONCURRENTLY e recebem CREATE INDEX comum.
+
+    Args:
+        op: objeto alembic.op da migração
+        nome: nome do índice
+        tabela: nome da tabela
+        colunas: lista de colunas ou expressões (sqlalchemy.text)
+        unique: índice único
+        where: predicado de índice parcial (texto SQL), ex.: 'ativo'
+    """
+    bind = op.get_bind()
+    predicado = text(where) if where else None
+
+    if bind.dialect.name != 'postgresql':
+        op.create_index(nome, tabela, colunas, unique=unique, if_not_exists=True,
+                        sqlite_where=predicado)
+        return
+
+    particionada = bind.execute(text(
+        "SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:tabela)"
+    ), {'tabela': tabela}).scalar()
+    if particionada:
+        op.create_index(nome, tabela, colunas, unique=unique, if_not_exists=True,
+                        postgresql_where=predicado)
+        return
+
+    with op.get_context().autocommit_block():
+        invalido = bind.execute(text(
+            'SELECT NOT i.indisvalid FROM pg_index i WHERE i.indexrelid = to_regclass(:nome)'
+        ), {'nome': nome}).scalar()
+        if invalido:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {nome}')
+        op.create_index(nome, tabela, colunas, unique=unique, if_not_exists=True,
+                        postgresql_concurrently=True, postgresql_where=predicado)
+
+
+def drop_index_online(op, nome, tabela):
+    """Remove um índice sem bloquear escritas (DROP INDEX CONCURRENTLY no PostgreSQL)"""
+    if op.get_bind().dialect.name != 'postgresql':
+        op.drop_index(nome, table_name=tabela, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(nome, table_name=tabela, if_exists=True, postgresql_concurrently=True)
+
+
+def log_problems(problemas, strict=False):
+    """Registra os problemas do check_schema (e interrompe se strict)"""
+    for problema in problemas:
+        current_app.logger.warning(f'Esquema: {problema}')
+    if problemas and strict:
+        raise RuntimeError('Esquema do banco desatualizado: ' + '; '.join(problemas))
@@ -0,0 +1,75 @@
+"""
+Geração de códigos sequenciais - Sistema Alpha Gestão Documental
+
+Cada par (prefixo, ano) tem um contador na tabela code_sequences, incrementado
+com UPDATE ... RETURNING na mesma transação do registro criado. O UPDATE
+trava apenas a linha do contador até o commit, então requisições paralelas
+recebem números distintos em tempo constante, e um rollback devolve o
+número (sem lacunas). Na primeira alocação de um prefixo/ano o contador é
+iniciado a partir do maior código já existente na tabela de destino.
+"""
+import re
+from datetime import datetime
+
+from sqlalchemy import update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import CodeSequence
+
+
+def _seed_value(coluna, prefixo, ano, largura):
+    """
+    Maior número já usado em códigos PREFIXO-ANO-NNNN da coluna informada.
+
+    Só conta números de até `largura` dígitos: códigos antigos com sufixo
+    longo (ex. timestamp) não devem saltar o contador.
+    """
+    if coluna is None:
+        return 0
+    padrao = re.compile(rf'^{re.escape(prefixo)}-{ano}-(\d{{1,{largura}}})$')
+    maior = 0
+    for (codigo,) in db.session.query(coluna).filter(coluna.like(f'{prefixo}-{ano}-%')):
+        match = padrao.match(codigo or '')
+        if match:
+            maior = max(maior, int(match.group(1)))
+    return maior
+
+
+def _increment(prefixo, ano):
+    stmt = update(CodeSequence.__table__).where(
+        CodeSequence.prefixo == prefixo,
+        CodeSequence.ano == ano
+    ).values(ultimo_valor=CodeSequence.ultimo_valor + 1).returning(CodeSequence.ultimo_valor)
+    return db.session.execute(stmt).scalar()
+
+
+def next_value(prefixo, ano=None, coluna=None, largura=4):
+    """
+    Próximo número do contador (prefixo, ano), na transação corrente.
+
+    Args:
+        prefixo: prefixo do código (NC, AUD, EQP...)
+        ano: ano do contador (padrão: ano atual)
+        coluna: coluna de código usada para iniciar o contador na primeira vez
+        largura: máximo de dígitos dos códigos considerados nessa inicialização
+    """
+    ano = ano or datetime.now().year
+
+    valor = _increment(prefixo, ano)
+    if valor is not None:
+        return valor
+
+    # Primeira alocação deste prefixo/ano: cria o contador (concorrência resolvida pelo ON CONFLICT)
+    dialect = postgresql if db.session.get_bind().dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(CodeSequence.__table__).values(
+        prefixo=prefixo, ano=ano, ultimo_valor=_seed_value(coluna, prefixo, ano, largura)
+    ).on_conflict_do_nothing(index_elements=['prefixo', 'ano'])
+    db.session.execute(stmt)
+    return _increment(prefixo, ano)
+
+
+def next_code(prefixo, coluna=None, ano=None, largura=4):
+    """Gera o próximo código no formato PREFIXO-ANO-NNNN"""
+    ano = ano or datetime.now().year
+    return f'{prefixo}-{ano}-{next_value(prefixo, ano, coluna, largura):0{largura}d}'
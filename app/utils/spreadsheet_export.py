@@ -0,0 +1,163 @@
+"""
+Exportação de relatórios em planilha (Excel e CSV) - Sistema Alpha Gestão Documental
+
+Importado sob demanda pelas rotas de exportação: o openpyxl só é carregado
+no worker que de fato gera uma planilha.
+"""
+import csv
+import io
+from datetime import datetime
+
+from flask import make_response
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill
+
+
+def export_reports_excel(data):
+    """Exportar relatórios em Excel"""
+    # Criar workbook
+    output = io.BytesIO()
+    workbook = Workbook()
+
+    # Remover sheet padrão
+    workbook.remove(workbook.active)
+
+    # Sheet 1: Resumo
+    ws_resumo = workbook.create_sheet("Resumo")
+
+    # Cabeçalho
+    ws_resumo['A1'] = 'RELATÓRIO DE DOCUMENTOS'
+    ws_resumo['A1'].font = Font(size=16, bold=True)
+    ws_resumo['A2'] = f'Gerado em: {datetime.now().strftime("%d/%m/%Y às %H:%M")}'
+
+    # Dados do resumo
+    resumo_data = [
+        ['Métrica', 'Valor'],
+        ['Total de Documentos', str(data['total_documentos'])],
+        ['Documentos Ativos', str(data['ativos'])],
+        ['Documentos Aprovados', str(data['aprovados'])],
+        ['Rascunhos', str(data['rascunhos'])],
+        ['Em Revisão', str(data['em_revisao'])],
+        ['Obsoletos', str(data['obsoletos'])],
+        ['Vencidos', str(data['vencidos'])],
+        ['Vencendo (30 dias)', str(data['vencendo'])],
+        ['Criados (último mês)', str(data['criados_mes'])]
+    ]
+
+    for row_num, row_data in enumerate(resumo_data, 4):
+        for col_num, cell_value in enumerate(row_data, 1):
+            cell = ws_resumo.cell(row=row_num, column=col_num, value=cell_value)
+            if row_num == 4:  # Cabeçalho
+                cell.font = Font(bold=True)
+                cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+
+    # Ajustar largura das colunas
+    ws_resumo.column_dimensions['A'].width = 25
+    ws_resumo.column_dimensions['B'].width = 15
+
+    # Sheet 2: Por Tipo
+    if data['por_tipo']:
+        ws_tipo = workbook.create_sheet("Por Tipo")
+        ws_tipo['A1'] = 'DOCUMENTOS POR TIPO'
+        ws_tipo['A1'].font = Font(size=14, bold=True)
+
+        tipo_headers = ['Tipo', 'Quantidade', 'Percentual']
+        for col_num, header in enumerate(tipo_headers, 1):
+            cell = ws_tipo.cell(row=3, column=col_num, value=header)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+
+        for row_num, (tipo, count) in enumerate(data['por_tipo'], 4):
+            percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+            ws_tipo.cell(row=row_num, column=1, value=tipo or 'N/A')
+            ws_tipo.cell(row=row_num, column=2, value=count)
+            ws_tipo.cell(row=row_num, column=3, value=f"{percentage:.1f}%")
+
+        ws_tipo.column_dimensions['A'].width = 20
+        ws_tipo.column_dimensions['B'].width = 12
+        ws_tipo.column_dimensions['C'].width = 12
+
+    # Sheet 3: Por Departamento
+    if data['por_departamento']:
+        ws_dept = workbook.create_sheet("Por Departamento")
+        ws_dept['A1'] = 'DOCUMENTOS POR DEPARTAMENTO'
+        ws_dept['A1'].font = Font(size=14, bold=True)
+
+        dept_headers = ['Departamento', 'Quantidade', 'Percentual']
+        for col_num, header in enumerate(dept_headers, 1):
+            cell = ws_dept.cell(row=3, column=col_num, value=header)
+            cell.font = Font(bold=True)
+            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+
+        for row_num, (dept, count) in enumerate(data['por_departamento'], 4):
+            percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+            ws_dept.cell(row=row_num, column=1, value=dept or 'N/A')
+            ws_dept.cell(row=row_num, column=2, value=count)
+            ws_dept.cell(row=row_num, column=3, value=f"{percentage:.1f}%")
+
+        ws_dept.column_dimensions['A'].width = 25
+        ws_dept.column_dimensions['B'].width = 12
+        ws_dept.column_dimensions['C'].width = 12
+
+    # Salvar workbook
+    workbook.save(output)
+    output.seek(0)
+
+    # Criar resposta
+    response = make_response(output.read())
+    response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response.headers['Content-Disposition'] = f'attachment; filename="relatorio_documentos_{datetime.now().strftime("%Y%m%d_%H%M")}.xlsx"'
+
+    return response
+
+
+def export_reports_csv(data):
+    """Exportar relatórios em CSV"""
+    csv_buffer = io.StringIO()
+    writer = csv.writer(csv_buffer)
+
+    # Cabeçalho
+    writer.writerow(['RELATÓRIO DE DOCUMENTOS'])
+    writer.writerow([f'Gerado em: {datetime.now().strftime("%d/%m/%Y às %H:%M")}'])
+    writer.writerow([])  # Linha em branco
+
+    # Resumo
+    writer.writerow(['RESUMO EXECUTIVO'])
+    writer.writerow(['Métrica', 'Valor'])
+    writer.writerow(['Total de Documentos', data['total_documentos']])
+    writer.writerow(['Documentos Ativos', data['ativos']])
+    writer.writerow(['Documentos Aprovados', data['aprovados']])
+    writer.writerow(['Rascunhos', data['rascunhos']])
+    writer.writerow(['Em Revisão', data['em_revisao']])
+    writer.writerow(['Obsoletos', data['obsoletos']])
+    writer.writerow(['Vencidos', data['vencidos']])
+    writer.writerow(['Vencendo (30 dias)', data['vencendo']])
+    writer.writerow(['Criados (último mês)', data['criados_mes']])
+    writer.writerow([])  # Linha em branco
+
+    # Por Tipo
+    if data['por_tipo']:
+        writer.writerow(['DOCUMENTOS POR TIPO'])
+        writer.writerow(['Tipo', 'Quantidade', 'Percentual'])
+        for tipo, count in data['por_tipo']:
+            percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+            writer.writerow([tipo or 'N/A', count, f"{percentage:.1f}%"])
+        writer.writerow([])  # Linha em branco
+
+    # Por Departamento
+    if data['por_departamento']:
+        writer.writerow(['DOCUMENTOS POR DEPARTAMENTO'])
+        writer.writerow(['Departamento', 'Quantidade', 'Percentual'])
+        for dept, count in data['por_departamento']:
+            percentage = (count / data['total_documentos']) * 100 if data['total_documentos'] > 0 else 0
+            writer.writerow([dept or 'N/A', count, f"{percentage:.1f}%"])
+
+    # Converter para bytes
+    csv_data = csv_buffer.getvalue().encode('utf-8')
+
+    # Criar resposta
+    response = make_response(csv_data)
+    response.headers['Content-Type'] = 'text/csv; charset=utf-8'
+    response.headers['Content-Disposition'] = f'attachment; filename="relatorio_documentos_{datetime.now().strftime("%Y%m%d_%H%M")}.csv"'
+
+    return response
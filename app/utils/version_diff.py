@@ -0,0 +1,268 @@
+"""
+Comparação entre versões de documentos - Alpha Gestão Documental
+
+O HTML de cada versão é dividido em blocos (parágrafos, títulos, itens de
+lista...). Os blocos são alinhados com o algoritmo de Myers (O(ND), após
+remover prefixo e sufixo comuns) e, dentro de cada par de blocos alterados,
+a comparação é refeita palavra a palavra para destacar o que mudou com
+<ins>/<del>. Assim o custo acompanha o tamanho da alteração, não o tamanho
+do documento.
+
+Os resultados ficam em cache por par de versões, identificado pelo hash dos
+dois conteúdos, de modo que um autosave na versão atual invalida
+naturalmente a comparação anterior.
+"""
+import hashlib
+import re
+from itertools import zip_longest
+
+from flask import current_app
+
+from app.utils.lru_cache import LRUCache
+from app.utils.version_store import tokenize
+
+BLOCK_RE = re.compile(r'.*?</(?:p|h[1-6]|li|blockquote|pre|tr|div)>\s*|.+$', re.S | re.I)
+
+# Acima desta distância de edição a comparação desiste de alinhar e trata o
+# trecho inteiro como substituído (evita custo quadrático em reescritas totais)
+MAX_EDIT_DISTANCE = 1000
+
+_cache = LRUCache()
+
+
+def split_blocks(html):
+    """Divide o HTML em blocos, ignorando trechos só com espaços"""
+    return [bloco for bloco in BLOCK_RE.findall(html or '') if bloco.strip()]
+
+
+def _content_hash(texto):
+    return hashlib.sha1((texto or '').encode('utf-8')).hexdigest()
+
+
+def _myers(a, b):
+    """
+    Sequência de operações (equal, delete, insert) que transforma a em b.
+
+    Returns:
+        List[str] ou None se a distância de edição passar de MAX_EDIT_DISTANCE
+    """
+    n, m = len(a), len(b)
+    if n == 0:
+        return ['insert'] * m
+    if m == 0:
+        return ['delete'] * n
+
+    v = {1: 0}
+    trace = []
+    for d in range(min(n + m, MAX_EDIT_DISTANCE) + 1):
+        trace.append(dict(v))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[k - 1] < v[k + 1]):
+                x = v[k + 1]
+            else:
+                x = v[k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace, n, m):
+    """Reconstrói o caminho de edição a partir dos estados de cada passo"""
+    ops = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[k - 1] < v[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[prev_k]
+        prev_y = prev_x - prev_k
+
+        while x > prev_x and y > prev_y:
+            ops.append('equal')
+            x -= 1
+            y -= 1
+        if d > 0:
+            ops.append('insert' if x == prev_x else 'delete')
+        x, y = prev_x, prev_y
+
+    ops.reverse()
+    return ops
+
+
+def diff_opcodes(a, b):
+    """
+    Opcodes no formato do difflib: (tag, i1, i2, j1, j2), com tag em
+    equal, delete, insert ou replace.
+    """
+    n, m = len(a), len(b)
+    inicio = 0
+    while inicio < n and inicio < m and a[inicio] == b[inicio]:
+        inicio += 1
+    fim = 0
+    while fim < n - inicio and fim < m - inicio and a[n - 1 - fim] == b[m - 1 - fim]:
+        fim += 1
+
+    ops = _myers(a[inicio:n - fim], b[inicio:m - fim])
+    if ops is None:
+        ops = ['delete'] * (n - fim - inicio) + ['insert'] * (m - fim - inicio)
+    ops = ['equal'] * inicio + ops + ['equal'] * fim
+
+    opcodes = []
+    i = j = 0
+    for op in ops:
+        di, dj = (1, 1) if op == 'equal' else ((1, 0) if op == 'delete' else (0, 1))
+        tag = 'equal' if op == 'equal' else 'change'
+        if opcodes and opcodes[-1][0] == tag:
+            _, i1, i2, j1, j2 = opcodes[-1]
+            opcodes[-1] = (tag, i1, i2 + di, j1, j2 + dj)
+        else:
+            opcodes.append((tag, i, i + di, j, j + dj))
+        i += di
+        j += dj
+
+    resultado = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'change':
+            tag = 'replace' if i2 > i1 and j2 > j1 else ('delete' if i2 > i1 else 'insert')
+        resultado.append((tag, i1, i2, j1, j2))
+    return resultado
+
+
+def _is_tag(token):
+    return token.startswith('<') and token.endswith('>')
+
+
+def _mark(tokens, marcador, manter_tags=True):
+    """Envolve o texto dos tokens em <ins>/<del>, preservando as tags"""
+    partes, texto = [], []
+
+    def fechar():
+        if texto:
+            conteudo = ''.join(texto)
+            partes.append(f'<{marcador} class="diff-{marcador}">{conteudo}</{marcador}>'
+                          if conteudo.strip() else conteudo)
+            texto.clear()
+
+    for token in tokens:
+        if _is_tag(token):
+            fechar()
+            if manter_tags:
+                partes.append(token)
+        else:
+            texto.append(token)
+    fechar()
+    return ''.join(partes)
+
+
+def highlight_blocks(antes, depois):
+    """
+    Compara dois blocos palavra a palavra.
+
+    Returns:
+        Tuple(antes_html, depois_html, combinado_html)
+    """
+    tokens_antes = tokenize(antes)
+    tokens_depois = tokenize(depois)
+
+    lado_antes, lado_depois, combinado = [], [], []
+    for tag, i1, i2, j1, j2 in diff_opcodes(tokens_antes, tokens_depois):
+        removidos = tokens_antes[i1:i2]
+        inseridos = tokens_depois[j1:j2]
+        if tag == 'equal':
+            trecho = ''.join(removidos)
+            lado_antes.append(trecho)
+            lado_depois.append(trecho)
+            combinado.append(trecho)
+            continue
+        if removidos:
+            lado_antes.append(_mark(removidos, 'del'))
+            combinado.append(_mark(removidos, 'del', manter_tags=False))
+        if inseridos:
+            lado_depois.append(_mark(inseridos, 'ins'))
+            combinado.append(_mark(inseridos, 'ins'))
+
+    return ''.join(lado_antes), ''.join(lado_depois), ''.join(combinado)
+
+
+def _block_opcodes(blocos_antes, blocos_depois):
+    """Alinha os blocos comparando inteiros (um id por bloco distinto)"""
+    ids = {}
+    a = [ids.setdefault(bloco.strip(), len(ids)) for bloco in blocos_antes]
+    b = [ids.setdefault(bloco.strip(), len(ids)) for bloco in blocos_depois]
+    return diff_opcodes(a, b)
+
+
+def side_by_side(antes, depois):
+    """
+    Alinha os blocos das duas versões, com destaque palavra a palavra nos
+    blocos alterados.
+
+    Returns:
+        List[dict] com tipo (igual, alterado, inserido, removido), antes e depois
+    """
+    blocos_antes = split_blocks(antes)
+    blocos_depois = split_blocks(depois)
+
+    linhas = []
+    for tag, i1, i2, j1, j2 in _block_opcodes(blocos_antes, blocos_depois):
+        if tag == 'equal':
+            for bloco in blocos_antes[i1:i2]:
+                linhas.append({'tipo': 'igual', 'antes': bloco, 'depois': bloco})
+            continue
+        for bloco_antes, bloco_depois in zip_longest(blocos_antes[i1:i2], blocos_depois[j1:j2]):
+            if bloco_antes is None:
+                linhas.append({'tipo': 'inserido', 'antes': None, 'depois': bloco_depois})
+            elif bloco_depois is None:
+                linhas.append({'tipo': 'removido', 'antes': bloco_antes, 'depois': None})
+            else:
+                html_antes, html_depois, _ = highlight_blocks(bloco_antes, bloco_depois)
+                linhas.append({'tipo': 'alterado', 'antes': html_antes, 'depois': html_depois})
+    return linhas
+
+
+def diff_html(antes, depois):
+    """HTML único da nova versão com inserções e remoções destacadas"""
+    blocos_antes = split_blocks(antes)
+    blocos_depois = split_blocks(depois)
+
+    partes = []
+    for tag, i1, i2, j1, j2 in _block_opcodes(blocos_antes, blocos_depois):
+        if tag == 'equal':
+            partes.extend(blocos_depois[j1:j2])
+            continue
+        for bloco_antes, bloco_depois in zip_longest(blocos_antes[i1:i2], blocos_depois[j1:j2]):
+            if bloco_antes is None:
+                partes.append(f'<div class="diff-block diff-block-ins">{bloco_depois}</div>')
+            elif bloco_depois is None:
+                partes.append(f'<div class="diff-block diff-block-del">{bloco_antes}</div>')
+            else:
+                partes.append(highlight_blocks(bloco_antes, bloco_depois)[2])
+    return ''.join(partes)
+
+
+def _cached(tipo, antes, depois, calcular):
+    """Resultado em cache pelo hash do par de conteúdos"""
+    key = (tipo, _content_hash(antes), _content_hash(depois))
+    resultado = _cache.get(key)
+    if resultado is None:
+        resultado = calcular(antes, depois)
+        _cache.set(key, resultado, max_size=current_app.config.get('VERSION_CACHE_SIZE', 256))
+    return resultado
+
+
+def compare_versions(version_antes, version_depois):
+    """Comparação lado a lado entre duas DocumentVersion, com cache"""
+    return _cached('lado_a_lado', version_antes.conteudo, version_depois.conteudo, side_by_side)
+
+
+def render_version_diff(version_antes, version_depois):
+    """HTML destacado das alterações entre duas DocumentVersion, com cache"""
+    return _cached('html', version_antes.conteudo, version_depois.conteudo, diff_html)
@@ -0,0 +1,306 @@
+"""
+Armazenamento de versões de documentos - Alpha Gestão Documental
+
+Cada documento guarda snapshots completos periódicos e, entre eles, versões
+gravadas apenas como a diferença (delta) em relação ao snapshot anterior,
+comprimida com zlib. A reconstrução é transparente através da propriedade
+DocumentVersion.conteudo e usa um cache LRU das versões já materializadas.
+
+Regras de gravação (listener before_flush):
+
+* um novo snapshot é gravado a cada VERSION_SNAPSHOT_INTERVAL versões, de
+  modo que qualquer versão é reconstruída com no máximo um delta;
+* se o delta não for menor que VERSION_DELTA_MAX_RATIO do conteúdo
+  completo, nem menor que o próprio conteúdo comprimido, a versão é
+  gravada como snapshot;
+* se um snapshot com dependentes tiver o conteúdo alterado, os dependentes
+  são convertidos em snapshots antes da gravação.
+
+O delta é calculado sobre tokens do HTML (tags, palavras e espaços), com o
+mesmo alinhamento da comparação de versões (prefixo/sufixo comuns + Myers,
+custo proporcional ao tamanho da alteração), e guardado como lista JSON de
+trechos copiados do snapshot ([início, fim]) e textos inseridos.
+"""
+import json
+import re
+import zlib
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from flask import current_app
+from sqlalchemy import event, func, inspect, true
+
+from app import db
+from app.utils.lru_cache import LRUCache
+
+TOKEN_RE = re.compile(r'<[^>]*>|[^<\s]+|\s+|<')
+COMPRESSION_LEVEL = 6
+
+_cache = LRUCache()
+
+
+def tokenize(texto):
+    """Divide o HTML em tokens cuja concatenação reproduz o texto original"""
+    return TOKEN_RE.findall(texto or '')
+
+
+def _common_length(a, b, sufixo=False):
+    """
+    Tamanho do prefixo (ou sufixo) comum de dois textos, por busca binária
+    sobre comparações de fatias (feitas em C, sem laço por caractere)
+    """
+    baixo, alto = 0, min(len(a), len(b))
+    while baixo < alto:
+        meio = (baixo + alto + 1) // 2
+        if (a[len(a) - meio:] == b[len(b) - meio:]) if sufixo else (a[:meio] == b[:meio]):
+            baixo = meio
+        else:
+            alto = meio - 1
+    return baixo
+
+
+def encode_delta(base, texto):
+    """Gera o delta comprimido que transforma base em texto"""
+    from app.utils.version_diff import diff_opcodes
+
+    base = base or ''
+    texto = texto or ''
+    base_tokens = tokenize(base)
+    n = len(base_tokens)
+
+    # Prefixo e sufixo comuns (no texto) viram cópias de tokens inteiros do
+    # snapshot; só o trecho alterado é tokenizado e alinhado (Myers)
+    prefixo = _common_length(base, texto)
+    sufixo = _common_length(base[prefixo:], texto[prefixo:], sufixo=True)
+    fins = list(accumulate(map(len, base_tokens)))
+    inicios = [0] + fins[:-1]
+    k = bisect_right(fins, prefixo)
+    j = max(bisect_left(inicios, len(base) - sufixo), k)
+    ini_meio = fins[k - 1] if k else 0
+    fim_meio = inicios[j] if j < n else len(base)
+    novos_tokens = tokenize(texto[ini_meio:len(texto) - (len(base) - fim_meio)])
+
+    ops = [[0, k]] if k else []
+    for tag, i1, i2, j1, j2 in diff_opcodes(base_tokens[k:j], novos_tokens):
+        if tag == 'equal':
+            ops.append([i1 + k, i2 + k])
+        elif j2 > j1:
+            inserido = ''.join(novos_tokens[j1:j2])
+            if ops and isinstance(ops[-1], str):
+                ops[-1] += inserido
+            else:
+                ops.append(inserido)
+
+    if j < n:
+        ops.append([j, n])
+
+    raw = json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return zlib.compress(raw, COMPRESSION_LEVEL)
+
+
+def apply_delta(base, delta):
+    """Reconstrói o texto a partir do snapshot base e do delta comprimido"""
+    base_tokens = tokenize(base)
+    ops = json.loads(zlib.decompress(delta).decode('utf-8'))
+
+    partes = []
+    for op in ops:
+        if isinstance(op, str):
+            partes.append(op)
+        else:
+            partes.append(''.join(base_tokens[op[0]:op[1]]))
+    return ''.join(partes)
+
+
+def _cache_key(version):
+    """Chave do cache: muda sempre que o delta gravado muda"""
+    return version.id, zlib.crc32(version.delta)
+
+
+def materialize(version):
+    """Retorna o conteúdo completo de uma versão guardada como delta"""
+    key = _cache_key(version)
+    texto = _cache.get(key)
+    if texto is not None:
+        return texto
+
+    base = version.base_versao
+    if base is None or base.delta is not None:
+        current_app.logger.error(f'Snapshot base ausente para a versão {version.id}')
+        return ''
+
+    texto = apply_delta(base._conteudo, version.delta)
+
+    _cache.set(key, texto, max_size=current_app.config.get('VERSION_CACHE_SIZE', 256))
+    return texto
+
+
+def clear_cache():
+    """Esvazia o cache de versões materializadas"""
+    _cache.clear()
+
+
+def _store_as_delta(version, base, texto):
+    """Tenta gravar a versão como delta do snapshot base; retorna True se gravou"""
+    delta = encode_delta(base._conteudo, texto)
+    max_ratio = current_app.config.get('VERSION_DELTA_MAX_RATIO', 0.5)
+    completo = texto.encode('utf-8')
+    if len(delta) >= len(completo) * max_ratio:
+        return False
+    # Um delta que não ganha do snapshot comprimido só custa a reconstrução
+    if len(delta) >= len(zlib.compress(completo, COMPRESSION_LEVEL)):
+        return False
+
+    version._conteudo = ''
+    version.delta = delta
+    version.base_versao_id = base.id
+    return True
+
+
+def compact_version(session, version):
+    """Decide se a versão recém-alterada fica como snapshot ou vira delta"""
+    from app.models import DocumentVersion
+
+    texto = version._conteudo
+    documento_id = version.documento_id or (version.documento.id if version.documento else None)
+    if not texto or documento_id is None:
+        return
+
+    query = session.query(DocumentVersion).filter(
+        DocumentVersion.documento_id == documento_id,
+        DocumentVersion.delta.is_(None)
+    )
+    if version.id is not None:
+        query = query.filter(DocumentVersion.id < version.id)
+    base = query.order_by(DocumentVersion.id.desc()).first()
+    if base is None:
+        return
+
+    dependentes = session.query(func.count(DocumentVersion.id)).filter(
+        DocumentVersion.base_versao_id == base.id,
+        DocumentVersion.id != version.id if version.id is not None else true()
+    ).scalar()
+    if dependentes >= current_app.config.get('VERSION_SNAPSHOT_INTERVAL', 10) - 1:
+        return
+
+    _store_as_delta(version, base, texto)
+
+
+def _rebase_dependents(session, version):
+    """Converte em snapshots os deltas que dependem de um snapshot alterado"""
+    from app.models import DocumentVersion
+
+    if version.id is None:
+        return
+    history = inspect(version).attrs._conteudo.history
+    if not history.deleted or not history.deleted[0]:
+        return
+
+    conteudo_anterior = history.deleted[0]
+    dependentes = session.query(DocumentVersion).filter(
+        DocumentVersion.base_versao_id == version.id
+    ).all()
+    for dependente in dependentes:
+        dependente._conteudo = apply_delta(conteudo_anterior, dependente.delta)
+        dependente.delta = None
+        dependente.base_versao_id = None
+
+
+def _before_flush(session, flush_context, instances):
+    """Compacta as versões cujo conteúdo foi definido nesta transação"""
+    from app.models import DocumentVersion
+
+    alteradas = [obj for obj in list(session.new) + list(session.dirty)
+                 if isinstance(obj, DocumentVersion) and obj.__dict__.pop('_conteudo_alterado', False)]
+    if not alteradas:
+        return
+
+    with session.no_autoflush:
+        for version in alteradas:
+            _rebase_dependents(session, version)
+            compact_version(session, version)
+
+
+def history_query(documento_id):
+    """
+    Consulta do histórico de versões sem carregar conteúdo nem deltas.
+
+    Carrega apenas as colunas exibidas na listagem e o nome do autor.
+    """
+    from sqlalchemy.orm import joinedload, load_only
+    from app.models import DocumentVersion, User
+
+    return DocumentVersion.query.filter_by(documento_id=documento_id).options(
+        load_only(DocumentVersion.id, DocumentVersion.documento_id, DocumentVersion.versao,
+                  DocumentVersion.changelog, DocumentVersion.data_criacao, DocumentVersion.criado_por_id),
+        joinedload(DocumentVersion.criado_por).load_only(User.id, User.nome_completo)
+    ).order_by(DocumentVersion.data_criacao.desc(), DocumentVersion.id.desc())
+
+
+def sync_current_versions():
+    """
+    Preenche documents.versao_atual_id para os documentos existentes e lista
+    as versões duplicadas que impedem o índice único (documento_id, versao).
+
+    A coluna e o índice são criados pela migração 0001 (flask db upgrade);
+    enquanto a coluna não existir, apenas as duplicidades são verificadas.
+
+    Returns:
+        Tuple(documentos_atualizados ou None sem a coluna, versoes_duplicadas)
+    """
+    with db.engine.begin() as connection:
+        atualizados = None
+        existentes = {col['name'] for col in inspect(connection).get_columns('documents')}
+        if 'versao_atual_id' in existentes:
+            atualizados = connection.execute(db.text("""
+                UPDATE documents SET versao_atual_id = (
+                    SELECT MAX(v.id) FROM document_versions v
+                    WHERE v.documento_id = documents.id AND v.versao = documents.versao_atual
+                )
+                WHERE versao_atual_id IS NULL
+            """)).rowcount
+
+        duplicadas = connection.execute(db.text("""
+            SELECT documento_id, versao FROM document_versions
+            GROUP BY documento_id, versao HAVING COUNT(*) > 1
+        """)).fetchall()
+
+    return atualizados, duplicadas
+
+
+def compact_document(documento_id):
+    """
+    Regrava todas as versões de um documento no formato snapshot + delta.
+
+    Returns:
+        Tuple(versões, bytes_antes, bytes_depois)
+    """
+    from app.models import DocumentVersion
+
+    versions = DocumentVersion.query.filter_by(documento_id=documento_id).order_by(DocumentVersion.id).all()
+    textos = [version.conteudo for version in versions]
+
+    bytes_antes = sum(len(v._conteudo.encode('utf-8')) + len(v.delta or b'') for v in versions)
+    interval = current_app.config.get('VERSION_SNAPSHOT_INTERVAL', 10)
+
+    base, dependentes = None, 0
+    for version, texto in zip(versions, textos):
+        if base is not None and dependentes < interval - 1 and texto and _store_as_delta(version, base, texto):
+            dependentes += 1
+            continue
+
+        version._conteudo = texto
+        version.delta = None
+        version.base_versao_id = None
+        base, dependentes = version, 0
+
+    bytes_depois = sum(len(v._conteudo.encode('utf-8')) + len(v.delta or b'') for v in versions)
+    db.session.commit()
+    clear_cache()
+    return len(versions), bytes_antes, bytes_depois
+
+
+def init_version_listeners(session):
+    """Registra o listener de compactação de versões (idempotente)"""
+    if not event.contains(session, 'before_flush', _before_flush):
+        event.listen(session, 'before_flush', _before_flush)
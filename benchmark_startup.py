@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização do worker - Sistema Alpha Gestão Documental
+
+Executa `python -X importtime` em processos novos, criando a aplicação como
+um worker do gunicorn faria, e informa:
+
+* o tempo total de inicialização (mediana das execuções);
+* os módulos de maior tempo de importação acumulado;
+* se alguma biblioteca pesada de exportação (ReportLab, openpyxl...) foi
+  carregada na inicialização: elas devem ser importadas apenas sob demanda.
+
+Sai com código 1 se a mediana passar da meta (--target-ms, padrão
+STARTUP_TARGET_MS ou 1500 ms) ou se uma biblioteca pesada for carregada.
+
+Uso:
+    python benchmark_startup.py [--runs 5] [--target-ms 1500] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Bibliotecas que não devem ser carregadas na inicialização
+HEAVY_MODULES = ['reportlab', 'openpyxl', 'xlsxwriter', 'html2text', 'pandas']
+
+STARTUP_TARGET_MS = int(os.environ.get('STARTUP_TARGET_MS') or 1500)
+
+CHILD_CODE = """
+import json, sys, time
+inicio = time.perf_counter()
+from app import create_app
+create_app()
+decorrido = (time.perf_counter() - inicio) * 1000
+print(json.dumps({'ms': decorrido, 'heavy': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def run_once():
+    """Cria a aplicação em um processo novo; retorna (ms, pesados, importtime)"""
+    env = dict(os.environ)
+    env.setdefault('SESSION_SECRET', 'benchmark')
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_CODE],
+        capture_output=True, text=True, env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if resultado.returncode != 0:
+        erros = [l for l in resultado.stderr.splitlines() if not l.startswith('import time:')]
+        raise RuntimeError('\n'.join(erros[-20:]))
+
+    dados = json.loads(resultado.stdout.strip().splitlines()[-1])
+    return dados['ms'], dados['heavy'], parse_importtime(resultado.stderr)
+
+
+def parse_importtime(stderr):
+    """Linhas do -X importtime -> {módulo: (próprio_us, acumulado_us)} (nível superior)"""
+    modulos = {}
+    for linha in stderr.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        if nome.startswith('  '):
+            continue  # importado por outro módulo; já contado no acumulado
+        modulos[nome.strip()] = (int(proprio), int(acumulado))
+    return modulos
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de inicialização (python -X importtime)')
+    parser.add_argument('--runs', type=int, default=5, help='Execuções (processos novos)')
+    parser.add_argument('--target-ms', type=int, default=STARTUP_TARGET_MS, help='Meta para a mediana, em ms')
+    parser.add_argument('--top', type=int, default=15, help='Módulos mais lentos exibidos')
+    args = parser.parse_args()
+
+    tempos, pesados, importtime = [], set(), {}
+    for _ in range(args.runs):
+        ms, heavy, modulos = run_once()
+        tempos.append(ms)
+        pesados.update(heavy)
+        importtime = modulos
+
+    mediana = statistics.median(tempos)
+    print(f'Inicialização: mediana {mediana:.0f} ms | mín {min(tempos):.0f} ms | máx {max(tempos):.0f} ms '
+          f'({args.runs} execuções)')
+
+    print('\nMódulos de maior importação acumulada (última execução):')
+    for nome, (_, acumulado) in sorted(importtime.items(), key=lambda i: -i[1][1])[:args.top]:
+        print(f'  {acumulado / 1000:8.1f} ms  {nome}')
+
+    falhou = False
+    if pesados:
+        print(f'\n❌ Bibliotecas pesadas carregadas na inicialização: {", ".join(sorted(pesados))}')
+        falhou = True
+    if mediana > args.target_ms:
+        print(f'\n❌ Mediana acima da meta de {args.target_ms} ms')
+        falhou = True
+    if not falhou:
+        print(f'\n✓ Dentro da meta de {args.target_ms} ms, sem bibliotecas pesadas na inicialização')
+    return 1 if falhou else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
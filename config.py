@@ -2,6 +2,33 @@ import os
 import logging
 from datetime import timedelta
 
+# Perfis do pool de conexões PostgreSQL (DB_POOL_PROFILE); cada valor pode ser
+# ajustado individualmente por DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT,
+# DB_POOL_RECYCLE e DB_POOL_PRE_PING.
+# * autoscale: muitos workers pequenos e banco serverless que encerra conexões
+#   ociosas: pool mínimo, reciclagem curta e pre-ping;
+# * dedicated: poucos workers com banco dedicado: pool maior, sem o round trip
+#   do pre-ping a cada checkout (conexões recicladas antes do timeout do banco);
+# * batch: comandos de CLI e tarefas longas: uma conexão, espera longa.
+POOL_PROFILES = {
+    'autoscale': {'pool_size': 2, 'max_overflow': 3, 'pool_timeout': 10, 'pool_recycle': 240, 'pool_pre_ping': True},
+    'dedicated': {'pool_size': 10, 'max_overflow': 10, 'pool_timeout': 20, 'pool_recycle': 1800, 'pool_pre_ping': False},
+    'batch': {'pool_size': 1, 'max_overflow': 1, 'pool_timeout': 60, 'pool_recycle': 1800, 'pool_pre_ping': True},
+}
+
+
+def pool_options(profile=None):
+    """Opções do pool: perfil DB_POOL_PROFILE com os ajustes individuais do ambiente"""
+    options = dict(POOL_PROFILES[profile or os.environ.get('DB_POOL_PROFILE') or 'autoscale'])
+    for option, env, cast in (('pool_size', 'DB_POOL_SIZE', int), ('max_overflow', 'DB_MAX_OVERFLOW', int),
+                              ('pool_timeout', 'DB_POOL_TIMEOUT', int), ('pool_recycle', 'DB_POOL_RECYCLE', int)):
+        if os.environ.get(env):
+            options[option] = cast(os.environ[env])
+    if os.environ.get('DB_POOL_PRE_PING'):
+        options['pool_pre_ping'] = os.environ['DB_POOL_PRE_PING'].lower() in ['true', '1', 'yes']
+    return options
+
+
 class Config:
     # Configurações básicas
     SECRET_KEY = os.environ.get('SESSION_SECRET') or 'dev-secret-key-change-in-production'
@@ -12,10 +39,7 @@ class Config:
         # Configure PostgreSQL com pooling e tratamento de reconexão
         SQLALCHEMY_DATABASE_URI = database_url
         SQLALCHEMY_ENGINE_OPTIONS = {
-            'pool_pre_ping': True,
-            'pool_recycle': 300,
-            'pool_timeout': 20,
-            'max_overflow': 0,
+            **pool_options(),
             'connect_args': {
                 'sslmode': 'prefer',
                 'connect_timeout': 10,
@@ -23,12 +47,40 @@ class Config:
             }
         }
     else:
-        # Fallback para SQLite em desenvolvimento
+        # Fallback para SQLite em desenvolvimento / nó único (sem pre-ping:
+        # não há conexão de rede a validar)
         SQLALCHEMY_DATABASE_URI = 'sqlite:///alpha_gestao.db'
-        SQLALCHEMY_ENGINE_OPTIONS = {'pool_pre_ping': True}
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+    
+    # Réplica de leitura para relatórios e dashboard (ver app/utils/db_routing.py).
+    # Opções de engine herdadas do primário; no SQLite sem os connect_args do PostgreSQL
+    REPLICA_DATABASE_URL = os.environ.get('REPLICA_DATABASE_URL')
+    if REPLICA_DATABASE_URL:
+        SQLALCHEMY_BINDS = {'replica': {'url': REPLICA_DATABASE_URL}}
+        if REPLICA_DATABASE_URL.startswith('sqlite'):
+            SQLALCHEMY_BINDS['replica']['connect_args'] = {}
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS') or 30)
+    REPLICA_CHECK_INTERVAL = int(os.environ.get('REPLICA_CHECK_INTERVAL') or 5)
+    REPLICA_RETRY_INTERVAL = int(os.environ.get('REPLICA_RETRY_INTERVAL') or 30)
+    
+    # Pragmas aplicados a cada conexão SQLite: WAL permite leituras simultâneas
+    # à escrita entre workers; synchronous=NORMAL é seguro com WAL e evita um
+    # fsync por transação
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE') or 'WAL'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 15000)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 20000)
+    
+    # Acesso aos endpoints /metrics sem sessão (cabeçalho Authorization: Bearer <token>);
+    # sem token configurado apenas administradores autenticados
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Preparar o banco (tabelas, administrador padrão) ao criar a aplicação.
+    # Desligado por padrão: em produção use `flask init-db` antes dos workers
+    AUTO_INIT_DB = os.environ.get('AUTO_INIT_DB', 'False').lower() in ['true', '1', 'yes']
+    
     # Configurações de upload
     UPLOAD_FOLDER = 'uploads'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB máximo
@@ -48,6 +100,49 @@ class Config:
     COMPANY_NAME = "Sua Empresa"
     DOCUMENT_RETENTION_DAYS = 7  # Dias para manter versões antigas
     
+    # Retenção dos logs de auditoria (partições mensais em PostgreSQL)
+    AUDIT_LOG_RETENTION_MONTHS = int(os.environ.get('AUDIT_LOG_RETENTION_MONTHS') or 24)
+    AUDIT_LOG_PARTITIONS_AHEAD = int(os.environ.get('AUDIT_LOG_PARTITIONS_AHEAD') or 3)
+    AUDIT_LOG_ARCHIVE_FOLDER = os.environ.get('AUDIT_LOG_ARCHIVE_FOLDER') or 'audit_archive'
+    
+    # Armazenamento de versões de documentos (snapshots completos + deltas)
+    VERSION_SNAPSHOT_INTERVAL = int(os.environ.get('VERSION_SNAPSHOT_INTERVAL') or 10)
+    VERSION_DELTA_MAX_RATIO = float(os.environ.get('VERSION_DELTA_MAX_RATIO') or 0.5)
+    VERSION_CACHE_SIZE = int(os.environ.get('VERSION_CACHE_SIZE') or 256)
+    
+    # Salvamento automático do editor: gravação no máximo a cada N segundos por documento
+    AUTOSAVE_INTERVAL = int(os.environ.get('AUTOSAVE_INTERVAL') or 10)
+    
+    # Registro de leituras em lote (write-behind) nas visualizações de documentos
+    READING_WRITE_BEHIND = os.environ.get('READING_WRITE_BEHIND', 'False').lower() in ['true', '1', 'yes']
+    READING_FLUSH_INTERVAL = int(os.environ.get('READING_FLUSH_INTERVAL') or 5)
+    READING_BUFFER_MAX = int(os.environ.get('READING_BUFFER_MAX') or 500)
+    READ_COVERAGE_CACHE_TTL = int(os.environ.get('READ_COVERAGE_CACHE_TTL') or 300)
+    READ_COVERAGE_REFRESH_INTERVAL = int(os.environ.get('READ_COVERAGE_REFRESH_INTERVAL') or 60)
+    
+    # Cache do usuário autenticado (segundos) e retrato do perfil na sessão assinada
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 60)
+    USER_SESSION_SNAPSHOT = os.environ.get('USER_SESSION_SNAPSHOT', 'False').lower() in ['true', '1', 'yes']
+    
+    # Hash de senhas: scrypt (fator = N) ou pbkdf2 (fator = iterações); calibrar com
+    # `flask passwords benchmark`. Hashes abaixo da política são refeitos no login.
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM') or 'scrypt'
+    PASSWORD_HASH_WORK_FACTOR = int(os.environ.get('PASSWORD_HASH_WORK_FACTOR') or 0) or None
+    
+    # Filtro de Bloom de senhas vazadas (gerar com `flask passwords build-breached-filter`)
+    BREACHED_PASSWORDS_FILE = os.environ.get('BREACHED_PASSWORDS_FILE') or 'breached_passwords.bloom'
+    
+    # Limite de tentativas (janela deslizante) em login, reset de senha e verificação pública
+    # de assinaturas; regras no formato "limite/segundos"
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() in ['true', '1', 'yes']
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE') or 'memory'  # memory ou sqlite:///arquivo.db
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.environ.get('RATE_LIMIT_TRUSTED_PROXIES') or 0)
+    RATE_LIMIT_LOGIN_IP = os.environ.get('RATE_LIMIT_LOGIN_IP') or '30/300'
+    RATE_LIMIT_LOGIN_EMAIL = os.environ.get('RATE_LIMIT_LOGIN_EMAIL') or '10/900'
+    RATE_LIMIT_FORGOT_PASSWORD_IP = os.environ.get('RATE_LIMIT_FORGOT_PASSWORD_IP') or '10/3600'
+    RATE_LIMIT_FORGOT_PASSWORD_EMAIL = os.environ.get('RATE_LIMIT_FORGOT_PASSWORD_EMAIL') or '3/3600'
+    RATE_LIMIT_VERIFY_SIGNATURE = os.environ.get('RATE_LIMIT_VERIFY_SIGNATURE') or '60/60'
+    
     # Configurações de segurança
     WTF_CSRF_TIME_LIMIT = 3600  # 1 hour for CSRF token
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
@@ -122,9 +122,9 @@ Instalação no Replit
    * SECRET_KEY  
    * MAIL_SERVER (opcional)
 
-3. **Execute a migração:**
+3. **Execute as migrações e crie os dados padrão:**
    ```bash
-   python migrate_db_complete.py
+   flask --app main init-db
    ```
 
 4. **Inicie o sistema:**
@@ -0,0 +1,79 @@
+"""
+Configuração do gunicorn - Sistema Alpha Gestão Documental
+
+    gunicorn -c gunicorn.conf.py main:app
+
+Com preload (GUNICORN_PRELOAD, padrão ligado) a aplicação é importada e
+criada uma única vez no processo mestre e os workers são criados por fork,
+compartilhando essa memória (copy-on-write) e subindo sem reimportar o
+código. O banco deve ser preparado antes com `flask --app main init-db`.
+
+Antes de criar os workers o mestre confere se o banco está na última
+migração (SCHEMA_CHECK: warn registra um aviso, strict impede a
+inicialização, off desliga); é uma única consulta a alembic_version.
+
+As métricas do Prometheus (GET /metrics) usam o modo multiprocesso do
+prometheus_client: cada worker grava em PROMETHEUS_MULTIPROC_DIR, limpo ao
+carregar esta configuração; os arquivos de workers encerrados são marcados
+em child_exit para que seus gauges deixem de ser somados.
+"""
+import glob
+import os
+import tempfile
+
+bind = os.environ.get('GUNICORN_BIND') or '0.0.0.0:5000'
+workers = int(os.environ.get('GUNICORN_WORKERS') or os.environ.get('WEB_CONCURRENCY') or 2)
+threads = int(os.environ.get('GUNICORN_THREADS') or 1)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT') or 30)
+reuse_port = True
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True').lower() in ['true', '1', 'yes']
+schema_check = (os.environ.get('SCHEMA_CHECK') or 'warn').lower()
+
+# Definido antes de a aplicação ser importada (preload) e herdado pelos workers
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR',
+                                    os.path.join(tempfile.gettempdir(), 'alpha_gestao_metrics'))
+os.makedirs(metrics_dir, exist_ok=True)
+for arquivo in glob.glob(os.path.join(metrics_dir, '*.db')):
+    os.remove(arquivo)
+
+
+def when_ready(server):
+    """Confere a revisão do esquema uma vez, no mestre, antes dos workers"""
+    if schema_check == 'off':
+        return
+    from app import db
+    from app.utils.schema import check_schema
+    from main import app
+
+    try:
+        with app.app_context():
+            ok, problemas = check_schema()
+            db.engine.dispose()
+    except Exception as e:
+        ok, problemas = False, [f'Não foi possível verificar o esquema: {e}']
+
+    for problema in problemas:
+        server.log.warning(f'Esquema: {problema}')
+    if not ok and schema_check == 'strict':
+        raise SystemExit('Esquema do banco desatualizado (SCHEMA_CHECK=strict)')
+
+
+def post_fork(server, worker):
+    """
+    Descarta no worker as conexões herdadas do mestre: um socket de banco
+    compartilhado entre processos corrompe o protocolo. O pool do worker
+    abre conexões próprias sob demanda.
+    """
+    if not preload_app:
+        return
+    from app import db
+    from main import app
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    """Descarta os gauges 'live' do worker encerrado"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
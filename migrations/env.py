@@ -0,0 +1,69 @@
+"""
+Ambiente do Alembic - Sistema Alpha Gestão Documental
+
+Usa o engine e os metadados da aplicação Flask. Normalmente executado pelos
+comandos `flask db ...`; se chamado pelo `alembic` direto, cria a aplicação.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from flask import has_app_context
+
+config = context.config
+
+
+def run_migrations(connection):
+    from app import db
+    from app.utils.schema import include_object_for
+
+    context.configure(
+        connection=connection,
+        target_metadata=db.metadata,
+        include_object=include_object_for(connection.dialect.name),
+        compare_type=True,
+        # Uma transação por migração: permite autocommit_block() para
+        # CREATE INDEX CONCURRENTLY sem desfazer as migrações anteriores
+        transaction_per_migration=True,
+        render_as_batch=connection.dialect.name == 'sqlite',
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline():
+    """Gera o SQL das migrações (alembic upgrade --sql) sem conectar"""
+    from app import db
+    from app.utils.schema import include_object_for
+
+    context.configure(
+        url=str(db.engine.url),
+        target_metadata=db.metadata,
+        include_object=include_object_for(db.engine.dialect.name),
+        literal_binds=True,
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    from app import db
+
+    with db.engine.connect() as connection:
+        run_migrations(connection)
+
+
+def main():
+    runner = run_migrations_offline if context.is_offline_mode() else run_migrations_online
+    if has_app_context():
+        runner()
+        return
+
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    from app import create_app
+    with create_app().app_context():
+        runner()
+
+
+main()
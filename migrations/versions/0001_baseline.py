@@ -0,0 +1,397 @@
+"""Esquema base (modelos e índices existentes antes das migrações)
+
+Cria as tabelas ausentes. Em bancos criados antes das migrações
+(db.create_all ou os antigos scripts migrate_*.py) as tabelas existentes são
+mantidas e recebem apenas as colunas e os índices que faltarem: esta
+revisão substitui as verificações de esquema daqueles scripts.
+
+Antes de adotar um banco antigo, remova as duplicidades que impediriam os
+índices únicos (`flask readings deduplicate`; `flask versions sync-current`
+lista as versões duplicadas) e, após `flask db upgrade`, preencha o ponteiro
+de versão atual com `flask versions sync-current`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.utils.schema import create_index_online
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+metadata = sa.MetaData()
+
+sa.Table(
+    'users', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('username', sa.String(80), unique=True, nullable=False),
+    sa.Column('email', sa.String(120), unique=True, nullable=False),
+    sa.Column('password_hash', sa.String(255), nullable=False),
+    sa.Column('nome_completo', sa.String(200), nullable=False),
+    sa.Column('perfil', sa.String(50), nullable=False),
+    sa.Column('grupo_id', sa.Integer, sa.ForeignKey('groups.id', use_alter=True, name='fk_users_grupo_id')),
+    sa.Column('cargo', sa.String(100)),
+    sa.Column('receber_notificacoes', sa.Boolean),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('ultimo_login', sa.DateTime),
+    sa.Column('reset_token', sa.String(100), unique=True),
+    sa.Column('reset_token_expiry', sa.DateTime),
+)
+
+sa.Table(
+    'groups', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('codigo', sa.String(20), unique=True, nullable=False),
+    sa.Column('nome', sa.String(100), nullable=False),
+    sa.Column('descricao', sa.Text),
+    sa.Column('cor', sa.String(7)),
+    sa.Column('icone', sa.String(50)),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id')),
+    sa.Column('notificar_novos_documentos', sa.Boolean),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'document_types', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('codigo', sa.String(20), unique=True, nullable=False),
+    sa.Column('nome', sa.String(100), nullable=False),
+    sa.Column('descricao', sa.Text),
+    sa.Column('cor', sa.String(7)),
+    sa.Column('icone', sa.String(50)),
+    sa.Column('notificar_grupos', sa.Boolean),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'document_type_groups', metadata,
+    sa.Column('document_type_id', sa.Integer, sa.ForeignKey('document_types.id'), primary_key=True),
+    sa.Column('group_id', sa.Integer, sa.ForeignKey('groups.id'), primary_key=True),
+    sa.Column('data_criacao', sa.DateTime),
+)
+
+sa.Table(
+    'equipment_types', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('codigo', sa.String(20), unique=True, nullable=False),
+    sa.Column('nome', sa.String(100), nullable=False),
+    sa.Column('descricao', sa.Text),
+    sa.Column('cor', sa.String(7)),
+    sa.Column('icone', sa.String(50)),
+    sa.Column('requer_calibracao', sa.Boolean),
+    sa.Column('frequencia_calibracao_padrao', sa.Integer),
+    sa.Column('requer_manutencao', sa.Boolean),
+    sa.Column('frequencia_manutencao_padrao', sa.Integer),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'documents', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('revisao', sa.Integer, nullable=False, server_default='1'),
+    sa.Column('codigo', sa.String(50), unique=True, nullable=False),
+    sa.Column('titulo', sa.String(200), nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('tipo_documento_id', sa.Integer, sa.ForeignKey('document_types.id')),
+    sa.Column('status', sa.String(50)),
+    sa.Column('versao_atual', sa.String(10)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('data_validade', sa.DateTime),
+    sa.Column('data_ultima_revisao', sa.DateTime),
+    sa.Column('autor_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('departamento', sa.String(100)),
+    sa.Column('palavras_chave', sa.Text),
+    sa.Column('resumo', sa.Text),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('versao_atual_id', sa.Integer,
+              sa.ForeignKey('document_versions.id', use_alter=True, name='fk_documents_versao_atual_id')),
+)
+
+sa.Table(
+    'document_versions', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('documento_id', sa.Integer, sa.ForeignKey('documents.id'), nullable=False),
+    sa.Column('versao', sa.String(10), nullable=False),
+    sa.Column('conteudo', sa.Text, nullable=False),
+    sa.Column('base_versao_id', sa.Integer, sa.ForeignKey('document_versions.id')),
+    sa.Column('delta', sa.LargeBinary),
+    sa.Column('revisao', sa.Integer, nullable=False, server_default='0'),
+    sa.Column('changelog', sa.Text),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('arquivo_path', sa.String(255)),
+    sa.Index('ux_document_versions_documento_versao', 'documento_id', 'versao', unique=True),
+)
+
+sa.Table(
+    'approval_flows', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('documento_id', sa.Integer, sa.ForeignKey('documents.id'), nullable=False),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('etapa', sa.String(50), nullable=False),
+    sa.Column('status', sa.String(50)),
+    sa.Column('ordem', sa.Integer),
+    sa.Column('data_atribuicao', sa.DateTime),
+    sa.Column('data_conclusao', sa.DateTime),
+    sa.Column('comentarios', sa.Text),
+    sa.Column('prazo', sa.DateTime),
+)
+
+sa.Table(
+    'document_readings', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('documento_id', sa.Integer, sa.ForeignKey('documents.id'), nullable=False),
+    sa.Column('usuario_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('versao_lida', sa.String(10), nullable=False),
+    sa.Column('data_leitura', sa.DateTime),
+    sa.Column('ip_address', sa.String(45)),
+    sa.Index('ux_document_readings_documento_usuario_versao', 'documento_id', 'usuario_id', 'versao_lida',
+             unique=True),
+)
+
+sa.Table(
+    'non_conformities', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('revisao', sa.Integer, nullable=False, server_default='1'),
+    sa.Column('codigo', sa.String(50), unique=True, nullable=False),
+    sa.Column('titulo', sa.String(200), nullable=False),
+    sa.Column('descricao', sa.Text, nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('criticidade', sa.String(20), nullable=False),
+    sa.Column('status', sa.String(50)),
+    sa.Column('origem', sa.String(100)),
+    sa.Column('area_responsavel', sa.String(100)),
+    sa.Column('data_abertura', sa.DateTime),
+    sa.Column('data_prazo', sa.DateTime),
+    sa.Column('data_fechamento', sa.DateTime),
+    sa.Column('aberto_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id')),
+    sa.Column('documento_id', sa.Integer, sa.ForeignKey('documents.id')),
+)
+
+sa.Table(
+    'corrective_actions', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('nao_conformidade_id', sa.Integer, sa.ForeignKey('non_conformities.id'), nullable=False),
+    sa.Column('tipo', sa.String(20), nullable=False),
+    sa.Column('descricao', sa.Text, nullable=False),
+    sa.Column('justificativa', sa.Text),
+    sa.Column('status', sa.String(50)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('data_prazo', sa.DateTime),
+    sa.Column('data_conclusao', sa.DateTime),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'audits', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('revisao', sa.Integer, nullable=False, server_default='1'),
+    sa.Column('codigo', sa.String(50), unique=True, nullable=False),
+    sa.Column('titulo', sa.String(200), nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('escopo', sa.Text, nullable=False),
+    sa.Column('objetivos', sa.Text),
+    sa.Column('area_auditada', sa.String(100)),
+    sa.Column('status', sa.String(50)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('data_inicio', sa.DateTime),
+    sa.Column('data_fim', sa.DateTime),
+    sa.Column('data_relatorio', sa.DateTime),
+    sa.Column('auditor_lider_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'audit_checklists', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('auditoria_id', sa.Integer, sa.ForeignKey('audits.id'), nullable=False),
+    sa.Column('item', sa.String(200), nullable=False),
+    sa.Column('descricao', sa.Text),
+    sa.Column('requisito', sa.String(100)),
+    sa.Column('status', sa.String(20)),
+    sa.Column('observacoes', sa.Text),
+    sa.Column('evidencias', sa.Text),
+    sa.Column('data_verificacao', sa.DateTime),
+    sa.Column('verificado_por_id', sa.Integer, sa.ForeignKey('users.id')),
+)
+
+sa.Table(
+    'audit_findings', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('auditoria_id', sa.Integer, sa.ForeignKey('audits.id'), nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('descricao', sa.Text, nullable=False),
+    sa.Column('criterio', sa.Text),
+    sa.Column('evidencia', sa.Text),
+    sa.Column('criticidade', sa.String(20)),
+    sa.Column('status', sa.String(50)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('identificado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id')),
+)
+
+sa.Table(
+    'document_signatures', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('documento_id', sa.Integer, sa.ForeignKey('documents.id'), nullable=False),
+    sa.Column('versao_documento', sa.String(10), nullable=False),
+    sa.Column('usuario_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('tipo_assinatura', sa.String(20), nullable=False),
+    sa.Column('hash_documento', sa.String(256)),
+    sa.Column('certificado_info', sa.Text),
+    sa.Column('ip_address', sa.String(45)),
+    sa.Column('data_assinatura', sa.DateTime),
+    sa.Column('valida', sa.Boolean),
+)
+
+sa.Table(
+    'equipments', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('revisao', sa.Integer, nullable=False, server_default='1'),
+    sa.Column('codigo', sa.String(50), unique=True, nullable=False),
+    sa.Column('nome', sa.String(200), nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('tipo_equipamento_id', sa.Integer, sa.ForeignKey('equipment_types.id')),
+    sa.Column('fabricante', sa.String(100)),
+    sa.Column('modelo', sa.String(100)),
+    sa.Column('numero_serie', sa.String(100)),
+    sa.Column('localizacao', sa.String(100)),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id')),
+    sa.Column('status', sa.String(30)),
+    sa.Column('data_aquisicao', sa.DateTime),
+    sa.Column('data_proxima_calibracao', sa.DateTime),
+    sa.Column('data_proxima_manutencao', sa.DateTime),
+    sa.Column('frequencia_calibracao', sa.Integer),
+    sa.Column('frequencia_manutencao', sa.Integer),
+    sa.Column('observacoes', sa.Text),
+    sa.Column('ativo', sa.Boolean),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+)
+
+sa.Table(
+    'service_records', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('equipamento_id', sa.Integer, sa.ForeignKey('equipments.id'), nullable=False),
+    sa.Column('tipo_servico', sa.String(50), nullable=False),
+    sa.Column('data_servico', sa.DateTime, nullable=False),
+    sa.Column('prestador_servico', sa.String(200)),
+    sa.Column('descricao', sa.Text, nullable=False),
+    sa.Column('observacoes', sa.Text),
+    sa.Column('status', sa.String(30)),
+    sa.Column('custo', sa.Numeric(10, 2)),
+    sa.Column('proximo_servico', sa.DateTime),
+    sa.Column('certificado_path', sa.String(255)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('criado_por_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('responsavel_id', sa.Integer, sa.ForeignKey('users.id')),
+)
+
+sa.Table(
+    'email_notifications', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('destinatario_id', sa.Integer, sa.ForeignKey('users.id'), nullable=False),
+    sa.Column('tipo', sa.String(50), nullable=False),
+    sa.Column('assunto', sa.String(200), nullable=False),
+    sa.Column('conteudo', sa.Text, nullable=False),
+    sa.Column('status', sa.String(20)),
+    sa.Column('data_criacao', sa.DateTime),
+    sa.Column('data_envio', sa.DateTime),
+    sa.Column('tentativas', sa.Integer),
+    sa.Column('erro_mensagem', sa.Text),
+    sa.Column('entidade_tipo', sa.String(50)),
+    sa.Column('entidade_id', sa.Integer),
+)
+
+sa.Table(
+    'code_sequences', metadata,
+    sa.Column('prefixo', sa.String(20), primary_key=True),
+    sa.Column('ano', sa.Integer, primary_key=True),
+    sa.Column('ultimo_valor', sa.Integer, nullable=False),
+)
+
+sa.Table(
+    'audit_logs', metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('usuario_id', sa.Integer, sa.ForeignKey('users.id')),
+    sa.Column('acao', sa.String(100), nullable=False),
+    sa.Column('recurso', sa.String(100)),
+    sa.Column('recurso_id', sa.Integer),
+    sa.Column('detalhes', sa.Text),
+    sa.Column('ip_address', sa.String(45)),
+    sa.Column('user_agent', sa.Text),
+    sa.Column('status', sa.String(20)),
+    sa.Column('data_acao', sa.DateTime, nullable=False),
+    sa.Column('alteracoes', sa.JSON(none_as_null=True).with_variant(postgresql.JSONB(none_as_null=True),
+                                                                    'postgresql')),
+    sa.Index('ix_audit_logs_data_acao', 'data_acao'),
+    sa.Index('ix_audit_logs_usuario_data', 'usuario_id', 'data_acao'),
+    sa.Index('ix_audit_logs_recurso_data', 'recurso', 'recurso_id', 'data_acao'),
+    sa.Index('ix_audit_logs_acao_data', 'acao', 'data_acao'),
+    sa.Index('ix_audit_logs_status_data', 'status', 'data_acao'),
+)
+
+# Índices criados apenas no PostgreSQL: {nome: (tabela, coluna, método)}
+POSTGRESQL_INDEXES = {
+    'ix_audit_logs_alteracoes': ('audit_logs', 'alteracoes', 'gin'),
+}
+
+
+def _add_missing_columns(bind, table, existentes):
+    """ALTER TABLE ADD COLUMN para as colunas que o banco antigo não tem"""
+    for column in table.columns:
+        if column.name in existentes:
+            continue
+        tipo = column.type.compile(dialect=bind.dialect)
+        referencia = ''
+        for fk in column.foreign_keys:
+            referencia = f' REFERENCES {fk.target_fullname.split(".")[0]}({fk.column.name})'
+        # NOT NULL só é possível em tabela com dados quando há valor padrão
+        padrao = f' NOT NULL DEFAULT {column.server_default.arg}' if column.server_default is not None else ''
+        op.execute(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {tipo}{referencia}{padrao}')
+
+
+def _create_missing_indexes(bind, table):
+    existentes = {index['name'] for index in sa.inspect(bind).get_indexes(table.name)}
+    for index in table.indexes:
+        if index.name not in existentes:
+            create_index_online(op, index.name, table.name, [c.name for c in index.columns],
+                                unique=index.unique)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tabelas = set(inspector.get_table_names())
+
+    novas = [table for table in metadata.sorted_tables if table.name not in tabelas]
+    metadata.create_all(bind, tables=novas)
+
+    for table in metadata.sorted_tables:
+        if table.name in tabelas:
+            existentes = {col['name'] for col in inspector.get_columns(table.name)}
+            _add_missing_columns(bind, table, existentes)
+            _create_missing_indexes(bind, table)
+
+    if bind.dialect.name == 'postgresql':
+        for nome, (tabela, coluna, metodo) in POSTGRESQL_INDEXES.items():
+            op.execute(f'CREATE INDEX IF NOT EXISTS {nome} ON {tabela} USING {metodo} ({coluna})')
+
+
+def downgrade():
+    metadata.drop_all(op.get_bind())
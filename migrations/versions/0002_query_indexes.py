@@ -0,0 +1,58 @@
+"""Índices para chaves estrangeiras e colunas de filtro
+
+Índices compostos e parciais para as consultas das telas e dos contadores
+(ver `flask db index-audit`): documentos do autor, aprovações pendentes do
+responsável, leituras por período, NCs abertas/atrasadas, vencimentos de
+equipamentos e fila de e-mails. Os parciais cobrem só as linhas que as
+consultas filtram (ativo, pendente, não fechada) e ficam menores.
+
+Criados com CREATE INDEX CONCURRENTLY no PostgreSQL (sem bloquear escritas).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+from app.utils.schema import create_index_online, drop_index_online
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+ATIVO = '<ativo>'  # Substituído pelo predicado booleano do dialeto
+
+# (nome, tabela, colunas, predicado do índice parcial)
+INDEXES = [
+    ('ix_documents_autor_data_criacao', 'documents', ['autor_id', 'data_criacao'], None),
+    ('ix_documents_status', 'documents', ['status'], None),
+    ('ix_documents_tipo_ativos', 'documents', ['tipo'], ATIVO),
+    ('ix_documents_data_validade_ativos', 'documents', ['data_validade'], ATIVO),
+    ('ix_documents_data_criacao_ativos', 'documents', ['data_criacao'], ATIVO),
+    ('ix_approval_flows_responsavel_status', 'approval_flows', ['responsavel_id', 'status', 'data_atribuicao'], None),
+    ('ix_approval_flows_documento_id', 'approval_flows', ['documento_id'], None),
+    ('ix_approval_flows_prazo_pendentes', 'approval_flows', ['prazo'], "status = 'pendente'"),
+    ('ix_document_readings_usuario_documento', 'document_readings', ['usuario_id', 'documento_id'], None),
+    ('ix_document_readings_data_leitura', 'document_readings', ['data_leitura'], None),
+    ('ix_non_conformities_status_criticidade', 'non_conformities', ['status', 'criticidade'], None),
+    ('ix_non_conformities_data_prazo_abertas', 'non_conformities', ['data_prazo'], "status <> 'fechada'"),
+    ('ix_non_conformities_responsavel_id', 'non_conformities', ['responsavel_id'], None),
+    ('ix_equipments_proxima_calibracao_ativos', 'equipments', ['data_proxima_calibracao'], ATIVO),
+    ('ix_equipments_proxima_manutencao_ativos', 'equipments', ['data_proxima_manutencao'], ATIVO),
+    ('ix_email_notifications_pendentes', 'email_notifications', ['data_criacao'], "status = 'pendente'"),
+    ('ix_email_notifications_destinatario_id', 'email_notifications', ['destinatario_id'], None),
+]
+
+
+def upgrade():
+    # O ORM compara booleanos com true no PostgreSQL e com 1 no SQLite; o
+    # predicado do índice parcial precisa ser implicado pelo da consulta
+    ativo = 'ativo' if op.get_bind().dialect.name == 'postgresql' else 'ativo = 1'
+    for nome, tabela, colunas, where in INDEXES:
+        create_index_online(op, nome, tabela, colunas, where=ativo if where == ATIVO else where)
+
+
+def downgrade():
+    for nome, tabela, _, _ in reversed(INDEXES):
+        drop_index_online(op, nome, tabela)
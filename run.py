@@ -19,6 +19,12 @@ def make_shell_context():
     }
 
 if __name__ == '__main__':
+    # Servidor de desenvolvimento: prepara o banco antes de subir
+    # (em produção use `flask --app main init-db` na implantação)
+    with app.app_context():
+        from app.utils.db_setup import init_database
+        init_database()
+
     # Get environment variables for production safety
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() in ['true', '1', 'yes', 'on']
     